@@ -0,0 +1,65 @@
+""" Chargement en arrière-plan : un générateur est parcouru dans un thread de travail, sa progression est publiée dans le thread de l'interface. """
+import queue
+import threading
+
+# Intervalle de vérification de la progression, en millisecondes
+POLL_MS = 20
+
+
+class BackgroundLoader:
+    """ Parcourt `steps` dans un thread de travail.
+
+    `on_progress(value)` reçoit la dernière valeur générée depuis la vérification précédente, puis `on_done()`
+    ou `on_error(exception)` est appelé à la fin ; ces rappels sont exécutés dans le thread de l'interface.
+    """
+
+    def __init__(self, root, steps, on_progress, on_done, on_error):
+        self.root = root
+        self.steps = steps
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self._results = queue.Queue()
+        # Thread démon : fermer la fenêtre pendant le chargement ne bloque pas la sortie du programme
+        self._thread = threading.Thread(target=self._run, name="chargement", daemon=True)
+        self._thread.start()
+        self._poll_id = self.root.after(POLL_MS, self._poll)
+
+    @property
+    def busy(self):
+        return self._poll_id is not None
+
+    def _run(self):
+        # Exécuté dans le thread de travail : aucun appel à Tk ici
+        try:
+            for value in self.steps:
+                self._results.put(("progress", value))
+        except Exception as e:
+            self._results.put(("error", e))
+        else:
+            self._results.put(("done", None))
+
+    def _poll(self):
+        # Exécuté dans le thread de l'interface : ne publier que la progression la plus récente
+        latest = None
+        final = None
+        while True:
+            try:
+                kind, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                latest = (value,)
+            else:
+                final = (kind, value)
+        if latest is not None:
+            self.on_progress(latest[0])
+
+        if final is None:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+            return
+        self._poll_id = None
+        if final[0] == "error":
+            self.on_error(final[1])
+        else:
+            self.on_done()
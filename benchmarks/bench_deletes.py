@@ -0,0 +1,99 @@
+"""Mesurer des suppressions en masse : positions dans une liste contre identifiants stables, à 10k et 100k candidatures."""
+import os
+import sys
+import json
+import random
+import shutil
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bench_keystrokes import generate_database
+from records import Applications, Record
+from storage import JournaledStorage
+from sqlite_storage import SqliteStorage
+from view_model import ApplicationView
+
+SIZES = [10000, 100000]
+DELETE_COUNT = 1000
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_positions(database, victims):
+    # Ancienne approche : liste adressée par position, chaque suppression décale la fin de la liste
+    applications = [Record.from_dict(application) for application in database["applications"]]
+    rng = random.Random(len(applications))
+    positions = [rng.randrange(len(applications) - count) for count in range(len(victims))]
+    return timed(lambda: [applications.pop(position) for position in positions])
+
+
+def bench_ids(database, victims):
+    applications = Applications(Record.from_dict(application) for application in database["applications"])
+    return timed(lambda: [applications.remove(record_id) for record_id in victims])
+
+
+def bench_view(database, victims):
+    # Suppressions par identifiant, avec mise à jour de l'index de recherche et des deux permutations triées
+    applications = Applications(Record.from_dict(application) for application in database["applications"])
+    view = ApplicationView(applications)
+    view.page("", "application_date", True, 0, 10)
+    view.page("", "status", True, 0, 10)
+
+    def delete():
+        for record_id in victims:
+            view.remove(applications.remove(record_id))
+    return timed(delete)
+
+
+def bench_journal(directory, database, victims):
+    path = os.path.join(directory, "applications.json")
+    with open(path, "w") as file:
+        json.dump(database, file)
+    storage = JournaledStorage(path)
+    loaded = storage.load()
+    return timed(lambda: [storage.apply({"op": "delete", "id": record_id}, loaded) for record_id in victims])
+
+
+def bench_sqlite(directory, database, victims):
+    storage = SqliteStorage(os.path.join(directory, "applications.db"))
+    storage.import_applications(database["applications"])
+    loaded = storage.load()
+    try:
+        return timed(lambda: [storage.apply({"op": "delete", "id": record_id}, loaded) for record_id in victims])
+    finally:
+        storage.close()
+
+
+def main():
+    print(f"{DELETE_COUNT} suppressions aléatoires")
+    print(f"{'taille':>8} {'méthode':>12} {'total':>12} {'par suppression':>16}")
+    for size in SIZES:
+        database = generate_database(size)
+        # Les identifiants sont attribués dans l'ordre du fichier, à partir de 1
+        victims = random.Random(size).sample(range(1, size + 1), DELETE_COUNT)
+        benches = (
+            ("positions", lambda: bench_positions(database, victims)),
+            ("ids", lambda: bench_ids(database, victims)),
+            ("ids + vue", lambda: bench_view(database, victims)),
+        )
+        for name, bench in benches:
+            elapsed_ms = bench()
+            print(f"{size:>8} {name:>12} {elapsed_ms:>9.1f} ms {elapsed_ms * 1000 / DELETE_COUNT:>13.1f} µs")
+        for name, bench in (("journal", bench_journal), ("sqlite", bench_sqlite)):
+            directory = tempfile.mkdtemp(prefix="jobgestion_bench_")
+            try:
+                elapsed_ms = bench(directory, database, victims)
+            finally:
+                shutil.rmtree(directory)
+            print(f"{size:>8} {name:>12} {elapsed_ms:>9.1f} ms {elapsed_ms * 1000 / DELETE_COUNT:>13.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Mesurer le coût de la recherche dynamique : 1 000 frappes sur une base de 50 000 candidatures.
+
+Le temps par frappe est celui passé dans le thread de l'interface ; la recherche elle-même est différée
+et calculée en arrière-plan, d'où la mesure séparée du délai d'affichage du dernier résultat.
+"""
+import os
+import sys
+import json
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+NUM_APPLICATIONS = 50000
+NUM_KEYSTROKES = 1000
+
+COMPANIES = ["Airbus", "Capgemini", "Dassault Systèmes", "Orange", "Thales", "Ubisoft", "Doctolib", "BlaBlaCar", "Criteo", "OVHcloud"]
+TITLES = ["Développeur Python", "Ingénieur logiciel", "Data scientist", "Chef de projet", "Développeur front-end", "Administrateur système"]
+STATUSES = ["En attente", "Accepté", "Refusé"]
+QUERIES = ["airbus", "python", "data", "orange", "ingénieur", "chef"]
+
+
+def generate_database(count, seed=42):
+    # Générer une base synthétique reproductible
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    applications = []
+    for i in range(count):
+        day = start + timedelta(days=rng.randrange(1500))
+        date_format = "%d-%m-%Y" if rng.random() < 0.5 else "%Y-%m-%d"
+        applications.append({
+            "company_name": f"{rng.choice(COMPANIES)} {i % 97}",
+            "job_title": rng.choice(TITLES),
+            "cover_letter_path": f"/tmp/lettre_{i}.pdf",
+            "screenshot_path": f"/tmp/capture_{i}.png",
+            "application_date": day.strftime(date_format),
+            "status": rng.choice(STATUSES),
+            "comment": "",
+        })
+    return {"applications": applications}
+
+
+def keystrokes(count):
+    # Simuler la saisie caractère par caractère puis l'effacement de chaque requête
+    texts = []
+    while len(texts) < count:
+        for query in QUERIES:
+            texts.extend(query[:n] for n in range(1, len(query) + 1))
+            texts.extend(query[:n] for n in range(len(query) - 1, -1, -1))
+    return texts[:count]
+
+
+def main():
+    home = tempfile.mkdtemp(prefix="jobgestion_bench_")
+    os.environ["HOME"] = home
+    with open(os.path.join(home, "applications.json"), "w") as file:
+        json.dump(generate_database(NUM_APPLICATIONS), file)
+
+    # Les ressources (logo, flèches) sont résolues depuis le répertoire courant
+    os.chdir(REPO_DIR)
+    import tkinter as tk
+    from job_gestion import JobApplicationApp
+
+    root = tk.Tk()
+    root.withdraw()
+    app = JobApplicationApp(root)
+    root.update_idletasks()
+
+    timings = []
+    for text in keystrokes(NUM_KEYSTROKES):
+        start = time.perf_counter()
+        app.search_var.set(text)
+        root.update()
+        timings.append(time.perf_counter() - start)
+
+    # Attendre que le résultat de la dernière frappe soit affiché
+    start = time.perf_counter()
+    while app.search_pipeline.busy:
+        root.update()
+        time.sleep(0.001)
+    settle = time.perf_counter() - start
+    root.destroy()
+
+    timings.sort()
+    total = sum(timings)
+    print(f"{NUM_KEYSTROKES} frappes sur {NUM_APPLICATIONS} candidatures : {total:.3f} s au total")
+    print(f"moyenne {total / len(timings) * 1000:.2f} ms, p50 {timings[len(timings) // 2] * 1000:.2f} ms, p99 {timings[int(len(timings) * 0.99)] * 1000:.2f} ms")
+    print(f"dernier résultat affiché {settle * 1000:.1f} ms après la dernière frappe")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Mesurer le temps de démarrage avec 100 000 candidatures : affichage de la fenêtre, de la première page et fin du chargement.
+
+Chaque lancement est mesuré dans un processus séparé (imports compris). Le premier part d'un cache d'icônes vide,
+les suivants réutilisent les icônes redimensionnées. Le chargement synchrone complet est mesuré à titre de comparaison.
+"""
+import os
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+NUM_APPLICATIONS = 100000
+NUM_LAUNCHES = 3
+
+
+def launch():
+    # Exécuté dans le processus enfant : imports, création de la fenêtre puis attente du chargement
+    start = time.perf_counter()
+    os.chdir(REPO_DIR)
+    import tkinter as tk
+    from job_gestion import JobApplicationApp
+
+    root = tk.Tk()
+    app = JobApplicationApp(root)
+    root.update()
+    window_ms = (time.perf_counter() - start) * 1000
+
+    while app.row_record_ids[0] is None and not app.loaded:
+        root.update()
+        time.sleep(0.001)
+    root.update_idletasks()
+    first_page_ms = (time.perf_counter() - start) * 1000
+
+    while not app.loaded:
+        root.update()
+        time.sleep(0.001)
+    loaded_ms = (time.perf_counter() - start) * 1000
+    root.destroy()
+    print(json.dumps([window_ms, first_page_ms, loaded_ms]))
+
+
+def main():
+    from bench_keystrokes import generate_database
+    from storage import JournaledStorage
+    from view_model import ApplicationView
+
+    home = tempfile.mkdtemp(prefix="jobgestion_bench_")
+    try:
+        path = os.path.join(home, "applications.json")
+        with open(path, "w") as file:
+            json.dump(generate_database(NUM_APPLICATIONS), file, indent=4)
+
+        # Ce que le démarrage attendait auparavant avant de créer la moindre fenêtre
+        start = time.perf_counter()
+        ApplicationView(JournaledStorage(path).load()["applications"])
+        print(f"chargement synchrone de {NUM_APPLICATIONS} candidatures : {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        env = dict(os.environ, HOME=home)
+        print(f"{'lancement':>10} {'fenêtre':>10} {'1re page':>10} {'chargement':>12}")
+        for run in range(NUM_LAUNCHES):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--launch"], env=env, check=True, capture_output=True, text=True).stdout
+            window_ms, first_page_ms, loaded_ms = json.loads(output.splitlines()[-1])
+            label = "à froid" if run == 0 else f"{run + 1}"
+            print(f"{label:>10} {window_ms:>7.0f} ms {first_page_ms:>7.0f} ms {loaded_ms:>9.0f} ms")
+    finally:
+        shutil.rmtree(home)
+
+
+if __name__ == "__main__":
+    if "--launch" in sys.argv:
+        launch()
+    else:
+        main()
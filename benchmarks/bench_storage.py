@@ -0,0 +1,85 @@
+"""Comparer les moteurs de stockage JSON journalisé et SQLite à 1k, 10k et 100k candidatures."""
+import os
+import sys
+import json
+import shutil
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bench_keystrokes import generate_database
+from records import SORT_KEYS, Record
+from search_index import SearchIndex
+from storage import JournaledStorage
+from sqlite_storage import SqliteStorage
+
+SIZES = [1000, 10000, 100000]
+SEARCH_TEXT = "python"
+PAGE = 3
+ITEMS_PER_PAGE = 10
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def bench_json(directory, database):
+    path = os.path.join(directory, "applications.json")
+    with open(path, "w") as file:
+        json.dump(database, file)
+    storage = JournaledStorage(path)
+
+    # Chargement complet + construction de l'index de recherche
+    def load():
+        loaded = storage.load()
+        return loaded, SearchIndex(loaded["applications"])
+    load_ms, (loaded, index) = timed(load)
+
+    # Filtrage + tri + pagination comme dans update_application_list
+    def query():
+        filtered = sorted(index.search(SEARCH_TEXT), key=SORT_KEYS["application_date"])
+        return filtered[PAGE * ITEMS_PER_PAGE:(PAGE + 1) * ITEMS_PER_PAGE]
+    query_ms, _ = timed(query)
+
+    # Copie modifiée, comme dans le formulaire : la candidature en base ne change qu'à l'enregistrement (statistiques comprises)
+    current = next(iter(loaded["applications"]))
+    record = Record.from_dict(dict(current.to_dict(), status="Accepté"))
+    update_ms, _ = timed(lambda: storage.apply({"op": "update", "id": record.id, "record": record}, loaded))
+    return load_ms, query_ms, update_ms
+
+
+def bench_sqlite(directory, database):
+    storage = SqliteStorage(os.path.join(directory, "applications.db"))
+    storage.import_applications(database["applications"])
+    storage.close()
+
+    load_ms, loaded = timed(storage.load)
+    query_ms, _ = timed(lambda: storage.query(SEARCH_TEXT, "application_date", True, PAGE * ITEMS_PER_PAGE, ITEMS_PER_PAGE))
+
+    # Copie modifiée, comme dans le formulaire : la candidature en base ne change qu'à l'enregistrement (statistiques comprises)
+    current = next(iter(loaded["applications"]))
+    record = Record.from_dict(dict(current.to_dict(), status="Accepté"))
+    update_ms, _ = timed(lambda: storage.apply({"op": "update", "id": record.id, "record": record}, loaded))
+    storage.close()
+    return load_ms, query_ms, update_ms
+
+
+def main():
+    print(f"{'taille':>8} {'moteur':>7} {'chargement':>12} {'requête':>10} {'mise à jour':>12}")
+    for size in SIZES:
+        database = generate_database(size)
+        for name, bench in (("json", bench_json), ("sqlite", bench_sqlite)):
+            directory = tempfile.mkdtemp(prefix="jobgestion_bench_")
+            try:
+                load_ms, query_ms, update_ms = bench(directory, database)
+            finally:
+                shutil.rmtree(directory)
+            print(f"{size:>8} {name:>7} {load_ms:>9.1f} ms {query_ms:>7.1f} ms {update_ms:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Suite de benchmarks reproductible servant de garde-fou contre les régressions de performance.
+
+Sur une base synthétique (voir synthetic_data.py), chaque scénario appelle le code de l'application sans interface :
+load_applications, save_applications et record_change de job_gestion, construction de la vue en mémoire, puis
+recherche / tri / pagination comme le fait la liste de la page d'accueil. Le temps est la médiane de plusieurs
+exécutions ; une exécution supplémentaire sous tracemalloc mesure le pic mémoire et les blocs alloués conservés.
+
+Les résultats sont comparés à une référence enregistrée sur la même machine : le script se termine avec le code 1
+si un scénario dépasse la tolérance.
+
+    python benchmarks/bench_suite.py --sizes 1000,100000 --save-baseline   # enregistrer la référence
+    python benchmarks/bench_suite.py --sizes 1000,100000                    # comparer à la référence
+"""
+import gc
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from statistics import median
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from bench_keystrokes import keystrokes
+from synthetic_data import MAX_SIZE, MIN_SIZE, write_database
+
+# Référence propre à la machine qui l'a enregistrée : ignorée par git (voir .gitignore)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Nombre de frappes simulées par combinaison de tri dans le scénario de recherche
+NUM_KEYSTROKES = 60
+ITEMS_PER_PAGE = 10
+SORTS = [(None, True), ("application_date", True), ("application_date", False), ("status", True), ("status", False)]
+
+# Nombre de candidatures modifiées une à une dans le scénario record_change
+NUM_CHANGES = 200
+
+
+def filter_sort_paginate(view):
+    # Saisie d'une recherche, puis première, dernière et page du milieu, pour chaque tri proposé par l'interface
+    for sort_by, ascending in SORTS:
+        for text in keystrokes(NUM_KEYSTROKES):
+            total, _ = view.page(text, sort_by, ascending, 0, ITEMS_PER_PAGE)
+            last_page = max((total - 1) // ITEMS_PER_PAGE, 0)
+            for page in (last_page // 2, last_page):
+                view.page(text, sort_by, ascending, page * ITEMS_PER_PAGE, ITEMS_PER_PAGE)
+
+
+def change_statuses(app_module, database, view):
+    # Modifier le statut de candidatures, comme save_application : nouvel objet, journal puis vue en mémoire
+    applications = database["applications"]
+    ids = [record.id for _, record in zip(range(NUM_CHANGES), applications)]
+    for record_id in ids:
+        previous = applications.get(record_id)
+        record = app_module.Record.from_dict(dict(previous.to_dict(), status="Refusé" if previous.status != "Refusé" else "En attente"))
+        app_module.record_change(database, {"op": "update", "id": record_id, "record": record})
+        view.update(record)
+
+
+def scenarios(app_module):
+    """ (nom, préparation, mesure) : seule la mesure est chronométrée, elle reçoit le résultat de la préparation. """
+    from view_model import ApplicationView
+
+    def loaded():
+        return app_module.load_applications()
+
+    def loaded_with_view():
+        database = loaded()
+        return database, ApplicationView(database["applications"])
+
+    return [
+        ("load_applications", lambda: None, lambda _: app_module.load_applications()),
+        ("build_view", loaded, lambda database: ApplicationView(database["applications"])),
+        ("filter_sort_paginate", loaded_with_view, lambda state: filter_sort_paginate(state[1])),
+        ("save_applications", loaded, app_module.save_applications),
+        ("record_change", loaded_with_view, lambda state: change_statuses(app_module, *state)),
+    ]
+
+
+def measure(setup, run, repeat, trace_memory):
+    """ Temps médian (s) de `repeat` exécutions, puis pic mémoire (octets) et blocs conservés sous tracemalloc. """
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        start = time.perf_counter()
+        result = run(state)
+        times.append(time.perf_counter() - start)
+        del state, result
+    metrics = {"wall_s": median(times)}
+    if trace_memory:
+        state = setup()
+        gc.collect()
+        # Le résultat reste référencé jusqu'au second instantané, pour être compté dans les blocs conservés
+        retained = []
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        retained.append(run(state))
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        metrics["peak_bytes"] = peak
+        # Blocs alloués pendant le scénario et encore vivants à la fin (résultat compris)
+        metrics["blocks"] = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+        del state, retained, before, after
+    return metrics
+
+
+def environment():
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+
+
+def compare(metrics, reference, time_tolerance, memory_tolerance):
+    """ Écarts relatifs par métrique et indicateur de régression. """
+    deltas, regression = {}, False
+    for metric, tolerance in (("wall_s", time_tolerance), ("peak_bytes", memory_tolerance), ("blocks", memory_tolerance)):
+        if metric not in metrics or not reference.get(metric):
+            continue
+        deltas[metric] = metrics[metric] / reference[metric] - 1
+        regression |= deltas[metric] > tolerance
+    return deltas, regression
+
+
+def format_delta(deltas, metric):
+    return f"{deltas[metric]:+.0%}" if metric in deltas else ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesurer les chemins critiques de JobGestion et les comparer à une référence.")
+    parser.add_argument("--sizes", default="10000", help="tailles des bases, séparées par des virgules (par défaut 10000)")
+    parser.add_argument("--repeat", type=int, default=5, help="exécutions chronométrées par scénario (médiane)")
+    parser.add_argument("--seed", type=int, default=42, help="graine de la base synthétique")
+    parser.add_argument("--only", help="scénarios à exécuter, séparés par des virgules")
+    parser.add_argument("--no-memory", action="store_true", help="ne pas mesurer la mémoire (tracemalloc ralentit fortement les grandes bases)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="fichier de référence (benchmarks/baseline.json par défaut, ignoré par git : propre à la machine)")
+    parser.add_argument("--save-baseline", action="store_true", help="enregistrer les résultats comme nouvelle référence")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="hausse de temps tolérée (0.25 = 25 %%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="hausse de mémoire tolérée (0.10 = 10 %%)")
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    if any(not MIN_SIZE <= size <= MAX_SIZE for size in sizes):
+        parser.error(f"les tailles doivent être comprises entre {MIN_SIZE} et {MAX_SIZE}")
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("environment") != environment():
+            print(f"Attention : référence mesurée sur {baseline.get('environment')}, temps peu comparables.")
+
+    # Le stockage de l'application lit et écrit dans le répertoire de l'utilisateur : le rediriger vers un répertoire jetable
+    home = tempfile.mkdtemp(prefix="jobgestion_bench_")
+    os.environ["HOME"] = home
+    os.environ["JOBGESTION_STORAGE"] = "json"
+    import job_gestion
+
+    results = {}
+    regressions = []
+    print(f"{'scénario':<22}{'taille':>9}{'temps':>12}{'écart':>8}{'pic mémoire':>14}{'écart':>8}{'blocs':>11}{'écart':>8}")
+    try:
+        for size in sizes:
+            storage = job_gestion.storage
+            write_database(storage.json_path, size, args.seed)
+            if os.path.exists(storage.journal_path):
+                os.remove(storage.journal_path)
+            # Enregistrer la base une première fois : fichier au format de l'application (identifiants, statistiques)
+            job_gestion.save_applications(job_gestion.load_applications())
+            for name, setup, run in scenarios(job_gestion):
+                if args.only and name not in args.only.split(","):
+                    continue
+                metrics = measure(setup, run, args.repeat, not args.no_memory)
+                key = f"{name}@{size}"
+                results[key] = metrics
+                deltas, regression = compare(metrics, baseline.get("results", {}).get(key, {}), args.time_tolerance, args.memory_tolerance)
+                if regression:
+                    regressions.append(key)
+                peak = f"{metrics['peak_bytes'] / 1e6:.1f} Mo" if "peak_bytes" in metrics else "-"
+                blocks = f"{metrics['blocks']}" if "blocks" in metrics else "-"
+                print(f"{name:<22}{size:>9}{metrics['wall_s'] * 1000:>9.1f} ms{format_delta(deltas, 'wall_s'):>8}"
+                      f"{peak:>14}{format_delta(deltas, 'peak_bytes'):>8}{blocks:>11}{format_delta(deltas, 'blocks'):>8}"
+                      + ("  RÉGRESSION" if regression else ""))
+    finally:
+        shutil.rmtree(home)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump({"environment": environment(), "results": results}, file, indent=4)
+        print(f"Référence enregistrée dans {args.baseline}")
+        return 0
+    if not baseline:
+        print("Aucune référence : lancer avec --save-baseline pour en enregistrer une.")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} régression(s) : {', '.join(regressions)}")
+        return 1
+    print("Aucune régression.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
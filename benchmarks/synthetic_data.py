@@ -0,0 +1,125 @@
+"""Générer une base applications.json synthétique et reproductible, de 1 000 à 1 000 000 de candidatures.
+
+Les entreprises suivent une loi de Zipf (quelques grands recruteurs, beaucoup de petites entreprises), les dates
+mélangent les formats "%d-%m-%Y" et "%Y-%m-%d" (avec quelques dates invalides) et une partie des candidatures a de
+longs commentaires. Le fichier est écrit au fil de l'eau, sans construire la base entière en mémoire.
+
+    python benchmarks/synthetic_data.py 100000 -o /tmp/applications.json
+"""
+import os
+import sys
+import json
+import random
+import argparse
+from datetime import date, timedelta
+from itertools import accumulate
+
+MIN_SIZE = 1000
+MAX_SIZE = 1000000
+
+COMPANY_PREFIXES = ["Airbus", "Capgemini", "Dassault Systèmes", "Orange", "Thales", "Ubisoft", "Doctolib", "BlaBlaCar",
+                    "Criteo", "OVHcloud", "Société Générale", "BNP Paribas", "Decathlon", "Michelin", "Sopra Steria",
+                    "Atos", "Renault", "Leboncoin", "Back Market", "Qonto", "Alan", "Mirakl", "Contentsquare", "Datadog"]
+COMPANY_SUFFIXES = ["", " France", " Lyon", " Toulouse", " Nantes", " Digital", " Labs", " Services", " Consulting"]
+NUM_COMPANIES = 5000
+
+# Intitulés de poste et fréquence relative
+TITLES = [
+    ("Développeur Python", 20), ("Ingénieur logiciel", 18), ("Développeur full-stack", 14), ("Data scientist", 10),
+    ("Développeur front-end", 9), ("Ingénieur DevOps", 7), ("Chef de projet", 6), ("Data engineer", 6),
+    ("Administrateur système", 4), ("Architecte logiciel", 3), ("Product owner", 3), ("Ingénieur QA", 3),
+    ("Stage - Développeur Python", 2), ("Alternance - Ingénieur données", 2), ("Responsable technique", 1),
+]
+
+# Statuts et fréquence relative (la plupart des candidatures restent sans réponse)
+STATUSES = [("En attente", 70), ("Refusé", 24), ("Accepté", 6)]
+
+# Dates invalides ou vides, comme en contiennent les bases saisies à la main
+INVALID_DATES = ["", "bientôt", "31-02-2023", "2023/04/05"]
+
+WORDS = ("candidature envoyée via le site relance prévue entretien téléphonique avec le responsable technique équipe "
+         "de six personnes télétravail partiel possible salaire à négocier test technique en Python à rendre sous "
+         "une semaine contact recommandé par un ancien collègue poste basé à Paris déplacement occasionnel").split()
+
+
+def company_names(rng):
+    # Noms uniques, dans un ordre aléatoire mais reproductible
+    names = set()
+    while len(names) < NUM_COMPANIES:
+        names.add(f"{rng.choice(COMPANY_PREFIXES)}{rng.choice(COMPANY_SUFFIXES)} {rng.randrange(1000)}")
+    names = sorted(names)
+    rng.shuffle(names)
+    return names
+
+
+def weighted_picker(rng, choices):
+    # Tirage pondéré en O(log n) par candidature (poids cumulés calculés une seule fois)
+    values = [value for value, _ in choices]
+    cum_weights = list(accumulate(weight for _, weight in choices))
+    return lambda: rng.choices(values, cum_weights=cum_weights)[0]
+
+
+def comment(rng):
+    """ Un commentaire vide (la moitié du temps), court, ou long de plusieurs paragraphes. """
+    draw = rng.random()
+    if draw < 0.5:
+        return ""
+    paragraphs = 1 if draw < 0.85 else rng.randint(3, 8)
+    return "\n\n".join(" ".join(rng.choices(WORDS, k=rng.randint(8, 60))).capitalize() + "." for _ in range(paragraphs))
+
+
+def application_date(rng, start):
+    if rng.random() < 0.01:
+        return rng.choice(INVALID_DATES)
+    # Davantage de candidatures récentes que d'anciennes
+    day = start + timedelta(days=int(1825 * rng.random() ** 0.5))
+    return day.strftime("%d-%m-%Y" if rng.random() < 0.6 else "%Y-%m-%d")
+
+
+def generate_applications(count, seed=42):
+    """ Générer `count` candidatures (dictionnaires au format du fichier), une à une. """
+    rng = random.Random(seed)
+    companies = company_names(rng)
+    # Loi de Zipf : l'entreprise de rang k est choisie avec un poids 1/k
+    company = weighted_picker(rng, [(name, 1 / rank) for rank, name in enumerate(companies, 1)])
+    title = weighted_picker(rng, TITLES)
+    status = weighted_picker(rng, STATUSES)
+    start = date(2020, 1, 1)
+    for i in range(count):
+        yield {
+            "company_name": company(),
+            "job_title": title(),
+            "cover_letter_path": f"/Users/candidat/Documents/Candidatures/lettre_{i}.pdf",
+            "screenshot_path": f"/Users/candidat/Documents/Candidatures/capture_{i}.png" if rng.random() < 0.8 else "",
+            "application_date": application_date(rng, start),
+            "status": status(),
+            "comment": comment(rng),
+        }
+
+
+def write_database(path, count, seed=42):
+    """ Écrire un fichier applications.json de `count` candidatures. Retourne sa taille en octets. """
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('{\n    "applications": [')
+        for i, application in enumerate(generate_applications(count, seed)):
+            file.write(("\n        " if i == 0 else ",\n        ") + json.dumps(application, ensure_ascii=False))
+        file.write("\n    ]\n}\n")
+    return os.path.getsize(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Générer une base de candidatures synthétique.")
+    parser.add_argument("size", type=int, help=f"nombre de candidatures ({MIN_SIZE} à {MAX_SIZE})")
+    parser.add_argument("-o", "--output", default="applications.json", help="fichier à écrire (applications.json par défaut)")
+    parser.add_argument("--seed", type=int, default=42, help="graine du générateur (même graine, même base)")
+    args = parser.parse_args(argv)
+    if not MIN_SIZE <= args.size <= MAX_SIZE:
+        parser.error(f"la taille doit être comprise entre {MIN_SIZE} et {MAX_SIZE}")
+
+    size = write_database(args.output, args.size, args.seed)
+    print(f"{args.size} candidatures écrites dans {args.output} ({size / 1e6:.1f} Mo).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
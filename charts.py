@@ -0,0 +1,121 @@
+""" Graphique du tableau de bord, dessiné une seule fois avec PIL puis réutilisé (mémoire et disque) tant que les statistiques ne changent pas. """
+import os
+import glob
+from PIL import Image, ImageDraw, ImageFont
+from records import Status
+from thumbnails import cached_path, load_cached_photo
+
+# Taille du graphique, en pixels
+CHART_SIZE = (900, 320)
+
+# Nombre de mois affichés (les plus récents)
+MONTHS_SHOWN = 12
+
+BACKGROUND = "#333333"
+FOREGROUND = "#ffffff"
+BAR_COLOR = "#4a90d9"
+MARGIN = 20
+
+# Polices TrueType essayées dans l'ordre (macOS, Windows, Linux) ; la police par défaut de PIL n'a pas d'accents
+FONT_CANDIDATES = ("Helvetica.ttc", "Arial.ttf", "DejaVuSans.ttf")
+FONT_SIZE = 12
+
+
+def default_chart_dir():
+    """ Répertoire du cache disque du graphique. """
+    return os.path.join(os.path.expanduser("~"), ".jobgestion", "charts")
+
+
+def chart_font():
+    for name in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, FONT_SIZE)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def monthly_series(stats, months=MONTHS_SHOWN):
+    """ (mois, nombre de candidatures) des derniers mois, mois sans candidature compris, du plus ancien au plus récent. """
+    if not stats.by_month:
+        return []
+    year, month = (int(part) for part in max(stats.by_month).split("-"))
+    series = []
+    for _ in range(months):
+        key = f"{year:04d}-{month:02d}"
+        series.append((key, stats.by_month.get(key, 0)))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return series[::-1]
+
+
+def chart_data(stats):
+    """ Données affichées par le graphique : le graphique n'est redessiné que si elles changent. """
+    return tuple(monthly_series(stats)), tuple(stats.by_status.get(status.label, 0) for status in Status), CHART_SIZE
+
+
+def render_chart(data):
+    """ Dessiner la répartition des statuts et le nombre de candidatures par mois. """
+    series, status_counts, size = data
+    width, height = size
+    image = Image.new("RGB", size, BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    font = chart_font()
+
+    # Répartition des statuts : une barre empilée sur toute la largeur
+    draw.text((MARGIN, MARGIN), "Répartition des statuts", fill=FOREGROUND, font=font)
+    top = MARGIN + 18
+    total = sum(status_counts)
+    x = MARGIN
+    for status, count in zip(Status, status_counts):
+        if not total or not count:
+            continue
+        bar_width = (width - 2 * MARGIN) * count / total
+        draw.rectangle([x, top, x + bar_width, top + 24], fill=status.color)
+        label = f"{status.label} {count}"
+        if draw.textlength(label, font=font) + 8 < bar_width:
+            draw.text((x + 4, top + 6), label, fill=FOREGROUND, font=font)
+        x += bar_width
+
+    # Candidatures par mois
+    chart_top = top + 24 + 40
+    draw.text((MARGIN, chart_top - 22), "Candidatures par mois", fill=FOREGROUND, font=font)
+    base = height - MARGIN - 14
+    peak = max((count for _, count in series), default=0)
+    if series:
+        slot = (width - 2 * MARGIN) / len(series)
+        for i, (month_key, count) in enumerate(series):
+            left = MARGIN + i * slot + slot * 0.15
+            right = MARGIN + (i + 1) * slot - slot * 0.15
+            bar_height = (base - chart_top - 14) * count / peak if peak else 0
+            draw.rectangle([left, base - bar_height, right, base], fill=BAR_COLOR)
+            draw.text((left, base - bar_height - 16), str(count), fill=FOREGROUND, font=font)
+            year, month = month_key.split("-")
+            draw.text((left, base + 2), f"{month}/{year[2:]}", fill=FOREGROUND, font=font)
+    return image
+
+
+class ChartCache:
+    """ Fournit le graphique sous forme de PhotoImage, redessiné uniquement quand ses données changent. """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or default_chart_dir()
+        self._data = None
+        self._photo = None
+
+    def photo(self, stats):
+        data = chart_data(stats)
+        if data != self._data:
+            self._photo = load_cached_photo(data, self.cache_dir, lambda: self._render(data))
+            self._data = data
+        return self._photo
+
+    def _render(self, data):
+        # Un seul graphique est conservé sur disque : supprimer ceux des statistiques précédentes
+        current = cached_path(data, self.cache_dir)
+        for path in glob.glob(os.path.join(self.cache_dir, "*.png")):
+            if path != current:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return render_chart(data)
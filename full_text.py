@@ -0,0 +1,563 @@
+""" Recherche plein texte dans les commentaires et les lettres de motivation (PDF ou TXT), avec un index inversé persistant.
+
+Les textes sont découpés en mots sans accents ni majuscules ("Réponse" et "reponse" se confondent) ; les résultats
+sont classés par pertinence (BM25). Le texte des lettres est extrait par des threads de travail, une seule fois par
+version du fichier (date de modification et taille) : une recherche ne rouvre jamais aucun fichier.
+"""
+import os
+import re
+import sys
+import json
+import atexit
+import math
+import zlib
+import queue
+import threading
+import traceback
+import unicodedata
+from bisect import bisect_left
+from itertools import islice
+from collections import Counter
+import instrumentation
+from storage import write_atomically
+
+# Version du format du fichier d'index (un index d'une autre version est reconstruit)
+INDEX_VERSION = 1
+
+# Nombre de threads extrayant le texte des lettres
+EXTRACT_WORKERS = 2
+
+# Texte lu au plus dans une lettre, en caractères
+MAX_LETTER_CHARS = 1000000
+
+# Paramètres du classement BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Poids d'un mot du commentaire par rapport à un mot de la lettre
+COMMENT_WEIGHT = 2.0
+
+# Le dernier mot recherché est complété (recherche pendant la saisie) à partir de cette longueur
+PREFIX_MIN_LENGTH = 3
+# Nombre maximal de mots complétant le dernier mot recherché
+MAX_EXPANSIONS = 64
+
+# Nombre de recherches récentes conservées
+CACHE_SIZE = 32
+
+# Délai entre une modification de l'index et son enregistrement, en secondes : les modifications rapprochées sont
+# regroupées en un seul enregistrement (l'index est aussi enregistré à la sortie du programme)
+SAVE_DELAY_S = 30.0
+
+# Nombre d'entrées encodées à la fois lors de l'enregistrement : le thread de l'interface reprend la main entre deux lots
+SAVE_BATCH_SIZE = 1000
+
+# Mots trop fréquents pour être utiles, sans accents
+STOPWORDS = frozenset("""
+au aux avec ce ces dans de des du elle en et eux il ils je la le les leur lui ma mais me meme mes moi mon ne nos notre
+nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton tu un une vos votre vous est sont ete etre avoir
+a the and of to in for on with is are
+""".split())
+
+TOKEN = re.compile(r"\w+")
+
+
+def build_fold_table():
+    # Lettres latines accentuées -> lettres sans accent (NFKD puis suppression des diacritiques), ligatures développées
+    table = {ord("œ"): "oe", ord("æ"): "ae", ord("ß"): "ss"}
+    for code in range(0xC0, 0x250):
+        decomposed = unicodedata.normalize("NFKD", chr(code))
+        folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+        if folded != chr(code) and folded.isascii():
+            table[code] = folded
+    return table
+
+
+FOLD_TABLE = build_fold_table()
+
+
+def fold(text):
+    """ Texte en minuscules et sans accents. """
+    return text.lower().translate(FOLD_TABLE)
+
+
+def tokenize(text):
+    """ Mots d'un texte (sans accents, sans mots vides, d'au moins deux caractères), dans l'ordre. """
+    return [word for word in TOKEN.findall(fold(text)) if len(word) > 1 and word not in STOPWORDS]
+
+
+def term_counts(text):
+    return Counter(tokenize(text)) if text else {}
+
+
+def extract_text(path):
+    """ Texte d'une lettre TXT ou PDF, ou None si le format n'est pas pris en charge.
+
+    La lecture des PDF utilise pypdf, s'il est installé.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".txt":
+        with open(path, "rb") as file:
+            data = file.read(MAX_LETTER_CHARS * 4)
+        try:
+            return data.decode("utf-8")[:MAX_LETTER_CHARS]
+        except UnicodeDecodeError:
+            return data.decode("latin-1")[:MAX_LETTER_CHARS]
+    if extension == ".pdf":
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            return None
+        parts, size = [], 0
+        for page in PdfReader(path).pages:
+            text = page.extract_text() or ""
+            parts.append(text)
+            size += len(text)
+            if size >= MAX_LETTER_CHARS:
+                break
+        return "\n".join(parts)[:MAX_LETTER_CHARS]
+    return None
+
+
+def letter_version(path):
+    """ (date de modification en ns, taille) du fichier, ou None s'il n'existe pas. """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def default_index_path():
+    """ Fichier de l'index plein texte, dans le répertoire de l'utilisateur. """
+    return os.path.join(os.path.expanduser("~"), ".jobgestion", "fulltext.json")
+
+
+class InvertedIndex:
+    """ Index inversé : mot -> {document: nombre d'occurrences}, avec la longueur des documents pour BM25. """
+
+    def __init__(self):
+        self.postings = {}
+        self.lengths = {}  # Document -> nombre de mots
+        self.terms = {}  # Document -> ses mots (pour le retirer de l'index)
+        self.total_length = 0
+        # Document -> terme de normalisation BM25 (dépend de la longueur moyenne), recalculé après modification
+        self._norms = None
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def add(self, document, counts):
+        """ Indexer (ou réindexer) un document à partir du nombre d'occurrences de chacun de ses mots. """
+        self.remove(document)
+        if not counts:
+            return
+        for term, count in counts.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+            posting[document] = count
+        length = sum(counts.values())
+        self.lengths[document] = length
+        self.terms[document] = tuple(counts)
+        self.total_length += length
+        self._norms = None
+
+    def remove(self, document):
+        terms = self.terms.pop(document, None)
+        if terms is None:
+            return
+        self.total_length -= self.lengths.pop(document)
+        self._norms = None
+        for term in terms:
+            posting = self.postings[term]
+            del posting[document]
+            if not posting:
+                del self.postings[term]
+
+    def scores(self, term, weight=1.0):
+        """ Score BM25 (multiplié par `weight`) de chaque document contenant le mot. """
+        posting = self.postings.get(term)
+        if not posting:
+            return {}
+        if self._norms is None:
+            average = self.total_length / len(self.lengths)
+            self._norms = {document: BM25_K1 * (1 - BM25_B + BM25_B * length / average) for document, length in self.lengths.items()}
+        norms = self._norms
+        factor = weight * (BM25_K1 + 1) * math.log(1 + (len(self.lengths) - len(posting) + 0.5) / (len(posting) + 0.5))
+        return {document: factor * occurrences / (occurrences + norms[document]) for document, occurrences in posting.items()}
+
+    def to_dict(self):
+        return self.postings
+
+    @classmethod
+    def from_dict(cls, postings, document_type=str):
+        """ Reconstruire l'index (longueurs et mots de chaque document) depuis ses listes d'occurrences. """
+        index = cls()
+        counts = {}
+        for term, posting in postings.items():
+            converted = {}
+            for document, count in posting.items():
+                document = document_type(document)
+                converted[document] = count
+                counts.setdefault(document, {})[term] = count
+            index.postings[term] = converted
+        for document, document_counts in counts.items():
+            length = sum(document_counts.values())
+            index.lengths[document] = length
+            index.terms[document] = tuple(document_counts)
+            index.total_length += length
+        return index
+
+
+def write_object(file, mapping, encode):
+    # Objet JSON écrit par lots d'entrées (clés converties en texte, comme json.dump)
+    file.write("{")
+    items = iter(mapping.items())
+    separator = ""
+    while True:
+        batch = list(islice(items, SAVE_BATCH_SIZE))
+        if not batch:
+            break
+        file.write(separator + ",".join(f"{encode(str(key))}:{encode(value)}" for key, value in batch))
+        separator = ","
+    file.write("}")
+
+
+def write_index(file, records, letter_versions, comment_postings, letter_postings):
+    """ Écrire le fichier d'index par petits lots d'entrées. """
+    encode = json.JSONEncoder().encode
+    file.write(f'{{"version": {INDEX_VERSION}, "records": ')
+    write_object(file, records, encode)
+    file.write(', "letters": ')
+    write_object(file, letter_versions, encode)
+    for key, postings in (("comment_postings", comment_postings), ("letter_postings", letter_postings)):
+        file.write(f', "{key}": {{')
+        for position, (term, posting) in enumerate(postings.items()):
+            file.write(("," if position else "") + encode(term) + ":")
+            write_object(file, posting, encode)
+        file.write("}")
+    file.write("}\n")
+
+
+class FullTextIndex:
+    """ Index plein texte des candidatures, partagé entre le thread de l'interface et des threads de travail.
+
+    `start(applications)` charge l'index enregistré puis le met à jour en arrière-plan (commentaires modifiés, lettres
+    dont le fichier a changé) ; `update` et `remove` suivent ensuite les modifications faites dans l'application.
+    """
+
+    def __init__(self, path=None, workers=EXTRACT_WORKERS):
+        self.path = path or default_index_path()
+        self.lock = threading.RLock()
+        self.comments = InvertedIndex()  # Document : identifiant de la candidature
+        self.letters = InvertedIndex()  # Document : chemin de la lettre
+        self._records = {}  # Identifiant -> (somme de contrôle du commentaire, chemin de la lettre)
+        self._ids_by_letter = {}  # Chemin de la lettre -> identifiants des candidatures qui la citent
+        self._letter_versions = {}  # Chemin de la lettre -> (date de modification en ns, taille) de la version indexée
+        self._vocabulary = None  # Mots triés, pour compléter le dernier mot recherché
+        self._cache = {}
+        self._ready = False
+        self._early_changes = []  # Modifications reçues avant la fin de start(), rejouées ensuite
+        self._queued_letters = set()
+        self._pending_tasks = 0
+        self._dirty = False
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        self.save_delay = SAVE_DELAY_S
+        # Enregistrer à la sortie les modifications encore en attente
+        atexit.register(self.save_if_dirty)
+        self._tasks = queue.Queue()
+        # Threads démons : des lettres encore en attente d'extraction ne bloquent pas la sortie du programme
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"plein-texte-{i}", daemon=True).start()
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def start(self, applications):
+        """ Charger l'index enregistré puis le synchroniser avec les candidatures, en arrière-plan.
+
+        `applications` est parcouru dans un thread de travail : passer une copie si la base peut changer entre-temps.
+        """
+        self._submit(lambda: self._start(applications))
+
+    def update(self, record):
+        """ Indexer une candidature ajoutée ou modifiée (la lettre est relue en arrière-plan si besoin). """
+        with self.lock:
+            if not self._ready:
+                self._early_changes.append(("update", record))
+                return
+            self._index_record(record)
+            path = record.cover_letter_path
+        if path:
+            self._queue_letter(path)
+
+    def remove(self, record_id):
+        with self.lock:
+            if not self._ready:
+                self._early_changes.append(("remove", record_id))
+                return
+            self._remove_record(record_id)
+
+    @instrumentation.timed("full_text.search")
+    def search(self, text):
+        """ Identifiants des candidatures dont le commentaire ou la lettre contient tous les mots, les plus pertinentes d'abord.
+
+        La liste retournée est partagée avec le cache : elle ne doit pas être modifiée par l'appelant.
+        """
+        # Mots distincts, dans l'ordre de saisie
+        terms = list(dict.fromkeys(tokenize(text)))
+        if not terms:
+            return []
+        with self.lock:
+            key = tuple(terms)
+            results = self._cache.get(key)
+            if results is not None:
+                return results
+
+            scores = None
+            for position, term in enumerate(terms):
+                if position == len(terms) - 1 and len(term) >= PREFIX_MIN_LENGTH:
+                    expansions = self._expand(term)
+                else:
+                    expansions = (term,)
+                term_scores = self._term_scores(expansions)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    # Ne garder que les candidatures contenant aussi ce mot, en parcourant le plus petit ensemble
+                    if len(term_scores) < len(scores):
+                        scores, term_scores = term_scores, scores
+                    scores = {record_id: score + term_scores[record_id] for record_id, score in scores.items() if record_id in term_scores}
+                if not scores:
+                    break
+            results = sorted(scores, key=scores.__getitem__, reverse=True)
+
+            if len(self._cache) >= CACHE_SIZE:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = results
+            return results
+
+    def save(self):
+        """ Enregistrer l'index (écriture atomique).
+
+        Le verrou n'est gardé que le temps de copier l'index ; l'encodage, par petits lots, laisse le thread de
+        l'interface s'exécuter entre deux lots (un seul appel à json.dumps le bloquerait, GIL compris).
+        """
+        with self._save_lock:
+            with self.lock:
+                records = dict(self._records)
+                letter_versions = dict(self._letter_versions)
+                comment_postings = {term: dict(posting) for term, posting in self.comments.postings.items()}
+                letter_postings = {term: dict(posting) for term, posting in self.letters.postings.items()}
+                self._dirty = False
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            write_atomically(self.path, lambda file: write_index(file, records, letter_versions, comment_postings, letter_postings))
+
+    def save_if_dirty(self):
+        """ Enregistrer l'index s'il a changé depuis le dernier enregistrement. """
+        with self.lock:
+            self._save_timer = None
+            dirty = self._dirty
+        if dirty:
+            try:
+                self.save()
+            except OSError as e:
+                print(f"Impossible d'enregistrer l'index plein texte : {e}", file=sys.stderr)
+
+    def _schedule_save(self):
+        # Un seul enregistrement en attente : les modifications suivantes seront enregistrées avec lui
+        with self.lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay, self.save_if_dirty)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _term_scores(self, terms):
+        # Score de chaque candidature pour un mot (ou ses complétions) : commentaire pondéré + lettre
+        scores = None
+        for term in terms:
+            for partial in (self.comments.scores(term, COMMENT_WEIGHT), self._letter_scores(term)):
+                if not partial:
+                    continue
+                if scores is None:
+                    scores = partial
+                    continue
+                for record_id, score in partial.items():
+                    scores[record_id] = scores.get(record_id, 0.0) + score
+        return scores or {}
+
+    def _letter_scores(self, term):
+        # Le score d'une lettre revient à chacune des candidatures qui la citent
+        scores = {}
+        for path, score in self.letters.scores(term).items():
+            for record_id in self._ids_by_letter.get(path, ()):
+                scores[record_id] = scores.get(record_id, 0.0) + score
+        return scores
+
+    def _expand(self, prefix):
+        # Mots de l'index commençant par le préfixe (le préfixe lui-même en premier s'il est un mot de l'index)
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.comments.postings.keys() | self.letters.postings.keys())
+        vocabulary = self._vocabulary
+        expansions = []
+        i = bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix) and len(expansions) < MAX_EXPANSIONS:
+            expansions.append(vocabulary[i])
+            i += 1
+        return expansions
+
+    def _changed(self):
+        # À appeler sous le verrou après toute modification de l'index
+        self._cache.clear()
+        self._vocabulary = None
+        self._dirty = True
+
+    def _index_record(self, record):
+        # Réindexer le commentaire s'il a changé et rattacher la candidature à sa lettre (sous le verrou)
+        comment = record.comment or ""
+        checksum = zlib.crc32(comment.encode("utf-8"))
+        path = record.cover_letter_path
+        previous = self._records.get(record.id)
+        if previous == (checksum, path):
+            return
+        if previous is None or previous[0] != checksum:
+            self.comments.add(record.id, term_counts(comment))
+        if previous is None or previous[1] != path:
+            if previous is not None:
+                self._unlink_letter(record.id, previous[1])
+            if path:
+                self._ids_by_letter.setdefault(path, set()).add(record.id)
+        self._records[record.id] = (checksum, path)
+        self._changed()
+
+    def _remove_record(self, record_id):
+        previous = self._records.pop(record_id, None)
+        if previous is None:
+            return
+        self.comments.remove(record_id)
+        self._unlink_letter(record_id, previous[1])
+        self._changed()
+
+    def _unlink_letter(self, record_id, path):
+        # Oublier une lettre qui n'est plus citée par aucune candidature
+        ids = self._ids_by_letter.get(path)
+        if ids is None:
+            return
+        ids.discard(record_id)
+        if not ids:
+            del self._ids_by_letter[path]
+            self.letters.remove(path)
+            self._letter_versions.pop(path, None)
+
+    def _start(self, applications):
+        # Exécuté dans un thread de travail
+        try:
+            self._load()
+            seen = set()
+            for record in applications:
+                seen.add(record.id)
+                with self.lock:
+                    self._index_record(record)
+            with self.lock:
+                for record_id in self._records.keys() - seen:
+                    self._remove_record(record_id)
+                letters = list(self._ids_by_letter)
+            # Relire (dans les threads de travail) les lettres modifiées depuis l'enregistrement de l'index
+            for path in letters:
+                if letter_version(path) != self._letter_versions.get(path):
+                    self._queue_letter(path)
+        finally:
+            with self.lock:
+                self._ready = True
+                changes, self._early_changes = self._early_changes, []
+        for op, value in changes:
+            if op == "update":
+                self.update(value)
+            else:
+                self.remove(value)
+
+    def _load(self):
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+            if data.get("version") != INDEX_VERSION:
+                return
+            records = {int(record_id): tuple(value) for record_id, value in data["records"].items()}
+            letter_versions = {path: tuple(version) for path, version in data["letters"].items()}
+            comments = InvertedIndex.from_dict(data["comment_postings"], int)
+            letters = InvertedIndex.from_dict(data["letter_postings"])
+        except (OSError, ValueError, KeyError, TypeError):
+            # Index absent ou illisible : il est reconstruit
+            return
+        ids_by_letter = {}
+        for record_id, (_, path) in records.items():
+            if path:
+                ids_by_letter.setdefault(path, set()).add(record_id)
+        with self.lock:
+            self._records, self._letter_versions, self._ids_by_letter = records, letter_versions, ids_by_letter
+            self.comments, self.letters = comments, letters
+            self._cache.clear()
+            self._vocabulary = None
+
+    def _queue_letter(self, path):
+        with self.lock:
+            if path in self._queued_letters:
+                return
+            self._queued_letters.add(path)
+        self._submit(lambda: self._refresh_letter(path))
+
+    def _refresh_letter(self, path):
+        # Exécuté dans un thread de travail : extraire le texte si le fichier a changé depuis son indexation
+        with self.lock:
+            self._queued_letters.discard(path)
+        version = letter_version(path)
+        with self.lock:
+            if path not in self._ids_by_letter or version == self._letter_versions.get(path):
+                return
+            if version is None:
+                # Fichier supprimé ou déplacé
+                self.letters.remove(path)
+                self._letter_versions.pop(path, None)
+                self._changed()
+                return
+        try:
+            with instrumentation.timer("full_text.extract"):
+                text = extract_text(path)
+        except Exception:
+            # Fichier illisible : il est retenté lorsqu'il change
+            text = ""
+        if text is None:
+            # Format non pris en charge (ou pypdf absent) : rien à indexer, sans mémoriser la version
+            return
+        counts = term_counts(text)
+        with self.lock:
+            if path in self._ids_by_letter:
+                self.letters.add(path, counts)
+                self._letter_versions[path] = version
+                self._changed()
+
+    def _submit(self, task):
+        with self.lock:
+            self._pending_tasks += 1
+        self._tasks.put(task)
+
+    def _work(self):
+        while True:
+            task = self._tasks.get()
+            try:
+                task()
+            except Exception:
+                # Une candidature ou une lettre en erreur ne doit pas arrêter le thread : les tâches suivantes continuent
+                print("Erreur de l'index plein texte :", file=sys.stderr)
+                traceback.print_exc()
+            finally:
+                with self.lock:
+                    self._pending_tasks -= 1
+                    idle = not self._pending_tasks and self._dirty and self._ready
+            # Enregistrer l'index (après un délai) une fois le travail en attente terminé
+            if idle:
+                self._schedule_save()
@@ -0,0 +1,143 @@
+""" Importer ou exporter les candidatures en masse (CSV ou NDJSON), sans interface graphique. """
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from records import FIELDS, Record
+from storage import open_storage
+
+# Colonnes des fichiers CSV exportés (les champs supplémentaires ne sont conservés qu'en NDJSON)
+CSV_COLUMNS = ("id",) + FIELDS
+
+# Champs obligatoires d'une candidature importée. Le formulaire de l'application exige aussi la lettre de motivation
+# et le screenshot ; à l'import ils restent facultatifs, les fichiers d'un tableur n'ayant en général pas ces chemins
+REQUIRED_FIELDS = ("company_name", "job_title")
+
+
+def guess_format(path):
+    """ Format d'un fichier d'après son extension. """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    raise ValueError(f"Format inconnu pour {path} (utilisez --format csv ou --format ndjson).")
+
+
+def check_header(columns):
+    # En-tête CSV : uniquement des colonnes connues, dont les champs obligatoires
+    unknown = [column for column in columns if column not in CSV_COLUMNS]
+    missing = [field for field in REQUIRED_FIELDS if field not in columns]
+    if unknown or missing:
+        hint = " (fichier séparé par des points-virgules ? Seule la virgule est acceptée)" if any(";" in column for column in unknown) else ""
+        raise ValueError(f"En-tête CSV invalide{hint} : colonnes inconnues {unknown}, colonnes manquantes {missing}. "
+                         f"Colonnes acceptées : {', '.join(CSV_COLUMNS)}.")
+
+
+def check_required(data, line_number):
+    missing = [field for field in REQUIRED_FIELDS if not str(data.get(field) or "").strip()]
+    if missing:
+        raise ValueError(f"Ligne {line_number} : champ(s) obligatoire(s) vide(s) : {', '.join(missing)}")
+
+
+def read_applications(file, file_format):
+    """ Lire les candidatures une à une, sans charger tout le fichier. Les identifiants du fichier sont ignorés.
+
+    Lève ValueError (avec le numéro de ligne) pour un fichier mal formé ou une candidature sans entreprise ou poste.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(file)
+        if reader.fieldnames is None:
+            return
+        check_header(reader.fieldnames)
+        for row in reader:
+            # Les cellules manquantes (None) prennent la valeur par défaut du champ
+            data = {key: value for key, value in row.items() if key not in (None, "id") and value is not None}
+            check_required(data, reader.line_num)
+            yield Record.from_dict(data)
+    else:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Ligne {line_number} invalide : {e}")
+            if not isinstance(data, dict):
+                raise ValueError(f"Ligne {line_number} invalide : objet JSON attendu, {type(data).__name__} trouvé")
+            data.pop("id", None)
+            check_required(data, line_number)
+            yield Record.from_dict(data)
+
+
+def write_applications(file, applications, file_format):
+    """ Écrire les candidatures une à une. Retourne le nombre de candidatures écrites. """
+    count = 0
+    if file_format == "csv":
+        writer = csv.DictWriter(file, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for record in applications:
+            writer.writerow(record.to_dict())
+            count += 1
+    else:
+        for record in applications:
+            file.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def open_file(path, mode):
+    # "-" désigne l'entrée ou la sortie standard. En lecture, "utf-8-sig" ignore l'indicateur d'ordre des octets (BOM)
+    # ajouté par Excel en tête des fichiers CSV UTF-8
+    encoding = "utf-8-sig" if mode == "r" else "utf-8"
+    if path == "-":
+        return os.fdopen(os.dup((sys.stdin if mode == "r" else sys.stdout).fileno()), mode, newline="", encoding=encoding)
+    return open(path, mode, newline="", encoding=encoding)
+
+
+def import_file(storage, path, file_format):
+    """ Ajouter au stockage toutes les candidatures du fichier, en une seule écriture. Retourne le nombre importé. """
+    with open_file(path, "r") as file:
+        return storage.import_applications(read_applications(file, file_format))
+
+
+def export_file(storage, path, file_format):
+    """ Écrire toutes les candidatures du stockage dans le fichier. Retourne le nombre exporté. """
+    with open_file(path, "w") as file:
+        return write_applications(file, storage.load()["applications"], file_format)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importer ou exporter les candidatures en CSV ou NDJSON.")
+    parser.add_argument("action", choices=("import", "export"), help="importer un fichier dans le stockage ou exporter le stockage dans un fichier")
+    parser.add_argument("path", help="fichier à lire ou à écrire (- pour l'entrée ou la sortie standard)")
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="format du fichier (déduit de l'extension par défaut)")
+    parser.add_argument("--storage", choices=("json", "sqlite"), help="moteur de stockage (par défaut celui de JOBGESTION_STORAGE, sinon json)")
+    args = parser.parse_args(argv)
+
+    storage = open_storage(args.storage)
+    start = time.perf_counter()
+    try:
+        file_format = args.format or guess_format(args.path)
+        if args.action == "import":
+            count = import_file(storage, args.path, file_format)
+        else:
+            count = export_file(storage, args.path, file_format)
+    except (OSError, ValueError) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    finally:
+        storage.close()
+    elapsed = time.perf_counter() - start
+
+    # Le rapport va sur la sortie d'erreur si la sortie standard reçoit l'export
+    report = sys.stderr if args.path == "-" else sys.stdout
+    verb = "importées" if args.action == "import" else "exportées"
+    print(f"{count} candidatures {verb} en {elapsed:.2f} s ({count / max(elapsed, 1e-9):.0f} par seconde).", file=report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+""" Instrumentation optionnelle : histogrammes de durées, trace JSON et profil cProfile écrits à la sortie du programme.
+
+Désactivée par défaut (les mesures ne coûtent alors qu'un test) ; activée par la variable d'environnement
+JOBGESTION_PROFILE ("1", ou "cprofile" pour ajouter le profil cProfile) ou par les options --profile / --cprofile.
+"""
+import os
+import sys
+import json
+import math
+import time
+import atexit
+import cProfile
+import threading
+from datetime import datetime
+from functools import wraps
+from contextlib import contextmanager
+
+# Variables d'environnement : activation de l'instrumentation et répertoire des fichiers écrits à la sortie
+PROFILE_ENV_VAR = "JOBGESTION_PROFILE"
+PROFILE_DIR_ENV_VAR = "JOBGESTION_PROFILE_DIR"
+
+# Subdivisions de chaque puissance de deux dans les histogrammes (précision d'environ 19 %)
+BUCKETS_PER_OCTAVE = 4
+
+# Nombre maximal d'événements conservés pour la trace JSON
+MAX_TRACE_EVENTS = 100000
+
+enabled = False
+histograms = {}  # Nom de la mesure -> Histogram
+_trace = []  # (nom, début, durée, thread) pour la trace JSON
+_lock = threading.Lock()
+_profiler = None
+_output_dir = None
+_origin = time.perf_counter()
+
+
+class Histogram:
+    """ Histogramme de durées à échelle logarithmique : mémoire constante, centiles approchés. """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = {}  # Numéro de classe -> nombre de mesures
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        bucket = math.floor(math.log2(max(seconds, 1e-9)) * BUCKETS_PER_OCTAVE)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        """ Centile approché (borne supérieure de la classe, sans dépasser le maximum observé), en secondes. """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "min_s": self.min if self.count else 0.0,
+            "max_s": self.max,
+            "p50_s": self.percentile(0.5),
+            "p90_s": self.percentile(0.9),
+            "p99_s": self.percentile(0.99),
+            # Borne supérieure de chaque classe (en secondes) -> nombre de mesures
+            "buckets": {f"{2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE):.3g}": count for bucket, count in sorted(self.buckets.items())},
+        }
+
+
+def default_output_dir():
+    """ Répertoire des mesures d'une exécution, dans le répertoire de l'utilisateur. """
+    return os.path.join(os.path.expanduser("~"), ".jobgestion", "profiles", datetime.now().strftime("%Y%m%d-%H%M%S"))
+
+
+def enable(cprofile=False, output_dir=None):
+    """ Activer les mesures (et le profil cProfile du thread principal) ; les fichiers sont écrits à la sortie. """
+    global enabled, _profiler, _output_dir
+    if enabled and (_profiler is not None or not cprofile):
+        return
+    _output_dir = output_dir or os.environ.get(PROFILE_DIR_ENV_VAR) or _output_dir or default_output_dir()
+    if cprofile and _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    if not enabled:
+        enabled = True
+        atexit.register(dump_on_exit)
+
+
+def enable_from_environment():
+    value = os.environ.get(PROFILE_ENV_VAR, "")
+    if value and value != "0":
+        enable(cprofile=value == "cprofile")
+
+
+def record(name, seconds, start=None):
+    """ Ajouter une durée (en secondes) à l'histogramme de la mesure. Peut être appelée depuis n'importe quel thread. """
+    if not enabled:
+        return
+    with _lock:
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = Histogram()
+        histogram.add(seconds)
+        if len(_trace) < MAX_TRACE_EVENTS:
+            _trace.append((name, time.perf_counter() - seconds if start is None else start, seconds, threading.get_ident()))
+
+
+@contextmanager
+def timer(name):
+    """ Mesurer la durée du bloc. """
+    if not enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, start)
+
+
+def timed(name):
+    """ Décorateur mesurant chaque appel de la fonction. """
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start, start)
+        return wrapper
+    return decorate
+
+
+def summary():
+    """ (nom, nombre, p50, p99, maximum) de chaque mesure, triées par nom ; durées en secondes. """
+    with _lock:
+        return [(name, histogram.count, histogram.percentile(0.5), histogram.percentile(0.99), histogram.max)
+                for name, histogram in sorted(histograms.items())]
+
+
+def format_summary():
+    """ Tableau texte des mesures, en millisecondes. """
+    lines = [f"{'mesure':<34}{'n':>7}{'p50':>9}{'p99':>9}{'max':>9}"]
+    for name, count, p50, p99, maximum in summary():
+        lines.append(f"{name[:33]:<34}{count:>7}{p50 * 1000:>9.2f}{p99 * 1000:>9.2f}{maximum * 1000:>9.2f}")
+    return "\n".join(lines)
+
+
+def dump(output_dir=None):
+    """ Écrire timings.json (histogrammes), trace.json (format Chrome / Perfetto) et profile.prof (cProfile). Retourne le répertoire. """
+    directory = output_dir or _output_dir or default_output_dir()
+    os.makedirs(directory, exist_ok=True)
+    with _lock:
+        timings = {name: histogram.to_dict() for name, histogram in sorted(histograms.items())}
+        events = list(_trace)
+    with open(os.path.join(directory, "timings.json"), "w") as file:
+        json.dump(timings, file, indent=4)
+
+    pid = os.getpid()
+    trace = {
+        "displayTimeUnit": "ms",
+        "traceEvents": [{"name": name, "ph": "X", "ts": (start - _origin) * 1e6, "dur": seconds * 1e6, "pid": pid, "tid": thread}
+                        for name, start, seconds, thread in events],
+    }
+    with open(os.path.join(directory, "trace.json"), "w") as file:
+        json.dump(trace, file)
+
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(os.path.join(directory, "profile.prof"))
+        _profiler.enable()
+    return directory
+
+
+def dump_on_exit():
+    try:
+        directory = dump()
+    except OSError as e:
+        print(f"Impossible d'enregistrer les mesures : {e}", file=sys.stderr)
+        return
+    print(f"Mesures enregistrées dans {directory}", file=sys.stderr)
+
+
+# Les scripts (import_export.py, benchmarks) sont instrumentés par la seule variable d'environnement
+enable_from_environment()
@@ -1,10 +1,21 @@
 import os
 import sys
-import json
+import time
+import argparse
 from datetime import datetime
 import tkinter as tk
 from tkinter import messagebox, filedialog, ttk
-from PIL import Image, ImageTk
+import instrumentation
+from background_loader import BackgroundLoader
+from charts import ChartCache
+from full_text import FullTextIndex
+from records import FIELDS, SORT_KEYS, Applications, Record, Status
+from search_pipeline import SearchPipeline, DEFAULT_DELAY_MS
+from storage import STATISTICS_KEY, open_storage
+from thumbnails import ThumbnailCache, load_icon
+from timing_overlay import TimingOverlay
+from view_model import ApplicationView
+from virtual_list import VirtualList
 
 # Fonction pour obtenir le chemin du fichier ressource
 def resource_path(relative_path):
@@ -17,30 +28,43 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
-# Fonction pour sauvegarder les candidatures dans un fichier JSON
+# Nombre de lignes des tableaux de la page des statistiques
+STATS_ROWS = 10
+
+# Intervalle de vérification des modifications faites par une autre instance (ou un script), en millisecondes
+WATCH_MS = 1000
+
+# Stockage des candidatures dans le répertoire de l'utilisateur (JSON journalisé par défaut, SQLite en option)
+storage = open_storage(compact_in_background=True)
+
+# Fonction pour sauvegarder toutes les candidatures dans un fichier JSON
+@instrumentation.timed("save_applications")
 def save_applications(database):
     try:
-        # Enregistrer dans le répertoire de l'utilisateur
-        json_path = os.path.join(os.path.expanduser("~"), "applications.json")
-        # Ouvrir le fichier JSON en mode écriture pour y sauvegarder les candidatures
-        with open(json_path, "w") as file:
-            json.dump(database, file, indent=4)
+        # Réécrire toutes les candidatures (de façon atomique) et vider le journal
+        storage.compact(database)
     except Exception as e:
         # En cas d'erreur, afficher un message d'erreur à l'utilisateur
         messagebox.showerror("Erreur", f"Erreur lors de la sauvegarde des candidatures : {e}")
 
+# Fonction pour appliquer et enregistrer une seule modification (ajout, mise à jour ou suppression)
+@instrumentation.timed("record_change")
+def record_change(database, change):
+    try:
+        # Appliquer la modification à la base puis l'enregistrer (journal JSON ou transaction SQLite) ;
+        # retourne la candidature enregistrée, éventuellement fusionnée avec les modifications d'une autre instance,
+        # ou None si la modification n'avait plus d'objet (candidature déjà supprimée par une autre instance)
+        return storage.apply(change, database)
+    except Exception as e:
+        # En cas d'erreur, afficher un message d'erreur à l'utilisateur et retourner False
+        messagebox.showerror("Erreur", f"Erreur lors de la sauvegarde des candidatures : {e}")
+        return False
+
 # Fonction pour lire les candidatures sauvegardées
+@instrumentation.timed("load_applications")
 def load_applications():
-    # Charger depuis le répertoire de l'utilisateur
-    json_path = os.path.join(os.path.expanduser("~"), "applications.json")
-    # Vérifier si le fichier JSON existe
-    if os.path.exists(json_path):
-        # Si oui, ouvrir le fichier et charger les candidatures
-        with open(json_path, "r") as file:
-            return json.load(file)
-    else:
-        # Sinon, retourner une base de données vide
-        return {"applications": []}
+    # Charger les candidatures depuis le stockage (avec SQLite, elles sont lues à la demande)
+    return storage.load()
 
 # Interface utilisateur avec navigation entre les pages
 class JobApplicationApp:
@@ -50,15 +74,28 @@ class JobApplicationApp:
         self.root.title("JobGestion")
         self.root.geometry("1200x800")  # Définir la taille initiale de la fenêtre pour afficher toutes les colonnes
         self.root.minsize(1200, 800)  # Définir la taille minimale de la fenêtre
-        self.database = load_applications()  # Charger les candidatures existantes
+        if storage.supports_queries:
+            # Avec SQLite, les candidatures sont lues à la demande : rien à charger à l'avance
+            self.database = load_applications()
+            self.loaded = True
+        else:
+            # Le fichier JSON est lu en arrière-plan (voir start_loading) : la fenêtre s'affiche immédiatement
+            self.database = {"applications": Applications()}
+            self.loaded = False
+        # Erreur du dernier chargement, s'il a échoué (voir on_load_error)
+        self.load_error = None
+        # Indexer et trier les candidatures en mémoire (inutile si le stockage fait lui-même les requêtes)
+        self.application_view = None if storage.supports_queries else ApplicationView(self.database["applications"])
+        # Les modifications enregistrées, par cette instance ou par une autre, sont reportées dans la vue et l'index
+        storage.listeners.append(self.on_storage_changes)
+        # Dernière erreur de lecture des modifications d'une autre instance (voir watch_storage)
+        self.watch_error = None
 
         # Charger le logo
         logo_path = resource_path("app_logo.png")
         if os.path.exists(logo_path):
-            # Si le fichier logo existe, le charger et le redimensionner
-            self.logo_image = Image.open(logo_path)
-            self.logo_image = self.logo_image.resize((100, 100), Image.LANCZOS)
-            self.logo_photo = ImageTk.PhotoImage(self.logo_image)
+            # Si le fichier logo existe, le charger redimensionné (la version redimensionnée est mise en cache)
+            self.logo_photo = load_icon(logo_path, (100, 100))
         else:
             # Si le fichier n'existe pas, afficher un avertissement
             self.logo_photo = None
@@ -68,30 +105,147 @@ class JobApplicationApp:
         self.sort_arrow_image = None
         arrow_path = resource_path("arrows.png")
         if os.path.exists(arrow_path):
-            arrow_image = Image.open(arrow_path).resize((10, 10), Image.LANCZOS)
-            self.sort_arrow_image = ImageTk.PhotoImage(arrow_image)
+            self.sort_arrow_image = load_icon(arrow_path, (10, 10))
 
         # Frames pour les différentes pages
         self.home_frame = tk.Frame(self.root, bg='#333333')  # Frame pour la page d'accueil
         self.add_frame = tk.Frame(self.root, bg='#333333')  # Frame pour la page d'ajout/modification
+        self.stats_frame = tk.Frame(self.root, bg='#333333')  # Frame pour la page des statistiques
 
         # Variables de pagination
         self.current_page = 0
         self.items_per_page = 10
 
+        # Mode d'affichage de la liste : "pages" (pagination) ou "scroll" (défilement continu virtualisé)
+        self.list_mode = "pages"
+
+        # Recherche différée : les frappes sont regroupées puis filtrées et triées hors du thread de l'interface
+        search_delay_ms = int(os.environ.get("JOBGESTION_SEARCH_DELAY_MS", DEFAULT_DELAY_MS))
+        self.search_pipeline = SearchPipeline(self.root, self.fetch_applications, self.show_search_results, search_delay_ms)
+
+        # Miniatures des screenshots, décodées en arrière-plan et mises en cache (disque et mémoire)
+        self.thumbnails = ThumbnailCache(self.root)
+        # Préchargement optionnel des miniatures des candidatures affichées
+        self.prefetch_thumbnails = os.environ.get("JOBGESTION_PREFETCH_THUMBNAILS") == "1"
+
         # Variable de tri
         self.sort_by = None
         self.sort_ascending = True
 
+        # Recherche plein texte dans les commentaires et les lettres (index persistant, lettres lues en arrière-plan)
+        self.full_text = FullTextIndex()
+        self.search_full_text = False
+
         # Construire la page d'accueil
         self.build_home_page()
 
         # Construire la page pour ajouter/modifier une candidature
         self.build_add_page()
 
+        # Construire la page des statistiques (le graphique est dessiné une seule fois puis mis en cache)
+        self.chart_cache = ChartCache()
+        self.build_stats_page()
+
         # Afficher la page d'accueil par défaut
         self.home_frame.pack(fill='both', expand=True)
 
+        # Charger les candidatures en arrière-plan ; la première page s'affiche dès ses lignes disponibles
+        if not self.loaded:
+            self.start_loading()
+        else:
+            # Avec SQLite, l'index plein texte parcourt la table dans son thread de travail
+            self.full_text.start(self.database["applications"])
+            self.root.after(WATCH_MS, self.watch_storage)
+
+        # Latences mesurées (p50, p99) affichées par-dessus la fenêtre si l'instrumentation est active
+        if instrumentation.enabled:
+            self.timing_overlay = TimingOverlay(self.root)
+
+    def start_loading(self):
+        self.load_error = None
+        self.root.title("JobGestion - chargement des candidatures...")
+        self.load_started = time.perf_counter()
+        self.first_page_shown = False
+        self.loader = BackgroundLoader(self.root, self.load_in_background(), self.on_load_progress, self.on_load_done, self.on_load_error)
+
+    def load_in_background(self):
+        # Exécuté dans le thread de chargement : remplit la base et la vue, sans toucher aux widgets
+        for changes in storage.load_incrementally(self.database):
+            self.application_view.apply(changes)
+            yield len(self.database["applications"])
+
+    def on_load_progress(self, count):
+        # Afficher les candidatures déjà chargées (page courante et nombre de pages)
+        self.root.title(f"JobGestion - chargement des candidatures... ({count})")
+        self.update_application_list()
+        if not self.first_page_shown:
+            self.first_page_shown = True
+            instrumentation.record("load_applications.first_page", time.perf_counter() - self.load_started, self.load_started)
+
+    def on_load_done(self):
+        self.loaded = True
+        # Mettre à jour l'index plein texte en arrière-plan, à partir d'une copie de la liste des candidatures
+        self.full_text.start(list(self.database["applications"]))
+        instrumentation.record("load_applications", time.perf_counter() - self.load_started, self.load_started)
+        self.root.title("JobGestion")
+        self.update_application_list()
+        self.root.after(WATCH_MS, self.watch_storage)
+
+    def on_load_error(self, error):
+        # La base reste incomplète : les modifications restent bloquées pour ne pas écraser le fichier
+        self.load_error = error
+        self.root.title("JobGestion - chargement impossible")
+        self.offer_reload()
+
+    def offer_reload(self):
+        # Afficher l'erreur de chargement et proposer de relire le fichier (après correction, par exemple)
+        if messagebox.askretrycancel("Erreur", f"Erreur lors du chargement des candidatures : {self.load_error}\n\n"
+                                     "Les modifications sont désactivées tant que les candidatures ne sont pas chargées."):
+            self.reload_applications()
+
+    def reload_applications(self):
+        # Repartir d'une base et d'une vue vides : les candidatures déjà lues sont relues
+        self.database = {"applications": Applications()}
+        self.application_view = ApplicationView(self.database["applications"])
+        self.update_application_list()
+        self.start_loading()
+
+    def watch_storage(self):
+        # Appliquer les modifications enregistrées par une autre instance, puis rafraîchir la page affichée si besoin
+        try:
+            # Sans attendre : si une autre instance écrit dans la base, réessayer au prochain passage
+            changed = storage.sync(self.database, blocking=False)
+            self.watch_error = None
+        except Exception as e:
+            # Le message n'est affiché qu'une fois tant que l'erreur se répète ; la vérification continue
+            changed = False
+            if str(e) != self.watch_error:
+                self.watch_error = str(e)
+                messagebox.showerror("Erreur", f"Erreur lors de la lecture des modifications d'une autre instance : {e}")
+        finally:
+            self.root.after(WATCH_MS, self.watch_storage)
+        if changed:
+            self.update_application_list()
+
+    def on_storage_changes(self, changes):
+        # Reporter les modifications (opération, candidature) dans la vue en mémoire et dans l'index plein texte
+        if self.application_view is not None:
+            self.application_view.apply(changes)
+        for op, record in changes:
+            if op == "delete":
+                self.full_text.remove(record.id)
+            else:
+                self.full_text.update(record)
+
+    def check_loaded(self):
+        # Les modifications attendent la fin du chargement (identifiants et journal doivent être complets)
+        if self.load_error is not None:
+            self.offer_reload()
+        elif not self.loaded:
+            messagebox.showinfo("Chargement", "Les candidatures sont en cours de chargement, veuillez réessayer dans un instant.")
+        return self.loaded
+
+    @instrumentation.timed("build_home_page")
     def build_home_page(self):
         # Ajouter le logo si disponible
         if self.logo_photo:
@@ -106,9 +260,39 @@ class JobApplicationApp:
         search_entry = tk.Entry(self.home_frame, textvariable=self.search_var, width=40)
         search_entry.pack(pady=5)
 
-        # Frame pour la liste des candidatures
-        self.application_list_frame = tk.Frame(self.home_frame, bg='#333333')
-        self.application_list_frame.pack(pady=10, padx=10, fill='both', expand=True)
+        # Rechercher dans les commentaires et les lettres de motivation plutôt que dans l'entreprise et le poste
+        self.full_text_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.home_frame, text="Rechercher dans les commentaires et les lettres de motivation", variable=self.full_text_var,
+                       command=self.toggle_full_text, bg='#333333', fg='#ffffff', selectcolor='#333333', activebackground='#333333').pack(pady=5)
+
+        # Bouton pour basculer entre la pagination et le défilement continu
+        self.list_mode_btn = tk.Button(self.home_frame, command=self.toggle_list_mode, bg='#ffffff', fg='#000000', cursor="arrow")
+        self.list_mode_btn.pack(pady=5)
+
+        # Frame contenant la liste des candidatures (grille paginée ou liste virtualisée)
+        self.list_container = tk.Frame(self.home_frame, bg='#333333')
+        self.list_container.pack(pady=10, padx=10, fill='both', expand=True)
+
+        # Frame pour la liste paginée des candidatures
+        self.application_list_frame = tk.Frame(self.list_container, bg='#333333')
+        self.build_application_rows()
+
+        # Liste virtualisée : seules les lignes visibles sont créées, quel que soit le nombre de candidatures
+        self.virtual_list = VirtualList(
+            self.list_container,
+            columns=[
+                ("index", "#", 60, "center", None),
+                ("company", "Entreprise", 300, "w", None),
+                ("title", "Poste", 300, "w", None),
+                ("date", "Date", 150, "center", self.sort_by_date),
+                ("status", "Statut", 150, "center", self.sort_by_status),
+            ],
+            fetch=self.query_applications,
+            render_row=self.render_virtual_row,
+            on_open=lambda app: self.edit_application(app.id),
+            tag_colors={status.name: status.color for status in Status},
+            bg='#333333',
+        )
 
         # Navigation entre les pages
         self.navigation_frame = tk.Frame(self.home_frame, bg='#333333')
@@ -126,38 +310,126 @@ class JobApplicationApp:
         self.next_page_btn = tk.Button(self.navigation_frame, text=">>", command=self.go_to_last_page)
         self.next_page_btn.grid(row=0, column=4, padx=5)
 
-        # Mettre à jour la liste des candidatures
+        # Afficher la liste selon le mode choisi et la mettre à jour
+        self.show_list_mode()
         self.update_application_list()
 
         # Bouton pour ajouter une nouvelle candidature
-        tk.Button(self.home_frame, text="Nouvelle candidature", command=self.switch_to_add_page, bg='#ffffff', fg='#000000', relief=tk.FLAT, highlightthickness=0, cursor="arrow").pack(pady=20)
+        tk.Button(self.home_frame, text="Nouvelle candidature", command=self.switch_to_add_page, bg='#ffffff', fg='#000000', relief=tk.FLAT, highlightthickness=0, cursor="arrow").pack(pady=(20, 5))
+
+        # Bouton pour afficher les statistiques
+        tk.Button(self.home_frame, text="Statistiques", command=self.switch_to_stats_page, bg='#ffffff', fg='#000000', relief=tk.FLAT, highlightthickness=0, cursor="arrow").pack(pady=(5, 20))
 
     def search_and_update(self, *args):
         # Réinitialiser à la première page pour afficher les résultats de recherche
         self.current_page = 0
+        self.virtual_list.first_row = 0
+
+        # Lancer la recherche en arrière-plan ; seul le résultat de la dernière frappe sera affiché
+        count = self.virtual_list.visible_rows if self.list_mode == "scroll" else self.items_per_page
+        self.search_pipeline.submit(self.search_var.get(), self.sort_by, self.sort_ascending, 0, count, self.search_full_text)
+
+    def toggle_full_text(self):
+        # Lu par les recherches en arrière-plan : copié depuis la variable Tk dans le thread de l'interface
+        self.search_full_text = self.full_text_var.get()
+        self.search_and_update()
+
+    def show_search_results(self, result):
+        # Afficher le résultat d'une recherche calculée en arrière-plan
+        total_apps, current_apps = result
+        if self.list_mode == "scroll":
+            self.virtual_list.display(total_apps, current_apps)
+        else:
+            self.render_application_list(total_apps, current_apps)
+
+    def show_list_mode(self):
+        # Afficher soit la grille paginée et sa navigation, soit la liste virtualisée
+        if self.list_mode == "scroll":
+            self.application_list_frame.pack_forget()
+            self.navigation_frame.pack_forget()
+            self.virtual_list.pack(fill='both', expand=True)
+            self.list_mode_btn.config(text="Affichage par pages")
+        else:
+            self.virtual_list.pack_forget()
+            self.application_list_frame.pack(fill='both', expand=True)
+            self.navigation_frame.pack(pady=5, after=self.list_container)
+            self.list_mode_btn.config(text="Défilement continu")
+
+    def toggle_list_mode(self):
+        # Conserver la position courante en passant d'un mode à l'autre
+        if self.list_mode == "pages":
+            self.list_mode = "scroll"
+            self.virtual_list.first_row = self.current_page * self.items_per_page
+        else:
+            self.list_mode = "pages"
+            self.current_page = self.virtual_list.first_row // self.items_per_page
+        self.show_list_mode()
         self.update_application_list()
 
+    def render_virtual_row(self, position, app):
+        # Valeurs d'une ligne de la liste virtualisée et tag de couleur du statut
+        values = (position + 1, app.company_name, app.job_title, app.date_display, app.status)
+        return values, app.status_enum.name if app.status_enum else None
+
+    def build_application_rows(self):
+        # Ajouter un titre de colonne pour améliorer la lisibilité
+        headers = ["#", "Entreprise", "Poste", "Date", "Statut", "Actions"]
+        for col_num, header in enumerate(headers):
+            label = tk.Label(self.application_list_frame, text=header, width=20, font=("Helvetica", 16, "bold"), relief=tk.SOLID, bd=1, bg='#333333', fg='#ffffff', anchor="center")
+            label.grid(row=0, column=col_num, sticky="nsew", ipadx=5, ipady=5)
+            if header == "Date":
+                label.bind("<Button-1>", lambda e: self.sort_by_date())
+                tk.Label(self.application_list_frame, image=self.sort_arrow_image, bg='#333333').grid(row=0, column=col_num, sticky="e", ipadx=5, ipady=5)
+            elif header == "Statut":
+                label.bind("<Button-1>", lambda e: self.sort_by_status())
+                tk.Label(self.application_list_frame, image=self.sort_arrow_image, bg='#333333').grid(row=0, column=col_num, sticky="e", ipadx=5, ipady=5)
+
+        # Créer une seule fois un pool de lignes réutilisées à chaque rafraîchissement
+        self.row_widgets = []
+        self.row_record_ids = [None] * self.items_per_page  # Identifiant de la candidature affichée sur chaque ligne
+        self.row_values = [None] * self.items_per_page  # Dernières valeurs affichées, pour éviter les appels Tk inutiles
+        for row in range(self.items_per_page):
+            widgets = (
+                tk.Label(self.application_list_frame, width=5, anchor="center", relief=tk.SOLID, bd=1, bg='#333333', fg='#ffffff'),
+                tk.Label(self.application_list_frame, width=20, anchor="w", relief=tk.SOLID, bd=1, bg='#333333', fg='#ffffff'),
+                tk.Label(self.application_list_frame, width=20, anchor="w", relief=tk.SOLID, bd=1, bg='#333333', fg='#ffffff'),
+                tk.Label(self.application_list_frame, width=10, anchor="center", relief=tk.SOLID, bd=1, bg='#333333', fg='#ffffff'),
+                tk.Label(self.application_list_frame, width=10, anchor="center", relief=tk.SOLID, bd=1, bg='#333333', fg='#ffffff'),
+                # Le bouton lit l'identifiant de sa ligne au moment du clic, sa commande ne change donc jamais
+                tk.Button(self.application_list_frame, text="Modifier / Voir", command=lambda row=row: self.edit_row(row), relief=tk.SOLID, bd=1, bg='#ffffff', fg='#000000', cursor="arrow"),
+            )
+            for col_num, widget in enumerate(widgets):
+                widget.grid(row=row + 1, column=col_num, sticky="nsew", ipadx=5, ipady=5)
+            self.row_widgets.append(widgets)
+        self.visible_rows = self.items_per_page
+
+    @instrumentation.timed("update_application_list")
     def update_application_list(self, *args):
-        # Effacer les widgets existants pour pouvoir recharger la liste
-        for widget in self.application_list_frame.winfo_children():
-            widget.destroy()
+        # Une mise à jour immédiate rend obsolète toute recherche encore en attente
+        self.search_pipeline.cancel()
 
-        # Récupérer le texte de recherche
-        search_text = self.search_var.get().lower()
+        # En mode défilement continu, seule la fenêtre visible de la liste virtualisée est relue
+        if self.list_mode == "scroll":
+            self.virtual_list.refresh()
+            return
 
-        # Filtrer les candidatures selon le texte de recherche
-        filtered_apps = [app for app in self.database["applications"] if search_text in app['company_name'].lower() or search_text in app['job_title'].lower()]
+        # Récupérer uniquement les candidatures de la page courante
+        start_index = self.current_page * self.items_per_page
+        total_apps, current_apps = self.query_applications(start_index, self.items_per_page)
 
-        # Trier les candidatures
-        if self.sort_by:
-            reverse = not self.sort_ascending
-            filtered_apps.sort(key=lambda x: x[self.sort_by], reverse=reverse)
+        # Si la page courante n'existe plus (après une suppression), revenir à la dernière page
+        if not current_apps and self.current_page > 0:
+            self.current_page = max((total_apps + self.items_per_page - 1) // self.items_per_page - 1, 0)
+            start_index = self.current_page * self.items_per_page
+            total_apps, current_apps = self.query_applications(start_index, self.items_per_page)
+        self.render_application_list(total_apps, current_apps)
 
-        # Pagination
-        total_pages = (len(filtered_apps) + self.items_per_page - 1) // self.items_per_page
+    @instrumentation.timed("update_application_list.render")
+    def render_application_list(self, total_apps, current_apps):
         start_index = self.current_page * self.items_per_page
-        end_index = start_index + self.items_per_page
-        current_apps = filtered_apps[start_index:end_index]
+
+        # Pagination
+        total_pages = (total_apps + self.items_per_page - 1) // self.items_per_page
 
         # Mettre à jour l'affichage des pages
         self.page_label.config(text=f"Page {self.current_page + 1} sur {total_pages}")
@@ -166,45 +438,71 @@ class JobApplicationApp:
         self.next_btn.config(state=tk.NORMAL if self.current_page < total_pages - 1 else tk.DISABLED)
         self.next_page_btn.config(state=tk.NORMAL if self.current_page < total_pages - 1 else tk.DISABLED)
 
-        # Ajouter un titre de colonne pour améliorer la lisibilité
-        headers = ["#", "Entreprise", "Poste", "Date", "Statut", "Actions"]
-        for col_num, header in enumerate(headers):
-            label = tk.Label(self.application_list_frame, text=header, width=20, font=("Helvetica", 16, "bold"), relief=tk.SOLID, bd=1, bg='#333333', fg='#ffffff', anchor="center")
-            label.grid(row=0, column=col_num, sticky="nsew", ipadx=5, ipady=5)
-            if header == "Date":
-                label.bind("<Button-1>", lambda e: self.sort_by_date())
-                tk.Label(self.application_list_frame, image=self.sort_arrow_image, bg='#333333').grid(row=0, column=col_num, sticky="e", ipadx=5, ipady=5)
-            elif header == "Statut":
-                label.bind("<Button-1>", lambda e: self.sort_by_status())
-                tk.Label(self.application_list_frame, image=self.sort_arrow_image, bg='#333333').grid(row=0, column=col_num, sticky="e", ipadx=5, ipady=5)
-
-        # Parcourir chaque candidature dans la base de données
-        for idx, app in enumerate(current_apps, start=start_index + 1):
-            # Essayer de parser la date dans différents formats
-            date_str = app['application_date']
-            try:
-                date_obj = datetime.strptime(date_str, '%d-%m-%Y')
-            except ValueError:
-                try:
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                except ValueError:
-                    date_obj = None
-
-            # Formater la date pour l'affichage
-            formatted_date = date_obj.strftime('%d-%m-%Y') if date_obj else "Date invalide"
-
-            # Couleur en fonction du statut
-            status_color = "#ff0000" if app['status'] == "Refusé" else "#00cc66" if app['status'] == "Accepté" else "#0000ff"
-
-            # Ajouter chaque ligne dans le tableau avec les informations sur les candidatures
-            tk.Label(self.application_list_frame, text=f"{idx}", width=5, anchor="center", relief=tk.SOLID, bd=1, bg='#333333', fg='#ffffff').grid(row=idx - start_index, column=0, sticky="nsew", ipadx=5, ipady=5)
-            tk.Label(self.application_list_frame, text=f"{app['company_name']}", width=20, anchor="w", relief=tk.SOLID, bd=1, bg='#333333', fg='#ffffff').grid(row=idx - start_index, column=1, sticky="nsew", ipadx=5, ipady=5)
-            tk.Label(self.application_list_frame, text=f"{app['job_title']}", width=20, anchor="w", relief=tk.SOLID, bd=1, bg='#333333', fg='#ffffff').grid(row=idx - start_index, column=2, sticky="nsew", ipadx=5, ipady=5)
-            tk.Label(self.application_list_frame, text=formatted_date, width=10, anchor="center", relief=tk.SOLID, bd=1, bg='#333333', fg='#ffffff').grid(row=idx - start_index, column=3, sticky="nsew", ipadx=5, ipady=5)
-            tk.Label(self.application_list_frame, text=f"{app['status']}", width=10, anchor="center", relief=tk.SOLID, bd=1, bg=status_color, fg='#ffffff').grid(row=idx - start_index, column=4, sticky="nsew", ipadx=5, ipady=5)
-
-            # Ajouter un bouton pour modifier ou voir les détails de chaque candidature
-            tk.Button(self.application_list_frame, text="Modifier / Voir", command=lambda idx=idx-1: self.edit_application(idx), relief=tk.SOLID, bd=1, bg='#ffffff', fg='#000000', cursor="arrow").grid(row=idx - start_index, column=5, sticky="nsew", ipadx=5, ipady=5)
+        # Remplir les lignes du pool avec les candidatures de la page courante
+        for row, app in enumerate(current_apps):
+            idx = start_index + row + 1
+
+            # Ne reconfigurer les widgets que si le contenu de la ligne a changé
+            # (date formatée et couleur du statut sont pré-calculées au chargement)
+            values = (idx, app.company_name, app.job_title, app.date_display, app.status)
+            if self.row_values[row] != values:
+                index_label, company_label, title_label, date_label, status_label, _ = self.row_widgets[row]
+                index_label.config(text=f"{idx}")
+                company_label.config(text=app.company_name)
+                title_label.config(text=app.job_title)
+                date_label.config(text=app.date_display)
+                status_label.config(text=app.status, bg=app.status_color)
+                self.row_values[row] = values
+            self.row_record_ids[row] = app.id
+
+        # Afficher ou masquer uniquement les lignes dont la visibilité change
+        visible_rows = len(current_apps)
+        for row in range(visible_rows, self.visible_rows):
+            for widget in self.row_widgets[row]:
+                widget.grid_remove()
+            self.row_record_ids[row] = None
+        for row in range(self.visible_rows, visible_rows):
+            for widget in self.row_widgets[row]:
+                widget.grid()
+        self.visible_rows = visible_rows
+
+        # Précharger les miniatures des screenshots de la page affichée
+        if self.prefetch_thumbnails:
+            self.thumbnails.prefetch([app.screenshot_path for app in current_apps])
+
+    def query_applications(self, start_index, count):
+        # Retourner le nombre de candidatures correspondant à la recherche et celles de la page demandée
+        return self.fetch_applications(self.search_var.get(), self.sort_by, self.sort_ascending, start_index, count, self.search_full_text)
+
+    def fetch_applications(self, search_text, sort_by, ascending, start_index, count, full_text=False):
+        # N'utilise aucun widget : peut être appelée depuis le thread de recherche
+        with instrumentation.timer("update_application_list.query"):
+            if full_text and search_text.strip():
+                return self.fetch_full_text(search_text, sort_by, ascending, start_index, count)
+
+            if storage.supports_queries:
+                # Filtrage, tri et pagination faits par la base de données
+                return storage.query(search_text, sort_by, ascending, start_index, count)
+
+            # Filtrage et tri en mémoire, mis en cache : la page est découpée dans la vue déjà triée
+            return self.application_view.page(search_text, sort_by, ascending, start_index, count)
+
+    def fetch_full_text(self, search_text, sort_by, ascending, start_index, count):
+        # Candidatures classées par pertinence, ou triées selon la colonne choisie (à pertinence égale, la plus pertinente d'abord)
+        record_ids = self.full_text.search(search_text)
+        applications = self.database["applications"]
+        if sort_by is None:
+            page = (applications.get(record_id) for record_id in record_ids[start_index:start_index + count])
+            return len(record_ids), [application for application in page if application is not None]
+        matches = [application for application in map(applications.get, record_ids) if application is not None]
+        matches.sort(key=SORT_KEYS[sort_by], reverse=not ascending)
+        return len(matches), matches[start_index:start_index + count]
+
+    def edit_row(self, row):
+        # Ouvrir la candidature affichée sur la ligne cliquée
+        record_id = self.row_record_ids[row]
+        if record_id is not None:
+            self.edit_application(record_id)
 
     def sort_by_date(self):
         if self.sort_by == 'application_date':
@@ -236,14 +534,14 @@ class JobApplicationApp:
         self.update_application_list()
 
     def go_to_last_page(self):
-        filtered_apps = [app for app in self.database["applications"] if self.search_var.get().lower() in app['company_name'].lower() or self.search_var.get().lower() in app['job_title'].lower()]
-        total_pages = (len(filtered_apps) + self.items_per_page - 1) // self.items_per_page
+        total_apps, _ = self.query_applications(0, 0)
+        total_pages = (total_apps + self.items_per_page - 1) // self.items_per_page
         self.current_page = total_pages - 1
         self.update_application_list()
 
     def switch_to_add_page(self):
         # Passer de la page d'accueil à la page d'ajout en réinitialisant les champs
-        self.current_edit_index = None  # Réinitialiser l'index d'édition
+        self.current_edit_id = None  # Réinitialiser l'identifiant d'édition
         self.company_name_entry.delete(0, tk.END)
         self.job_title_entry.delete(0, tk.END)
         self.cover_letter_entry.delete(0, tk.END)
@@ -256,16 +554,65 @@ class JobApplicationApp:
         self.root.focus_force()  # Forcer le focus sur la fenêtre principale
         self.root.after(100, lambda: self.add_frame.focus())  # Assurer que le focus est bien sur la fenêtre après un court délai
 
-    def switch_to_home_page(self):
-        # Passer de la page d'ajout à la page d'accueil
-        self.add_frame.pack_forget()
+    def build_stats_page(self):
+        # Titre de la page des statistiques
+        tk.Label(self.stats_frame, text="Statistiques", font=("Helvetica", 16), bg='#333333', fg='#ffffff').pack(pady=10)
+
+        # Résumé : nombre de candidatures par statut et taux de réponse
+        self.stats_summary_label = tk.Label(self.stats_frame, font=("Helvetica", 14), bg='#333333', fg='#ffffff')
+        self.stats_summary_label.pack(pady=5)
+
+        # Graphique des statuts et des candidatures par mois
+        self.stats_chart_label = tk.Label(self.stats_frame, bg='#333333')
+        self.stats_chart_label.pack(pady=10)
+
+        # Tableaux des dernières semaines et des entreprises les plus sollicitées
+        tables_frame = tk.Frame(self.stats_frame, bg='#333333')
+        tables_frame.pack(pady=10, padx=10, fill='both', expand=True)
+        self.weeks_tree = ttk.Treeview(tables_frame, columns=("week", "count"), show="headings", height=10, style="Applications.Treeview")
+        self.weeks_tree.heading("week", text="Semaine")
+        self.weeks_tree.heading("count", text="Candidatures")
+        self.weeks_tree.column("week", width=120, anchor="center")
+        self.weeks_tree.column("count", width=120, anchor="center")
+        self.weeks_tree.pack(side='left', fill='y', padx=(0, 10))
+        self.companies_tree = ttk.Treeview(tables_frame, columns=("company", "count", "responses", "rate"), show="headings", height=10, style="Applications.Treeview")
+        for column_id, heading, width, anchor in (("company", "Entreprise", 300, "w"), ("count", "Candidatures", 120, "center"),
+                                                  ("responses", "Réponses", 120, "center"), ("rate", "Taux de réponse", 140, "center")):
+            self.companies_tree.heading(column_id, text=heading)
+            self.companies_tree.column(column_id, width=width, anchor=anchor)
+        self.companies_tree.pack(side='left', fill='both', expand=True)
+
+        # Bouton pour revenir à la page d'accueil
+        tk.Button(self.stats_frame, text="Retour", command=self.switch_to_home_page, bg='#ffffff', fg='#000000', cursor="arrow").pack(pady=20)
+
+    def switch_to_stats_page(self):
+        # Les statistiques sont maintenues à chaque modification : l'affichage ne parcourt pas les candidatures
+        if not self.check_loaded():
+            return
+        stats = self.database[STATISTICS_KEY]
+        statuses = " | ".join(f"{status.label} : {stats.by_status.get(status.label, 0)}" for status in Status)
+        self.stats_summary_label.config(text=f"Total : {stats.total} | {statuses} | Taux de réponse : {stats.response_rate():.0%}")
+        self.stats_chart_label.config(image=self.chart_cache.photo(stats))
+
+        self.weeks_tree.delete(*self.weeks_tree.get_children())
+        for week, count in stats.recent_weeks(STATS_ROWS):
+            self.weeks_tree.insert("", "end", values=(week, count))
+        self.companies_tree.delete(*self.companies_tree.get_children())
+        for company, count, responses, rate in stats.top_companies(STATS_ROWS):
+            self.companies_tree.insert("", "end", values=(company, count, responses, f"{rate:.0%}"))
 
-        # Détruire tous les widgets de la page d'accueil pour les reconstruire
-        for widget in self.home_frame.winfo_children():
-            widget.destroy()
+        self.home_frame.pack_forget()
+        self.stats_frame.pack(fill='both', expand=True)
 
-        # Reconstruire la page d'accueil
-        self.build_home_page()
+    def switch_to_home_page(self, changed=False):
+        # Passer de la page d'ajout (ou des statistiques) à la page d'accueil
+        self.add_frame.pack_forget()
+        self.stats_frame.pack_forget()
+
+        # La page d'accueil est conservée (recherche, tri et page courante compris) :
+        # après une modification, seules les lignes concernées et le compteur de pages sont mis à jour
+        if changed:
+            self.update_application_list()
 
         # Afficher la page d'accueil
         self.home_frame.pack(fill='both', expand=True)
@@ -274,21 +621,26 @@ class JobApplicationApp:
         self.root.after(100, lambda: self.home_frame.focus())  # Assurer que le focus est bien sur la fenêtre après un court délai
 
 
-    def edit_application(self, idx):
+    def edit_application(self, record_id):
         # Charger les informations de la candidature sélectionnée dans les champs
-        self.current_edit_index = idx  # Stocker l'index de la candidature en cours d'édition
-        selected_application = self.database["applications"][idx]
+        # (l'identifiant est stable : il ne dépend ni de la recherche, ni du tri, ni de la page affichée)
+        selected_application = self.database["applications"].get(record_id)
+        if selected_application is None:
+            messagebox.showerror("Erreur", "Cette candidature n'existe plus.")
+            return
+        self.current_edit_id = record_id  # Stocker l'identifiant de la candidature en cours d'édition
+        self.edit_base = selected_application  # Version modifiée, pour fusionner avec les modifications d'une autre instance
         self.company_name_entry.delete(0, tk.END)
-        self.company_name_entry.insert(0, selected_application["company_name"])
+        self.company_name_entry.insert(0, selected_application.company_name)
         self.job_title_entry.delete(0, tk.END)
-        self.job_title_entry.insert(0, selected_application["job_title"])
+        self.job_title_entry.insert(0, selected_application.job_title)
         self.cover_letter_entry.delete(0, tk.END)
-        self.cover_letter_entry.insert(0, selected_application["cover_letter_path"])
+        self.cover_letter_entry.insert(0, selected_application.cover_letter_path)
         self.screenshot_entry.delete(0, tk.END)
-        self.screenshot_entry.insert(0, selected_application["screenshot_path"])
-        self.status_combobox.set(selected_application["status"])
+        self.screenshot_entry.insert(0, selected_application.screenshot_path)
+        self.status_combobox.set(selected_application.status)
         self.comment_text.delete('1.0', tk.END)
-        self.comment_text.insert('1.0', selected_application.get("comment", ""))
+        self.comment_text.insert('1.0', selected_application.comment)
 
         self.home_frame.pack_forget()
         self.add_frame.pack(fill='both', expand=True)
@@ -375,42 +727,63 @@ class JobApplicationApp:
             messagebox.showerror("Erreur", "Tous les champs doivent être remplis.")
             return
 
+        if not self.check_loaded():
+            return
+
         # Mise à jour ou ajout de la candidature
-        if self.current_edit_index is not None:
-            # Mise à jour de la candidature existante
-            self.database["applications"][self.current_edit_index]["company_name"] = company_name
-            self.database["applications"][self.current_edit_index]["job_title"] = job_title
-            self.database["applications"][self.current_edit_index]["cover_letter_path"] = cover_letter_path
-            self.database["applications"][self.current_edit_index]["screenshot_path"] = screenshot_path
-            self.database["applications"][self.current_edit_index]["status"] = status
-            self.database["applications"][self.current_edit_index]["comment"] = comment
+        if self.current_edit_id is not None:
+            # Mise à jour de la candidature existante : elle est remplacée par un nouvel objet,
+            # l'ancien sert à retirer ses valeurs des statistiques
+            previous = self.edit_base
+            application = Record(
+                company_name=company_name,
+                job_title=job_title,
+                cover_letter_path=cover_letter_path,
+                screenshot_path=screenshot_path,
+                application_date=previous.application_date,
+                status=status,
+                comment=comment,
+                extra=previous.extra,
+                id=previous.id
+            )
+            change = {"op": "update", "id": self.current_edit_id, "record": application, "base": previous}
         else:
             # Ajouter une nouvelle candidature
-            application = {
-                "company_name": company_name,
-                "job_title": job_title,
-                "cover_letter_path": cover_letter_path,
-                "screenshot_path": screenshot_path,
-                "application_date": datetime.now().strftime("%d-%m-%Y"),
-                "status": status,
-                "comment": comment
-            }
-            self.database["applications"].append(application)
-
-        # Sauvegarder les changements dans le fichier JSON
-        save_applications(self.database)
-        messagebox.showinfo("Succès", "Candidature sauvegardée avec succès.")
-        self.switch_to_home_page()
+            application = Record(
+                company_name=company_name,
+                job_title=job_title,
+                cover_letter_path=cover_letter_path,
+                screenshot_path=screenshot_path,
+                application_date=datetime.now().strftime("%d-%m-%Y"),
+                status=status,
+                comment=comment
+            )
+            change = {"op": "add", "record": application}
+
+        # Appliquer et enregistrer la modification (la vue en mémoire est mise à jour par on_storage_changes)
+        saved = record_change(self.database, change)
+        if not saved:
+            return
+        message = "Candidature sauvegardée avec succès."
+        if change["op"] == "update" and saved.id != self.current_edit_id:
+            message += "\nElle avait été supprimée par une autre instance de l'application et a été recréée."
+        elif any(getattr(saved, field) != getattr(application, field) for field in FIELDS):
+            message += "\nLes modifications faites entre-temps par une autre instance ont été conservées pour les champs que vous n'avez pas changés."
+        messagebox.showinfo("Succès", message)
+        self.switch_to_home_page(changed=True)
 
     def delete_application(self):
         # Supprimer la candidature actuellement sélectionnée
-        if self.current_edit_index is not None:
+        if self.current_edit_id is not None:
+            if not self.check_loaded():
+                return
             confirm = messagebox.askyesno("Confirmation", "Voulez-vous vraiment supprimer cette candidature ?")
             if confirm:
-                del self.database["applications"][self.current_edit_index]
-                save_applications(self.database)
+                # Sans effet (None) si une autre instance l'a déjà supprimée ; False en cas d'erreur, déjà affichée
+                if record_change(self.database, {"op": "delete", "id": self.current_edit_id}) is False:
+                    return
                 messagebox.showinfo("Succès", "Candidature supprimée avec succès.")
-                self.switch_to_home_page()
+                self.switch_to_home_page(changed=True)
         else:
             messagebox.showerror("Erreur", "Aucune candidature sélectionnée pour la suppression.")
 
@@ -440,20 +813,36 @@ class JobApplicationApp:
         # Ouvrir une fenêtre de prévisualisation pour le screenshot
         file_path = self.screenshot_entry.get()
         if os.path.exists(file_path):
-            try:
-                img = Image.open(file_path)
-                img = img.resize((300, 300))
-                img_tk = ImageTk.PhotoImage(img)
-                preview_window = tk.Toplevel(self.root)
-                preview_window.title("Aperçu du Screenshot")
-                tk.Label(preview_window, image=img_tk).pack()
-                preview_window.mainloop()
-            except Exception as e:
-                messagebox.showerror("Erreur", f"Impossible d'ouvrir l'image : {e}")
+            # La miniature est décodée en arrière-plan (ou lue depuis le cache) puis affichée
+            requested = time.perf_counter()
+            self.thumbnails.request(
+                file_path,
+                lambda photo: self.show_screenshot_preview(photo, requested),
+                lambda e: messagebox.showerror("Erreur", f"Impossible d'ouvrir l'image : {e}"),
+            )
         else:
             messagebox.showerror("Erreur", "Le fichier spécifié est introuvable.")
 
+    def show_screenshot_preview(self, photo, requested):
+        # Délai entre le clic et l'affichage de l'aperçu (décodage compris)
+        instrumentation.record("preview_screenshot", time.perf_counter() - requested, requested)
+        preview_window = tk.Toplevel(self.root)
+        preview_window.title("Aperçu du Screenshot")
+        label = tk.Label(preview_window, image=photo)
+        label.image = photo  # Garder une référence pour que l'image ne soit pas libérée
+        label.pack()
+
 # Créer la fenêtre principale Tkinter et lancer l'application
-root = tk.Tk()
-app = JobApplicationApp(root)
-root.mainloop()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JobGestion : suivi des candidatures.")
+    parser.add_argument("--profile", action="store_true", help="mesurer les chemins critiques (panneau F12, mesures écrites à la sortie)")
+    parser.add_argument("--cprofile", action="store_true", help="comme --profile, avec en plus un profil cProfile")
+    parser.add_argument("--profile-dir", help="répertoire des mesures (par défaut ~/.jobgestion/profiles/<date>)")
+    # Ignorer les arguments inconnus (par exemple ceux ajoutés par macOS au lancement de l'application)
+    args, _ = parser.parse_known_args()
+    if args.profile or args.cprofile:
+        instrumentation.enable(cprofile=args.cprofile, output_dir=args.profile_dir)
+
+    root = tk.Tk()
+    app = JobApplicationApp(root)
+    root.mainloop()
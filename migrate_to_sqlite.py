@@ -0,0 +1,44 @@
+""" Importer les candidatures de ~/applications.json (et de son journal) dans la base SQLite ~/applications.db. """
+import sys
+import time
+import argparse
+from storage import JournaledStorage
+from sqlite_storage import SqliteStorage
+
+
+def migrate(json_path=None, db_path=None, replace=False):
+    """ Copier toutes les candidatures du stockage JSON vers SQLite. Retourne le nombre de candidatures importées. """
+    database = JournaledStorage(json_path).load()
+    sqlite_storage = SqliteStorage(db_path)
+    try:
+        existing = sqlite_storage.load()["applications"]
+        if len(existing) and not replace:
+            raise ValueError(f"La base {sqlite_storage.db_path} contient déjà {len(existing)} candidatures (utilisez --replace pour l'écraser).")
+        if replace:
+            sqlite_storage.compact(database)
+            return len(database["applications"])
+        return sqlite_storage.import_applications(database["applications"])
+    finally:
+        sqlite_storage.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrer les candidatures du fichier JSON vers SQLite.")
+    parser.add_argument("--json", dest="json_path", help="fichier JSON source (par défaut ~/applications.json)")
+    parser.add_argument("--db", dest="db_path", help="base SQLite cible (par défaut ~/applications.db)")
+    parser.add_argument("--replace", action="store_true", help="remplacer le contenu de la base SQLite existante")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        count = migrate(args.json_path, args.db_path, args.replace)
+    except ValueError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    print(f"{count} candidatures importées en {time.perf_counter() - start:.2f} s.")
+    print("Lancez l'application avec JOBGESTION_STORAGE=sqlite pour utiliser la base SQLite.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+""" Candidatures typées : dates normalisées une seule fois, clés de tri pré-calculées et identifiants stables. """
+from enum import Enum
+from datetime import date
+from functools import lru_cache
+from itertools import islice
+from operator import attrgetter
+
+# Champs d'une candidature, dans l'ordre où ils sont enregistrés
+FIELDS = ("company_name", "job_title", "cover_letter_path", "screenshot_path", "application_date", "status", "comment")
+
+# Texte affiché pour une date qui ne peut pas être interprétée
+INVALID_DATE = "Date invalide"
+
+
+class Status(Enum):
+    """ Statut d'une candidature, avec sa couleur d'affichage. """
+    ACCEPTED = ("Accepté", "#00cc66")
+    PENDING = ("En attente", "#0000ff")
+    REFUSED = ("Refusé", "#ff0000")
+
+    def __init__(self, label, color):
+        self.label = label
+        self.color = color
+
+    @classmethod
+    def from_label(cls, label):
+        return _STATUS_BY_LABEL.get(label)
+
+
+_STATUS_BY_LABEL = {status.label: status for status in Status}
+
+# Rang de tri de chaque statut, dans l'ordre alphabétique des libellés (comme le tri sur le texte)
+_STATUS_RANKS = {status: rank for rank, status in enumerate(sorted(Status, key=lambda status: status.label))}
+
+
+def status_sort_key(label):
+    """ Clé de tri d'un statut. Les statuts inconnus sont triés après les statuts connus. """
+    return _STATUS_RANKS.get(Status.from_label(label), len(_STATUS_RANKS))
+
+
+@lru_cache(maxsize=8192)
+def parse_date(date_str):
+    """ Convertir une date "%d-%m-%Y" ou "%Y-%m-%d" en (ordinal, texte affiché). Retourne (0, INVALID_DATE) si invalide. """
+    try:
+        first, month, last = (int(part) for part in date_str.split("-"))
+        # L'année est la partie sur quatre chiffres
+        if len(date_str.split("-", 1)[0]) == 4:
+            parsed = date(first, month, last)
+        else:
+            parsed = date(last, month, first)
+    except (ValueError, AttributeError):
+        # AttributeError : valeur qui n'est pas du texte (null dans un fichier modifié à la main, par exemple)
+        return 0, INVALID_DATE
+    return parsed.toordinal(), parsed.strftime("%d-%m-%Y")
+
+
+class Record:
+    """ Candidature en mémoire. La date et le statut sont analysés à l'affectation, pas à chaque affichage. """
+
+    __slots__ = ("id", "version", "company_name", "job_title", "cover_letter_path", "screenshot_path", "comment", "extra",
+                 "_application_date", "date_key", "date_display", "_status", "status_enum", "status_key")
+
+    def __init__(self, company_name="", job_title="", cover_letter_path="", screenshot_path="", application_date="", status="", comment="", extra=None, id=None, version=0):
+        # Identifiant stable, attribué à l'ajout dans la base (indépendant de la position et de l'affichage)
+        self.id = id
+        # Numéro de version, incrémenté à chaque mise à jour enregistrée (détection des modifications concurrentes)
+        self.version = version
+        self.company_name = company_name
+        self.job_title = job_title
+        self.cover_letter_path = cover_letter_path
+        self.screenshot_path = screenshot_path
+        self.application_date = application_date
+        self.status = status
+        self.comment = comment
+        # Champs supplémentaires inconnus, conservés tels quels lors de l'enregistrement
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = {key: value for key, value in data.items() if key not in FIELDS and key not in ("id", "version")}
+        return cls(*(data.get(field, "") for field in FIELDS), extra=extra or None, id=data.get("id"), version=data.get("version", 0))
+
+    def to_dict(self):
+        data = {"id": self.id} if self.id is not None else {}
+        if self.version:
+            data["version"] = self.version
+        data.update((field, getattr(self, field)) for field in FIELDS)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @property
+    def application_date(self):
+        return self._application_date
+
+    @application_date.setter
+    def application_date(self, value):
+        self._application_date = value
+        self.date_key, self.date_display = parse_date(value)
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, value):
+        self._status = value
+        self.status_enum = Status.from_label(value)
+        self.status_key = status_sort_key(value)
+
+    @property
+    def status_color(self):
+        return self.status_enum.color if self.status_enum else Status.PENDING.color
+
+    def __eq__(self, other):
+        if not isinstance(other, Record):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Record({self.to_dict()!r})"
+
+
+class Applications:
+    """ Candidatures indexées par identifiant, dans l'ordre d'ajout : recherche, mise à jour et suppression en O(1). """
+
+    def __init__(self, records=(), next_id=1):
+        # Identifiant -> Record ; le dictionnaire conserve l'ordre d'ajout
+        self._records = {}
+        self.next_id = next_id
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def __contains__(self, record_id):
+        return record_id in self._records
+
+    def get(self, record_id):
+        """ Candidature d'identifiant donné, ou None. """
+        return self._records.get(record_id)
+
+    def add(self, record):
+        """ Ajouter une candidature, en lui attribuant un identifiant si elle n'en a pas (ou s'il est déjà pris). """
+        if record.id is None or record.id in self._records:
+            record.id = self.next_id
+        self.next_id = max(self.next_id, record.id + 1)
+        self._records[record.id] = record
+        return record
+
+    def update(self, record):
+        """ Remplacer la candidature de même identifiant, sans changer sa position. """
+        if record.id not in self._records:
+            raise KeyError(record.id)
+        self._records[record.id] = record
+
+    def remove(self, record_id):
+        """ Retirer et retourner la candidature d'identifiant donné. """
+        return self._records.pop(record_id)
+
+    def id_at(self, index):
+        """ Identifiant de la candidature à une position donnée (pour les anciens journaux adressés par position). """
+        for record in islice(self._records.values(), index, None):
+            return record.id
+        raise IndexError(index)
+
+
+def merge_records(base, mine, theirs):
+    """ Fusion à trois d'une candidature modifiée de deux côtés à partir de la même version `base`.
+
+    Chaque champ garde la valeur du côté qui l'a modifié ; un champ modifié des deux côtés prend la valeur de `mine`.
+    La candidature fusionnée reprend l'identifiant et la version de `theirs`.
+    """
+    values = {field: getattr(theirs if getattr(mine, field) == getattr(base, field) else mine, field) for field in FIELDS}
+    extra = theirs.extra if mine.extra == base.extra else mine.extra
+    return Record(**values, extra=extra, id=theirs.id, version=theirs.version)
+
+
+# Clés de tri utilisables depuis l'interface, basées sur les valeurs pré-calculées
+SORT_KEYS = {
+    "application_date": attrgetter("date_key"),
+    "status": attrgetter("status_key"),
+}
+
+
+def as_record(value):
+    """ Retourner la candidature sous forme de Record (les dictionnaires sont convertis). """
+    return value if isinstance(value, Record) else Record.from_dict(value)
+
+
+def to_json(value):
+    """ Fonction `default` pour json.dump : sérialiser les Record comme des dictionnaires. """
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, Applications):
+        return list(value)
+    raise TypeError(f"Objet de type {type(value).__name__} non sérialisable en JSON")
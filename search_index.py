@@ -0,0 +1,144 @@
+""" Index de recherche incrémental sur le nom de l'entreprise et le titre du poste. """
+
+# Taille des n-grammes utilisés pour l'index de sous-chaînes
+NGRAM_SIZE = 3
+
+# Nombre de recherches récentes conservées (pour l'effacement et l'affinage pendant la saisie)
+CACHE_SIZE = 32
+
+
+def ngrams(text):
+    """ Retourner l'ensemble des n-grammes d'un texte déjà mis en minuscules. """
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class SearchIndex:
+    """ Index en mémoire des candidatures, mis à jour au fil des ajouts, modifications et suppressions. """
+
+    def __init__(self, applications=()):
+        # Entrées indexées par identifiant de la candidature : (rang, nom en minuscules, poste en minuscules, candidature)
+        # Le rang croissant (et l'ordre du dictionnaire) reproduit l'ordre de la base de données
+        self._entries = {}
+        self._next_rank = 0
+        # n-gramme -> ensemble des clés des candidatures qui le contiennent
+        self._postings = {}
+        # Recherches récentes, réutilisées pour affiner les résultats pendant la saisie
+        self._cache = {}
+        for application in applications:
+            self.add(application)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def rank(self, application):
+        """ Rang de la candidature dans l'ordre de la base (croissant, pas forcément contigu). """
+        return self._entries[application.id][0]
+
+    def applications(self):
+        """ Toutes les candidatures indexées, dans l'ordre de la base. """
+        return [entry[3] for entry in self._entries.values()]
+
+    def add(self, application):
+        """ Indexer une nouvelle candidature. """
+        key = application.id
+        entry = (self._next_rank, application.company_name.lower(), application.job_title.lower(), application)
+        self._next_rank += 1
+        self._entries[key] = entry
+        for gram in ngrams(entry[1]) | ngrams(entry[2]):
+            self._postings.setdefault(gram, set()).add(key)
+        self._invalidate()
+
+    def update(self, application):
+        """ Réindexer une candidature dont les champs ont été modifiés, sans changer sa position. """
+        key = application.id
+        rank, old_company, old_title, _ = self._entries[key]
+        entry = (rank, application.company_name.lower(), application.job_title.lower(), application)
+        if entry[1:3] != (old_company, old_title):
+            old_grams = ngrams(old_company) | ngrams(old_title)
+            new_grams = ngrams(entry[1]) | ngrams(entry[2])
+            self._discard_postings(key, old_grams - new_grams)
+            for gram in new_grams - old_grams:
+                self._postings.setdefault(gram, set()).add(key)
+        self._entries[key] = entry
+        self._invalidate()
+
+    def remove(self, application):
+        """ Retirer une candidature de l'index. """
+        key = application.id
+        _, company, title, _ = self._entries.pop(key)
+        self._discard_postings(key, ngrams(company) | ngrams(title))
+        self._invalidate()
+
+    def search(self, text):
+        """ Retourner les candidatures dont l'entreprise ou le poste contient le texte, dans l'ordre de la base.
+
+        La liste retournée est partagée avec le cache : elle ne doit pas être modifiée par l'appelant.
+        """
+        query = text.lower()
+        results = self._cache.get(query)
+        if results is not None:
+            return results
+
+        # Chercher, parmi les recherches récentes contenues dans la requête, celle qui a le moins de résultats
+        narrowed = None
+        for previous, previous_results in self._cache.items():
+            if previous and previous in query and (narrowed is None or len(previous_results) < len(narrowed)):
+                narrowed = previous_results
+
+        if not query:
+            results = self.applications()
+        elif narrowed is not None:
+            # La saisie complète une recherche précédente : affiner les résultats déjà trouvés
+            results = [application for application in narrowed if self._matches(application.id, query)]
+        elif len(query) >= NGRAM_SIZE:
+            results = self._search_ngrams(query)
+        else:
+            # Requête trop courte pour l'index : parcourir les champs déjà en minuscules
+            results = [application for _, company, title, application in self._entries.values() if query in company or query in title]
+
+        if len(self._cache) >= CACHE_SIZE:
+            del self._cache[next(iter(self._cache))]
+        self._cache[query] = results
+        return results
+
+    def _search_ngrams(self, query):
+        # Intersecter les listes de n-grammes en commençant par la plus petite
+        postings = []
+        for gram in ngrams(query):
+            keys = self._postings.get(gram)
+            if not keys:
+                return []
+            postings.append(keys)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for keys in postings[1:]:
+            candidates = candidates & keys
+            if not candidates:
+                return []
+
+        # Une requête de la taille d'un n-gramme n'a pas besoin de vérification
+        exact = len(query) == NGRAM_SIZE
+        if len(candidates) * 8 > len(self._entries):
+            # Beaucoup de candidats : un parcours ordonné coûte moins qu'un tri
+            return [application for key, (_, company, title, application) in self._entries.items()
+                    if key in candidates and (exact or query in company or query in title)]
+
+        # Vérifier la sous-chaîne exacte et restituer l'ordre de la base
+        entries = [self._entries[key] for key in candidates if exact or self._matches(key, query)]
+        entries.sort()
+        return [entry[3] for entry in entries]
+
+    def _matches(self, key, query):
+        _, company, title, _ = self._entries[key]
+        return query in company or query in title
+
+    def _discard_postings(self, key, grams):
+        for gram in grams:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def _invalidate(self):
+        self._cache.clear()
@@ -0,0 +1,95 @@
+""" Recherche différée : les frappes sont regroupées et la recherche est calculée hors du thread de l'interface. """
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+# Délai de regroupement des frappes par défaut, en millisecondes
+DEFAULT_DELAY_MS = 150
+
+# Intervalle de vérification des résultats du thread de travail, en millisecondes
+POLL_MS = 10
+
+
+class SearchPipeline:
+    """ Regroupe les requêtes rapprochées, les exécute dans un thread de travail et ne publie que la dernière.
+
+    `compute(*request)` est appelé dans le thread de travail et ne doit pas toucher à Tk ;
+    `publish(result)` est appelé dans le thread de l'interface, via `root.after`.
+    """
+
+    def __init__(self, root, compute, publish, delay_ms=DEFAULT_DELAY_MS):
+        self.root = root
+        self.compute = compute
+        self.publish = publish
+        self.delay_ms = delay_ms
+        # Numéro de la requête courante : tout résultat d'un numéro plus ancien est ignoré
+        self.generation = 0
+        self._after_id = None
+        self._poll_id = None
+        self._future = None
+        self._results = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recherche")
+
+    @property
+    def busy(self):
+        """ Vrai tant qu'une requête est en attente, en cours ou pas encore publiée. """
+        return self._after_id is not None or self._poll_id is not None or (self._future is not None and not self._future.done())
+
+    def submit(self, *request):
+        """ Programmer une requête après le délai de regroupement, en abandonnant la précédente. """
+        self.cancel()
+        self._after_id = self.root.after(self.delay_ms, self._start, self.generation, request)
+
+    def cancel(self):
+        """ Abandonner la requête en attente ou en cours (son résultat ne sera jamais publié). """
+        self.generation += 1
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._future is not None:
+            # Sans effet si le calcul a déjà commencé : son résultat sera simplement ignoré
+            self._future.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _start(self, generation, request):
+        self._after_id = None
+        self._future = self._executor.submit(self._run, generation, request)
+        self._schedule_poll()
+
+    def _run(self, generation, request):
+        # Exécuté dans le thread de travail
+        if generation != self.generation:
+            return
+        result = self.compute(*request)
+        if generation == self.generation:
+            self._results.put((generation, result))
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        # Exécuté dans le thread de l'interface : publier le dernier résultat encore d'actualité
+        self._poll_id = None
+        # Le résultat est déposé avant la fin du calcul : relever l'état avant de vider la file
+        future = self._future
+        done = future is None or future.done()
+        latest = None
+        while True:
+            try:
+                generation, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.generation:
+                latest = (result,)
+        if latest is not None:
+            self.publish(latest[0])
+
+        if not done:
+            self._schedule_poll()
+        elif future is not None and not future.cancelled() and future.exception() is not None:
+            # Faire remonter l'erreur du thread de travail dans le thread de l'interface
+            self._future = None
+            raise future.exception()
@@ -0,0 +1,413 @@
+""" Stockage optionnel des candidatures dans une base SQLite indexée (recherche, tri et pagination en SQL). """
+import os
+import sys
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from collections.abc import Sequence
+from records import FIELDS, Record, as_record, parse_date, status_sort_key
+from stats import ApplicationStats
+from storage import STATISTICS_KEY, merge_change
+
+# Colonnes utilisables pour le tri depuis l'interface (clés pré-calculées, comme records.SORT_KEYS)
+SORT_COLUMNS = {"application_date": "date_key", "status": "status_key"}
+
+# Version du schéma, enregistrée dans PRAGMA user_version
+# (1 : clés de tri pré-calculées, 2 : identifiants jamais réattribués)
+SCHEMA_VERSION = 2
+
+# Nombre de lignes lues à la fois lors d'un parcours complet de la table
+ITER_BATCH_SIZE = 1000
+
+# Longueur minimale d'une recherche pour utiliser l'index plein texte (tokenizer trigram)
+FTS_MIN_LENGTH = 3
+
+# AUTOINCREMENT : l'identifiant d'une candidature supprimée n'est jamais réattribué (comme next_id du stockage JSON),
+# une modification préparée par une autre instance ne peut donc pas viser une autre candidature
+APPLICATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company_name TEXT NOT NULL DEFAULT '',
+    job_title TEXT NOT NULL DEFAULT '',
+    cover_letter_path TEXT NOT NULL DEFAULT '',
+    screenshot_path TEXT NOT NULL DEFAULT '',
+    application_date TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    comment TEXT NOT NULL DEFAULT '',
+    extra TEXT,
+    company_lower TEXT NOT NULL DEFAULT '',
+    title_lower TEXT NOT NULL DEFAULT '',
+    comment_lower TEXT NOT NULL DEFAULT '',
+    date_key INTEGER NOT NULL DEFAULT 0,
+    status_key INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+TABLE_SCHEMA = APPLICATIONS_TABLE + """
+CREATE TABLE IF NOT EXISTS statistics (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    data TEXT NOT NULL
+);
+"""
+
+INDEX_SCHEMA = """
+CREATE INDEX IF NOT EXISTS applications_date ON applications (date_key, id);
+CREATE INDEX IF NOT EXISTS applications_status ON applications (status_key, id);
+CREATE INDEX IF NOT EXISTS applications_company ON applications (company_lower, id);
+"""
+
+# Index plein texte, tenu à jour par des déclencheurs. Le tokenizer trigram nécessite SQLite 3.34 ou plus
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5 (
+    company_lower, title_lower, comment_lower,
+    content='applications', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS applications_fts_insert AFTER INSERT ON applications BEGIN
+    INSERT INTO applications_fts (rowid, company_lower, title_lower, comment_lower)
+    VALUES (new.id, new.company_lower, new.title_lower, new.comment_lower);
+END;
+CREATE TRIGGER IF NOT EXISTS applications_fts_delete AFTER DELETE ON applications BEGIN
+    INSERT INTO applications_fts (applications_fts, rowid, company_lower, title_lower, comment_lower)
+    VALUES ('delete', old.id, old.company_lower, old.title_lower, old.comment_lower);
+END;
+CREATE TRIGGER IF NOT EXISTS applications_fts_update AFTER UPDATE ON applications BEGIN
+    INSERT INTO applications_fts (applications_fts, rowid, company_lower, title_lower, comment_lower)
+    VALUES ('delete', old.id, old.company_lower, old.title_lower, old.comment_lower);
+    INSERT INTO applications_fts (rowid, company_lower, title_lower, comment_lower)
+    VALUES (new.id, new.company_lower, new.title_lower, new.comment_lower);
+END;
+"""
+
+FTS_TRIGGERS = ("applications_fts_insert", "applications_fts_delete", "applications_fts_update")
+
+# Table temporaire créée à l'ouverture pour vérifier que FTS5 et le tokenizer trigram sont disponibles
+TRIGRAM_PROBE = "CREATE VIRTUAL TABLE temp.trigram_probe USING fts5 (text, tokenize='trigram')"
+
+SELECT_COLUMNS = "id, " + ", ".join(FIELDS) + ", extra"
+# Un identifiant NULL est attribué par SQLite ; les identifiants existants (import, migration) sont conservés
+INSERT_SQL = f"INSERT INTO applications (id, {', '.join(FIELDS)}, extra, company_lower, title_lower, comment_lower, date_key, status_key) VALUES ({', '.join('?' * (len(FIELDS) + 7))})"
+TABLE_COLUMNS = f"id, {', '.join(FIELDS)}, extra, company_lower, title_lower, comment_lower, date_key, status_key"
+UPDATE_SQL = f"UPDATE applications SET {', '.join(f'{field} = ?' for field in FIELDS)}, extra = ?, company_lower = ?, title_lower = ?, comment_lower = ?, date_key = ?, status_key = ? WHERE id = ?"
+
+
+def default_db_path():
+    """ Chemin de la base SQLite dans le répertoire de l'utilisateur. """
+    return os.path.join(os.path.expanduser("~"), "applications.db")
+
+
+def record_to_row(record):
+    """ Valeurs des colonnes d'une candidature, sans l'identifiant. """
+    record = as_record(record)
+    values = tuple(getattr(record, field) for field in FIELDS)
+    # Les champs inconnus sont conservés dans une colonne JSON
+    extra = json.dumps(record.extra) if record.extra else None
+    return values + (extra, record.company_name.lower(), record.job_title.lower(), record.comment.lower(), record.date_key, record.status_key)
+
+
+def record_to_insert_row(record):
+    record = as_record(record)
+    return (record.id,) + record_to_row(record)
+
+
+def row_to_record(row):
+    # Lignes lues avec SELECT_COLUMNS : identifiant, champs, puis colonne JSON des champs inconnus
+    extra = json.loads(row[len(FIELDS) + 1]) if row[len(FIELDS) + 1] else None
+    return Record(*row[1:len(FIELDS) + 1], extra=extra, id=row[0])
+
+
+class SqliteApplications(Sequence):
+    """ Vue en lecture de la table des candidatures, lue à la demande au lieu d'être chargée en mémoire. """
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def __len__(self):
+        return self.storage.fetch("SELECT COUNT(*) FROM applications")[0][0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        rows = self.storage.fetch(f"SELECT {SELECT_COLUMNS} FROM applications ORDER BY id LIMIT 1 OFFSET ?", (index,))
+        if not rows:
+            raise IndexError(index)
+        return row_to_record(rows[0])
+
+    def __iter__(self):
+        # Parcourir la table par blocs (pagination par clé) pour ne jamais tout charger en mémoire
+        last_id = -1
+        while True:
+            rows = self.storage.fetch(f"SELECT {SELECT_COLUMNS} FROM applications WHERE id > ? ORDER BY id LIMIT ?", (last_id, ITER_BATCH_SIZE))
+            for row in rows:
+                yield row_to_record(row)
+            if len(rows) < ITER_BATCH_SIZE:
+                return
+            last_id = rows[-1][0]
+
+    def get(self, record_id):
+        """ Candidature d'identifiant donné (recherche par clé primaire), ou None. """
+        rows = self.storage.fetch(f"SELECT {SELECT_COLUMNS} FROM applications WHERE id = ?", (record_id,))
+        return row_to_record(rows[0]) if rows else None
+
+
+class SqliteStorage:
+    """ Stockage des candidatures dans SQLite, avec index sur la date, le statut, l'entreprise et un index plein texte. """
+
+    # La recherche, le tri et la pagination sont délégués à la base de données
+    supports_queries = True
+
+    def __init__(self, db_path=None):
+        self._db_path = db_path
+        self._connection = None
+        self.statistics = None
+        # Fonctions appelées avec la liste des modifications (opération, Record) faites par ce processus
+        self.listeners = []
+        # Compteur de SQLite changeant à chaque écriture d'une autre connexion (PRAGMA data_version)
+        self._data_version = None
+        # Faux si la version de SQLite ne fournit pas FTS5 et son tokenizer trigram (voir _open_full_text)
+        self.full_text_search = True
+        # La connexion est partagée avec le thread de recherche : un seul thread l'utilise à la fois
+        self.lock = threading.RLock()
+
+    @property
+    def db_path(self):
+        return self._db_path or default_db_path()
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self.open()
+        return self._connection
+
+    def fetch(self, sql, params=()):
+        """ Exécuter une requête de lecture et retourner toutes ses lignes. """
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def open(self):
+        """ Ouvrir la base et créer les tables et index si nécessaire. """
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(TABLE_SCHEMA)
+        if self._connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._upgrade_schema()
+        self._connection.executescript(INDEX_SCHEMA)
+        self._open_full_text()
+
+    def _open_full_text(self):
+        # Sans trigram (SQLite < 3.34 ou compilé sans FTS5), les recherches parcourent la table avec instr()
+        connection = self._connection
+        triggers = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        try:
+            connection.execute(TRIGRAM_PROBE)
+            connection.execute("DROP TABLE temp.trigram_probe")
+        except sqlite3.OperationalError as e:
+            self.full_text_search = False
+            print(f"Index plein texte indisponible (SQLite {sqlite3.sqlite_version}, FTS5 et le tokenizer trigram "
+                  f"nécessitent SQLite 3.34 ou plus : {e}). La recherche parcourt toute la table.", file=sys.stderr)
+            # Base créée avec une version plus récente : ses déclencheurs feraient échouer toutes les écritures
+            with connection:
+                for name in FTS_TRIGGERS:
+                    connection.execute(f"DROP TRIGGER IF EXISTS {name}")
+            return
+        self.full_text_search = True
+        existed = connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'applications_fts'").fetchone() is not None
+        connection.executescript(FTS_SCHEMA)
+        if existed and not triggers.issuperset(FTS_TRIGGERS):
+            # Index non tenu à jour (déclencheurs supprimés par une version sans trigram, ou par la mise à jour du
+            # schéma) : le reconstruire à partir de la table
+            with connection:
+                connection.execute("INSERT INTO applications_fts (applications_fts) VALUES ('rebuild')")
+
+    def _upgrade_schema(self):
+        # Mettre à jour les bases créées par une version antérieure : clés de tri pré-calculées, puis AUTOINCREMENT
+        connection = self._connection
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(applications)")}
+        with connection:
+            if "date_key" not in columns:
+                connection.execute("DROP INDEX IF EXISTS applications_date")
+                connection.execute("DROP INDEX IF EXISTS applications_status")
+                connection.execute("ALTER TABLE applications ADD COLUMN date_key INTEGER NOT NULL DEFAULT 0")
+                connection.execute("ALTER TABLE applications ADD COLUMN status_key INTEGER NOT NULL DEFAULT 0")
+                rows = connection.execute("SELECT id, application_date, status FROM applications").fetchall()
+                connection.executemany("UPDATE applications SET date_key = ?, status_key = ? WHERE id = ?",
+                                       ((parse_date(date_str)[0], status_sort_key(status), row_id) for row_id, date_str, status in rows))
+            table_sql = connection.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'applications'").fetchone()[0]
+            if "AUTOINCREMENT" not in table_sql.upper():
+                # Recréer la table (SQLite ne permet pas de modifier la clé primaire), en conservant les identifiants ;
+                # index et déclencheurs disparaissent avec l'ancienne table et sont recréés par INDEX_SCHEMA et FTS_SCHEMA
+                connection.execute(APPLICATIONS_TABLE.replace("IF NOT EXISTS applications", "applications_upgrade"))
+                connection.execute(f"INSERT INTO applications_upgrade ({TABLE_COLUMNS}) SELECT {TABLE_COLUMNS} FROM applications")
+                connection.execute("DROP TABLE applications")
+                connection.execute("ALTER TABLE applications_upgrade RENAME TO applications")
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def load(self):
+        """ Retourner la base sous forme de vue : aucune candidature n'est chargée à l'avance. """
+        if self._connection is None:
+            self.open()
+        applications = SqliteApplications(self)
+        self.statistics = self._load_statistics(applications)
+        self._data_version = self.fetch("PRAGMA data_version")[0][0]
+        return {"applications": applications, STATISTICS_KEY: self.statistics}
+
+    def _load_statistics(self, applications):
+        # Statistiques enregistrées, recalculées (une fois) si elles manquent ou ne correspondent plus à la table
+        rows = self.fetch("SELECT data FROM statistics WHERE id = 1")
+        if rows:
+            try:
+                statistics = ApplicationStats.from_dict(json.loads(rows[0][0]))
+            except (KeyError, TypeError, ValueError):
+                statistics = None
+            if statistics is not None and statistics.total == len(applications):
+                return statistics
+        with self.lock, self.connection:
+            statistics = ApplicationStats.from_applications(applications)
+            self._save_statistics(statistics)
+        return statistics
+
+    @contextmanager
+    def _restoring_statistics(self, statistics):
+        # Si la transaction est annulée, revenir aux statistiques enregistrées dans la base
+        try:
+            yield
+        except BaseException:
+            statistics.restore(self._load_statistics(SqliteApplications(self)).to_dict())
+            raise
+
+    def _existing(self, applications, record_id):
+        record = applications.get(record_id)
+        if record is None:
+            raise KeyError(record_id)
+        return record
+
+    def _save_statistics(self, statistics):
+        # À appeler dans la transaction de la modification correspondante
+        self.connection.execute("INSERT OR REPLACE INTO statistics (id, data) VALUES (1, ?)", (json.dumps(statistics.to_dict()),))
+
+    def sync(self, database=None, blocking=True):
+        """ Relire les statistiques si un autre processus a modifié la base. Retourne True dans ce cas.
+
+        Les candidatures ne sont pas gardées en mémoire : il suffit ensuite de relancer la requête de la page affichée.
+        Sans attente (blocking=False), retourne False si la connexion est occupée par le thread de recherche.
+        """
+        if not self.lock.acquire(blocking):
+            return False
+        try:
+            return self._sync()
+        finally:
+            self.lock.release()
+
+    def _sync(self):
+        data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+        rows = self.connection.execute("SELECT data FROM statistics WHERE id = 1").fetchall()
+        if self.statistics is not None and rows:
+            self.statistics.restore(json.loads(rows[0][0]))
+        return True
+
+    def apply(self, change, database):
+        """ Appliquer une modification (ajout, mise à jour ou suppression) et ses statistiques dans une transaction.
+
+        Une mise à jour préparée à partir d'une version antérieure de la candidature (clé "base") est fusionnée avec
+        la version actuelle (voir storage.merge_change). Retourne la candidature enregistrée, ou None si la
+        modification n'avait plus d'objet.
+        """
+        statistics = self.statistics or self.load()[STATISTICS_KEY]
+        applications = SqliteApplications(self)
+        with self.lock, self._restoring_statistics(statistics), self.connection:
+            # Transaction en écriture dès le début : la candidature lue pour la fusion ne peut plus changer
+            self.connection.execute("BEGIN IMMEDIATE")
+            self._sync()
+            change = merge_change(change, applications)
+            if change is None:
+                return None
+            if change["op"] == "add":
+                record = as_record(change["record"])
+                cursor = self.connection.execute(INSERT_SQL, record_to_insert_row(record))
+                record.id = cursor.lastrowid
+                statistics.add(record)
+            elif change["op"] == "update":
+                record = as_record(change["record"])
+                previous = self._existing(applications, change["id"])
+                self.connection.execute(UPDATE_SQL, record_to_row(record) + (change["id"],))
+                statistics.remove(previous)
+                statistics.add(record)
+            elif change["op"] == "delete":
+                previous = self._existing(applications, change["id"])
+                self.connection.execute("DELETE FROM applications WHERE id = ?", (change["id"],))
+                statistics.remove(previous)
+                record = previous
+            else:
+                raise ValueError(f"Opération inconnue : {change['op']}")
+            self._save_statistics(statistics)
+        for listener in self.listeners:
+            listener([(change["op"], record)])
+        return record
+
+    def compact(self, database):
+        """ Remplacer toute la table par les candidatures données (sans effet si la base est déjà cette table). """
+        applications = database["applications"]
+        if isinstance(applications, SqliteApplications) and applications.storage is self:
+            return
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM applications")
+            self.connection.executemany(INSERT_SQL, (record_to_insert_row(record) for record in applications))
+            self.statistics = ApplicationStats.from_applications(SqliteApplications(self))
+            self._save_statistics(self.statistics)
+
+    def import_applications(self, applications):
+        """ Ajouter des candidatures en une seule transaction (avec de nouveaux identifiants). Retourne le nombre ajouté. """
+        statistics = self.statistics or self.load()[STATISTICS_KEY]
+
+        def rows():
+            for record in applications:
+                record = as_record(record)
+                statistics.add(record)
+                yield (None,) + record_to_row(record)
+
+        with self.lock, self._restoring_statistics(statistics), self.connection:
+            cursor = self.connection.executemany(INSERT_SQL, rows())
+            self._save_statistics(statistics)
+        return cursor.rowcount
+
+    def count(self, search_text):
+        """ Nombre de candidatures dont l'entreprise ou le poste contient le texte. """
+        where, params = self._search_clause(search_text)
+        return self.fetch(f"SELECT COUNT(*) FROM applications {where}", params)[0][0]
+
+    def query(self, search_text, sort_by, ascending, offset, limit):
+        """ Retourner le nombre total de résultats et uniquement les candidatures de la page demandée. """
+        with self.lock:
+            total = self.count(search_text)
+            if limit <= 0:
+                return total, []
+            where, params = self._search_clause(search_text)
+            if sort_by:
+                # L'ordre décroissant est l'inverse exact de l'ordre croissant (comme la vue en mémoire)
+                direction = "ASC" if ascending else "DESC"
+                order = f"{SORT_COLUMNS[sort_by]} {direction}, id {direction}"
+            else:
+                order = "id"
+            rows = self.fetch(f"SELECT {SELECT_COLUMNS} FROM applications {where} ORDER BY {order} LIMIT ? OFFSET ?", params + (limit, offset))
+        return total, [row_to_record(row) for row in rows]
+
+    def _search_clause(self, search_text):
+        query = search_text.lower()
+        if not query:
+            return "", ()
+        substring = "(instr(company_lower, ?) > 0 OR instr(title_lower, ?) > 0)"
+        if len(query) < FTS_MIN_LENGTH or not self.full_text_search:
+            return f"WHERE {substring}", (query, query)
+        # L'index trigram trouve les candidats, instr() vérifie la sous-chaîne exacte
+        phrase = '{company_lower title_lower} : "' + query.replace('"', '""') + '"'
+        return f"WHERE id IN (SELECT rowid FROM applications_fts WHERE applications_fts MATCH ?) AND {substring}", (phrase, query, query)
@@ -0,0 +1,110 @@
+""" Statistiques des candidatures (statuts, semaines, mois, entreprises), maintenues à chaque modification. """
+import heapq
+from datetime import date
+from functools import lru_cache
+from records import Status
+
+# Statuts comptés comme une réponse de l'entreprise
+RESPONSE_STATUSES = (Status.ACCEPTED, Status.REFUSED)
+
+
+@lru_cache(maxsize=8192)
+def period_keys(date_key):
+    """ Clés de mois ("AAAA-MM") et de semaine ISO ("AAAA-Sss") d'une date, ou (None, None) si elle est invalide. """
+    if not date_key:
+        return None, None
+    day = date.fromordinal(date_key)
+    year, week, _ = day.isocalendar()
+    return f"{day.year:04d}-{day.month:02d}", f"{year:04d}-S{week:02d}"
+
+
+def increment(counts, key, delta):
+    # Ajouter `delta` au compteur de la clé, en retirant les compteurs revenus à zéro
+    count = counts.get(key, 0) + delta
+    if count:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
+
+
+class ApplicationStats:
+    """ Agrégats des candidatures. Chaque ajout ou suppression coûte O(1), quelle que soit la taille de la base.
+
+    Une candidature modifiée doit être retirée avec ses anciennes valeurs puis ajoutée avec les nouvelles.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.by_status = {}  # Libellé du statut -> nombre de candidatures
+        self.by_month = {}  # "AAAA-MM" -> nombre de candidatures
+        self.by_week = {}  # "AAAA-Sss" -> nombre de candidatures
+        self.by_company = {}  # Entreprise -> nombre de candidatures
+        self.responses_by_company = {}  # Entreprise -> nombre de candidatures acceptées ou refusées
+
+    @classmethod
+    def from_applications(cls, applications):
+        """ Calculer les statistiques d'une base complète (parcours unique). """
+        stats = cls()
+        for record in applications:
+            stats.add(record)
+        return stats
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.restore(data)
+        return stats
+
+    def restore(self, data):
+        """ Remplacer les agrégats par ceux d'un dictionnaire produit par to_dict. """
+        self.total = data["total"]
+        self.by_status = dict(data["by_status"])
+        self.by_month = dict(data["by_month"])
+        self.by_week = dict(data["by_week"])
+        self.by_company = dict(data["by_company"])
+        self.responses_by_company = dict(data["responses_by_company"])
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "by_status": self.by_status,
+            "by_month": self.by_month,
+            "by_week": self.by_week,
+            "by_company": self.by_company,
+            "responses_by_company": self.responses_by_company,
+        }
+
+    def add(self, record):
+        self._count(record, 1)
+
+    def remove(self, record):
+        self._count(record, -1)
+
+    def response_rate(self, company=None):
+        """ Part des candidatures ayant reçu une réponse (toutes entreprises, ou une seule). """
+        if company is None:
+            responses = sum(self.by_status.get(status.label, 0) for status in RESPONSE_STATUSES)
+            return responses / self.total if self.total else 0.0
+        count = self.by_company.get(company, 0)
+        return self.responses_by_company.get(company, 0) / count if count else 0.0
+
+    def recent_weeks(self, count):
+        """ (semaine, nombre de candidatures) des `count` semaines les plus récentes, de la plus récente à la plus ancienne. """
+        return heapq.nlargest(count, self.by_week.items())
+
+    def top_companies(self, count):
+        """ (entreprise, candidatures, réponses, taux de réponse) des `count` entreprises ayant le plus de candidatures. """
+        companies = heapq.nlargest(count, self.by_company.items(), key=lambda item: item[1])
+        return [(company, total, self.responses_by_company.get(company, 0), self.response_rate(company)) for company, total in companies]
+
+    def _count(self, record, delta):
+        self.total += delta
+        increment(self.by_status, record.status, delta)
+        month, week = period_keys(record.date_key)
+        if month is not None:
+            increment(self.by_month, month, delta)
+            increment(self.by_week, week, delta)
+        company = record.company_name.strip()
+        increment(self.by_company, company, delta)
+        if record.status_enum in RESPONSE_STATUSES:
+            increment(self.responses_by_company, company, delta)
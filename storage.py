@@ -0,0 +1,690 @@
+""" Stockage des candidatures : instantané JSON et journal des modifications en ajout seul. """
+import os
+import re
+import json
+import tempfile
+import threading
+from itertools import islice
+from records import Applications, as_record, merge_records, to_json
+from stats import ApplicationStats
+
+try:
+    import fcntl
+except ImportError:
+    # Pas de verrou entre processus sur les systèmes sans fcntl (Windows)
+    fcntl = None
+
+# Nombre minimal de modifications journalisées avant de compacter le journal dans l'instantané
+COMPACT_THRESHOLD = 200
+
+# Au-delà du minimum, le journal est compacté quand il compte autant de modifications que cette fraction des
+# candidatures : le coût de la réécriture de l'instantané, proportionnel à sa taille, reste constant par modification
+COMPACT_RATIO = 0.25
+
+# Clé de l'instantané indiquant quelle génération de journal s'applique par-dessus
+GENERATION_KEY = "journal_generation"
+
+# Clé de l'instantané conservant le prochain identifiant, pour ne jamais réattribuer celui d'une candidature supprimée
+NEXT_ID_KEY = "next_id"
+
+# Clé des statistiques de la base (instantané JSON et base en mémoire), mises à jour à chaque modification
+STATISTICS_KEY = "statistics"
+
+# Taille des blocs lus dans l'instantané JSON
+READ_CHUNK_SIZE = 1 << 16
+
+# Nombre de candidatures encodées à la fois lors de l'écriture de l'instantané
+WRITE_BATCH_SIZE = 1000
+
+# Nombre de candidatures du premier lot chargé (de quoi afficher la première page au plus vite), puis des lots suivants
+FIRST_BATCH_SIZE = 100
+LOAD_BATCH_SIZE = 2000
+
+# Variable d'environnement permettant de choisir le moteur de stockage ("json" par défaut, ou "sqlite")
+STORAGE_ENV_VAR = "JOBGESTION_STORAGE"
+
+
+def default_json_path():
+    """ Chemin de l'instantané dans le répertoire de l'utilisateur. """
+    return os.path.join(os.path.expanduser("~"), "applications.json")
+
+
+def change_id(applications, change):
+    """ Identifiant visé par une modification (les journaux antérieurs aux identifiants donnent une position). """
+    if "id" in change:
+        return change["id"]
+    return applications.id_at(change["index"])
+
+
+def apply_change(database, change):
+    """ Appliquer une modification journalisée (ajout, mise à jour ou suppression) à la base en mémoire.
+
+    Les statistiques de la base sont mises à jour. Une mise à jour remplace la candidature par un nouvel objet :
+    l'ancien fournit les valeurs à retirer des statistiques. Retourne la candidature ajoutée, mise à jour ou supprimée.
+    """
+    applications = database["applications"]
+    statistics = database.get(STATISTICS_KEY)
+    if change["op"] == "add":
+        record = applications.add(as_record(change["record"]))
+    elif change["op"] == "update":
+        record = as_record(change["record"])
+        record.id = change_id(applications, change)
+        previous = applications.get(record.id)
+        applications.update(record)
+        if statistics is not None:
+            statistics.remove(previous)
+    elif change["op"] == "delete":
+        record = applications.remove(change_id(applications, change))
+        if statistics is not None:
+            statistics.remove(record)
+        return record
+    else:
+        raise ValueError(f"Opération de journal inconnue : {change['op']}")
+    if statistics is not None:
+        statistics.add(record)
+    return record
+
+
+def merge_change(change, applications):
+    """ Adapter une modification préparée à partir d'une version antérieure de la base (clé "base") à son état actuel.
+
+    Une mise à jour d'une candidature modifiée entre-temps par un autre processus est fusionnée champ par champ
+    (voir merge_records) ; celle d'une candidature supprimée entre-temps la recrée. Retourne la modification à
+    appliquer, sans la clé "base", ou None si elle n'a plus d'objet (suppression d'une candidature déjà supprimée).
+    """
+    change = dict(change)
+    base = change.pop("base", None)
+    if change["op"] == "add":
+        return change
+    current = applications.get(change_id(applications, change))
+    if current is None:
+        if change["op"] == "delete":
+            return None
+        record = as_record(change["record"])
+        record.id, record.version = None, 0
+        return {"op": "add", "record": record}
+    if change["op"] == "update":
+        record = as_record(change["record"])
+        if base is not None and as_record(base) != current:
+            record = merge_records(as_record(base), record, current)
+        record.version = current.version + 1
+        change["record"] = record
+    return change
+
+
+def file_identity(path):
+    # Identifie le fichier lui-même : un fichier remplacé par renommage (compactage) change d'identité
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def fsync_directory(path):
+    # Rendre durable le renommage d'un fichier (sans effet sur les systèmes qui ne le permettent pas)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomically(path, write):
+    """ Écrire un fichier via un fichier temporaire puis un renommage, pour ne jamais laisser un fichier à moitié écrit. """
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(prefix=".applications-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    fsync_directory(directory)
+
+
+def write_snapshot(file, metadata, applications):
+    """ Écrire l'instantané : les métadonnées, puis le tableau "applications" à raison d'une candidature par ligne.
+
+    Les candidatures sont encodées une à une avec JSONEncoder.encode, qui utilise l'encodeur C de json (json.dump
+    passe par l'encodeur Python, plus lent) et écrites par lots, sans construire tout le fichier en mémoire.
+    """
+    encode = json.JSONEncoder(default=to_json).encode
+    # Objet des métadonnées sans son accolade fermante, complété par le tableau
+    file.write(encode(metadata)[:-1] + (', "applications": [' if metadata else '"applications": ['))
+    records = iter(applications)
+    separator = "\n"
+    while True:
+        batch = list(islice(records, WRITE_BATCH_SIZE))
+        if not batch:
+            break
+        file.write(separator + ",\n".join(map(encode, batch)))
+        separator = ",\n"
+    file.write("\n]}\n")
+
+
+def open_storage(backend=None, compact_in_background=False):
+    """ Créer le moteur de stockage choisi (par argument ou par la variable d'environnement JOBGESTION_STORAGE).
+
+    `compact_in_background` ne concerne que le stockage JSON (voir JournaledStorage).
+    """
+    backend = backend or os.environ.get(STORAGE_ENV_VAR, "json")
+    if backend == "json":
+        return JournaledStorage(compact_in_background=compact_in_background)
+    if backend == "sqlite":
+        # Import à la demande : le moteur SQLite est optionnel
+        from sqlite_storage import SqliteStorage
+        return SqliteStorage()
+    raise ValueError(f"Moteur de stockage inconnu : {backend}")
+
+
+class FileLock:
+    """ Verrou exclusif consultatif (flock) sur un fichier, partagé par tous les processus utilisant la même base.
+
+    Réentrant dans un même processus : les méthodes du stockage peuvent s'appeler les unes les autres verrou pris.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self, blocking=True):
+        """ Prendre le verrou. Sans attente (blocking=False), retourne False s'il est déjà pris ailleurs. """
+        if not self._thread_lock.acquire(blocking):
+            return False
+        if self._depth == 0:
+            try:
+                self._file = open(self.path, "a")
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BaseException as e:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._thread_lock.release()
+                if isinstance(e, BlockingIOError):
+                    return False
+                raise
+        self._depth += 1
+        return True
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            # Fermer le fichier libère le verrou
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+class JsonStreamReader:
+    """ Lecture incrémentale d'un objet JSON : les éléments d'un tableau sont décodés un à un, sans lire tout le fichier. """
+
+    WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+    def __init__(self, file, chunk_size=READ_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def iter_object(self, array_key, values):
+        """ Parcourir l'objet de premier niveau : générer les éléments du tableau `array_key` et ranger les autres clés dans `values`. """
+        self._expect("{")
+        if self._next_char() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == array_key and self._next_char() == "[":
+                self.pos += 1
+                if self._next_char() == "]":
+                    self.pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._separator("]"):
+                            break
+            else:
+                values[key] = self._value()
+            if self._separator("}"):
+                return
+
+    def _fill(self):
+        # Lire la suite du fichier en oubliant la partie déjà décodée (taille au moins doublée pour les longues valeurs)
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _next_char(self):
+        # Premier caractère significatif, sans le consommer
+        while True:
+            self.pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Fin inattendue du fichier JSON")
+
+    def _expect(self, char):
+        if self._next_char() != char:
+            raise ValueError(f"Caractère {char!r} attendu dans le fichier JSON")
+        self.pos += 1
+
+    def _separator(self, closing):
+        # Consommer une virgule (retourne False) ou le caractère fermant (retourne True)
+        char = self._next_char()
+        self.pos += 1
+        if char == closing:
+            return True
+        if char != ",":
+            raise ValueError(f"Caractère {char!r} inattendu dans le fichier JSON")
+        return False
+
+    def _value(self):
+        self._next_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Valeur coupée par la fin du bloc : lire la suite et recommencer
+                if self._fill():
+                    continue
+                raise
+            # Une valeur qui touche la fin du bloc (nombre, littéral) peut se poursuivre dans le suivant
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+class JournaledStorage:
+    """ Instantané JSON complété par un journal des modifications, rejoué au chargement.
+
+    Plusieurs processus peuvent partager la même base : chaque écriture se fait sous un verrou de fichier, après avoir
+    appliqué les modifications journalisées par les autres, et sync() suit le journal pour récupérer ces modifications
+    sans relire l'instantané.
+    """
+
+    # La recherche, le tri et la pagination sont faits en mémoire par l'application
+    supports_queries = False
+
+    def __init__(self, json_path=None, compact_threshold=COMPACT_THRESHOLD, compact_in_background=False):
+        self._json_path = json_path
+        self.compact_threshold = compact_threshold
+        # Compactage déclenché par apply() exécuté dans un thread (voir _start_compaction), pour ne pas bloquer
+        # l'interface pendant la réécriture de l'instantané
+        self.compact_in_background = compact_in_background
+        self._compaction = None
+        self.generation = 0
+        self.pending_changes = 0
+        # Fonctions appelées avec la liste des modifications (opération, Record) appliquées à la base en mémoire,
+        # qu'elles viennent de ce processus ou d'un autre
+        self.listeners = []
+        self._lock = None
+        # Journal gardé ouvert en lecture, identité du fichier et position de la fin de la dernière modification lue
+        self._journal = None
+        self._journal_identity = None
+        self._journal_offset = 0
+
+    @property
+    def json_path(self):
+        return self._json_path or default_json_path()
+
+    @property
+    def journal_path(self):
+        return os.path.splitext(self.json_path)[0] + ".journal"
+
+    @property
+    def lock(self):
+        if self._lock is None:
+            self._lock = FileLock(os.path.splitext(self.json_path)[0] + ".lock")
+        return self._lock
+
+    def load(self):
+        """ Charger l'instantané puis rejouer le journal correspondant. Les candidatures sont converties en Record. """
+        database = {"applications": Applications()}
+        for _ in self.load_incrementally(database):
+            pass
+        return database
+
+    def load_incrementally(self, database, batch_size=LOAD_BATCH_SIZE, first_batch_size=FIRST_BATCH_SIZE):
+        """ Charger l'instantané par lots, sans le lire en entier, dans `database` (initialement vide), puis rejouer le journal.
+
+        Après chaque lot, génère les modifications appliquées : des couples (opération, Record), l'opération étant
+        "add", "update" ou "delete".
+
+        L'instantané est lu sans verrou (un compactage le remplace par renommage, le fichier ouvert reste cohérent) ;
+        seul le journal est rejoué verrou pris. Si l'instantané a été remplacé pendant la lecture, la base est relue
+        verrou pris et les différences sont appliquées.
+        """
+        snapshot = file_identity(self.json_path)
+        yield from self._read_snapshot(database, batch_size, first_batch_size)
+        with self.lock:
+            if file_identity(self.json_path) != snapshot:
+                changes = self._reload(database)
+            else:
+                changes = self._replay_or_reset(database)
+        if changes:
+            yield changes
+
+    def _read_snapshot(self, database, batch_size, first_batch_size):
+        applications = database["applications"]
+        statistics = database[STATISTICS_KEY] = ApplicationStats()
+        persisted = False
+        metadata = {}
+        if os.path.exists(self.json_path):
+            with open(self.json_path, "r") as file:
+                batch, limit = [], first_batch_size
+                # Les candidatures sans identifiant (fichiers antérieurs) en reçoivent un dans l'ordre du fichier
+                for application in JsonStreamReader(file).iter_object("applications", metadata):
+                    if not batch and not applications and STATISTICS_KEY in metadata:
+                        # Statistiques enregistrées avant le tableau (voir compact) : inutile de les recalculer
+                        statistics = database[STATISTICS_KEY] = self._persisted_statistics(metadata[STATISTICS_KEY])
+                        persisted = statistics is not None
+                        if not persisted:
+                            statistics = database[STATISTICS_KEY] = ApplicationStats()
+                    record = applications.add(as_record(application))
+                    if not persisted:
+                        statistics.add(record)
+                    batch.append(("add", record))
+                    if len(batch) >= limit:
+                        yield batch
+                        batch, limit = [], batch_size
+                if batch:
+                    yield batch
+        # Les autres clés de l'instantané sont lues après le tableau des candidatures
+        metadata.pop("applications", None)
+        metadata.pop(STATISTICS_KEY, None)
+        if persisted and statistics.total != len(applications):
+            # Statistiques incohérentes avec les candidatures (fichier modifié à la main) : les recalculer
+            database[STATISTICS_KEY] = ApplicationStats.from_applications(applications)
+        applications.next_id = max(applications.next_id, metadata.pop(NEXT_ID_KEY, 1))
+        self.generation = metadata.pop(GENERATION_KEY, 0)
+        database.update(metadata)
+
+    def _replay_or_reset(self, database):
+        # À appeler verrou pris, après la lecture de l'instantané. Retourne les modifications rejouées
+        replayed = []
+        if self._replay_journal(database, replayed) is None:
+            # Journal absent ou périmé (arrêt pendant un compactage) : repartir d'un journal vide
+            self._reset_journal()
+        self.pending_changes = len(replayed)
+        if self._needs_compaction(database):
+            self._compact(database)
+        return replayed
+
+    def apply(self, change, database):
+        """ Appliquer une modification à la base en mémoire puis la journaliser. Coût proportionnel à la modification.
+
+        Les modifications des autres processus sont appliquées d'abord, et une mise à jour préparée à partir d'une
+        version antérieure de la candidature (clé "base") est fusionnée avec la version actuelle (voir merge_change).
+        Retourne la candidature enregistrée, ou None si la modification n'avait plus d'objet.
+        """
+        with self.lock:
+            self._sync(database)
+            change = merge_change(change, database["applications"])
+            if change is None:
+                return None
+            record = apply_change(database, change)
+            self._append([change])
+            self._notify([(change["op"], record)])
+            if self._needs_compaction(database):
+                if self.compact_in_background:
+                    self._start_compaction(database)
+                else:
+                    self._compact(database)
+        return record
+
+    def _needs_compaction(self, database):
+        return self.pending_changes >= max(self.compact_threshold, int(len(database["applications"]) * COMPACT_RATIO))
+
+    def _append(self, changes):
+        # À appeler verrou pris : journaliser des modifications déjà appliquées à la base en mémoire
+        if not os.path.exists(self.journal_path):
+            self._reset_journal()
+        with open(self.journal_path, "a") as file:
+            if self._journal is not None and file.tell() > self._journal_offset:
+                # Ligne incomplète laissée par un processus arrêté pendant l'écriture
+                file.truncate(self._journal_offset)
+            for change in changes:
+                file.write(json.dumps(change, default=to_json) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+            self._journal_offset = file.tell()
+        self.pending_changes += len(changes)
+
+    def sync(self, database, blocking=True):
+        """ Appliquer à la base en mémoire les modifications enregistrées par d'autres processus depuis la dernière lecture.
+
+        Seules les nouvelles lignes du journal sont lues ; l'instantané n'est relu que si plusieurs compactages ont eu
+        lieu entre deux appels. Retourne True si la base a changé. Sans attente (blocking=False), retourne False si
+        un autre processus écrit dans la base : il suffit de réessayer plus tard.
+        """
+        if not self.lock.acquire(blocking):
+            return False
+        try:
+            return bool(self._sync(database))
+        finally:
+            self.lock.release()
+
+    def _sync(self, database):
+        # À appeler verrou pris. Retourne les modifications appliquées, après les avoir transmises aux listeners
+        if self._journal is None:
+            return []
+        changes = self._read_journal(database)
+        if file_identity(self.journal_path) != self._journal_identity:
+            # Journal remplacé : un autre processus a compacté la base, après avoir lu tout l'ancien journal
+            if self._journal_generation() == self.generation + 1:
+                # Toute modification est journalisée avant un compactage (import compris) : l'instantané contient
+                # exactement la base en mémoire, il suffit de suivre le nouveau journal
+                self.generation += 1
+                self.pending_changes = 0
+                self._open_journal()
+                changes += self._read_journal(database)
+            else:
+                changes += self._reload(database)
+        if changes:
+            self._notify(changes)
+        return changes
+
+    def _read_journal(self, database):
+        # Appliquer les lignes complètes écrites depuis la dernière lecture
+        changes = []
+        self._journal.seek(self._journal_offset)
+        for line in iter(self._journal.readline, b""):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("ligne incomplète")
+                change = json.loads(line)
+            except ValueError:
+                # Écriture interrompue : la ligne sera supprimée à la prochaine modification
+                break
+            changes.append((change["op"], apply_change(database, change)))
+            self._journal_offset = self._journal.tell()
+        self.pending_changes += len(changes)
+        return changes
+
+    def _journal_generation(self):
+        try:
+            with open(self.journal_path, "rb") as file:
+                return json.loads(file.readline()).get("generation")
+        except (OSError, ValueError):
+            return None
+
+    def _reload(self, database):
+        """ Relire toute la base et appliquer à `database` les différences, comme des modifications. """
+        current = self.load()
+        applications = database["applications"]
+        changes = []
+        for record_id in [record.id for record in applications if record.id not in current["applications"]]:
+            changes.append(("delete", apply_change(database, {"op": "delete", "id": record_id})))
+        for record in current["applications"]:
+            previous = applications.get(record.id)
+            if previous is None:
+                changes.append(("add", apply_change(database, {"op": "add", "record": record})))
+            elif previous != record:
+                changes.append(("update", apply_change(database, {"op": "update", "id": record.id, "record": record})))
+        applications.next_id = max(applications.next_id, current["applications"].next_id)
+        return changes
+
+    def _notify(self, changes):
+        for listener in self.listeners:
+            listener(changes)
+
+    def import_applications(self, applications):
+        """ Ajouter des candidatures (avec de nouveaux identifiants) puis réécrire l'instantané une seule fois.
+
+        La base est relue : à appeler sur un stockage dont aucune base en mémoire n'est suivie par sync() (script
+        d'import). Retourne le nombre de candidatures ajoutées.
+        """
+        # Verrou gardé de la lecture à la réécriture : aucune modification d'un autre processus ne peut être perdue.
+        # Les ajouts sont aussi journalisés : les autres processus les lisent avant de suivre le nouveau journal
+        # (voir _sync), comme pour tout compactage
+        with self.lock:
+            database = self.load()
+            changes = []
+            for record in applications:
+                record = as_record(record)
+                record.id, record.version = None, 0
+                change = {"op": "add", "record": record}
+                apply_change(database, change)
+                changes.append(change)
+            self._append(changes)
+            self._compact(database)
+        return len(changes)
+
+    def close(self):
+        self.wait_for_compaction()
+        self._close_journal()
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def compact(self, database):
+        """ Réécrire l'instantané complet puis repartir d'un journal vide. """
+        with self.lock:
+            self._sync(database)
+            self._compact(database)
+
+    def wait_for_compaction(self):
+        """ Attendre la fin du compactage en cours dans un thread, s'il y en a un. """
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+
+    def _compact(self, database):
+        self._write_compacted(self._snapshot_metadata(database), database["applications"])
+
+    def _snapshot_metadata(self, database):
+        # Métadonnées avant le tableau des candidatures : le chargement progressif les lit en premier
+        snapshot = {GENERATION_KEY: self.generation + 1, NEXT_ID_KEY: database["applications"].next_id}
+        snapshot.update((key, value) for key, value in database.items() if key not in ("applications", STATISTICS_KEY))
+        if database.get(STATISTICS_KEY) is not None:
+            snapshot[STATISTICS_KEY] = database[STATISTICS_KEY].to_dict()
+        return snapshot
+
+    def _write_compacted(self, snapshot, applications):
+        # À appeler verrou pris, avec un journal entièrement lu et appliqué à `applications`
+        write_atomically(self.json_path, lambda file: write_snapshot(file, snapshot, applications))
+        # Si l'application s'arrête ici, l'ancien journal porte l'ancienne génération et sera ignoré
+        self.generation = snapshot[GENERATION_KEY]
+        self._reset_journal()
+        self.pending_changes = 0
+
+    def _start_compaction(self, database):
+        # À appeler verrou pris. Les mises à jour remplacent les candidatures par de nouveaux objets : une copie de la
+        # liste suffit à figer l'état actuel, que le thread de compactage écrit après avoir repris le verrou
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        journal = (self._journal_identity, self._journal_offset)
+        self._compaction = threading.Thread(target=self._compact_copy, name="compactage",
+                                            args=(self._snapshot_metadata(database), list(database["applications"]), journal))
+        self._compaction.start()
+
+    def _compact_copy(self, snapshot, applications, journal):
+        # Exécuté dans le thread de compactage. Pendant l'écriture, le verrou est pris : les autres processus et les
+        # modifications de ce processus attendent (la vérification du journal par l'interface, elle, n'attend pas)
+        with self.lock:
+            identity = file_identity(self.journal_path)
+            if (identity, identity and os.path.getsize(self.journal_path)) != journal:
+                # Modification journalisée depuis la copie, ici ou dans un autre processus : la copie est périmée,
+                # le prochain apply() relancera le compactage
+                return
+            self._write_compacted(snapshot, applications)
+
+    def _persisted_statistics(self, data):
+        # Statistiques de l'instantané, ou None si elles sont illisibles
+        try:
+            return ApplicationStats.from_dict(data)
+        except (KeyError, TypeError):
+            return None
+
+    def _reset_journal(self):
+        header = json.dumps({"generation": self.generation}) + "\n"
+        write_atomically(self.journal_path, lambda file: file.write(header))
+        self._open_journal()
+
+    def _open_journal(self, offset=None):
+        # Garder le journal ouvert pour y lire les modifications des autres processus (par défaut après l'en-tête)
+        self._close_journal()
+        self._journal = open(self.journal_path, "rb")
+        stat = os.fstat(self._journal.fileno())
+        self._journal_identity = stat.st_dev, stat.st_ino
+        if offset is None:
+            self._journal.readline()
+            offset = self._journal.tell()
+        self._journal_offset = offset
+
+    def _replay_journal(self, database, replayed):
+        # Rejouer les modifications du journal s'il correspond à la génération de l'instantané
+        # (les modifications appliquées sont ajoutées à `replayed`)
+        if not os.path.exists(self.journal_path):
+            return None
+        with open(self.journal_path, "rb+") as file:
+            header = file.readline()
+            try:
+                if json.loads(header).get("generation") != self.generation:
+                    return None
+            except ValueError:
+                return None
+            valid_offset = file.tell()
+            for line in iter(file.readline, b""):
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("ligne incomplète")
+                    change = json.loads(line)
+                except ValueError:
+                    # Dernière ligne tronquée par un arrêt pendant l'écriture : l'ignorer et la supprimer
+                    file.truncate(valid_offset)
+                    break
+                replayed.append((change["op"], apply_change(database, change)))
+                valid_offset = file.tell()
+        self._open_journal(valid_offset)
+        return len(replayed)
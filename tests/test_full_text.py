@@ -0,0 +1,127 @@
+""" Tests de la recherche plein texte : découpage en mots, classement, complétion et index enregistré. """
+import time
+
+import pytest
+
+import full_text
+from full_text import FullTextIndex, fold, tokenize
+from records import Record
+
+
+def make_record(record_id, comment="", letter=""):
+    return Record(company_name=f"Entreprise {record_id}", job_title="Développeur", comment=comment,
+                  cover_letter_path=letter, id=record_id)
+
+
+def wait_idle(index, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not (index.ready and index._pending_tasks == 0):
+        assert time.monotonic() < deadline, "index toujours occupé"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def make_index(tmp_path):
+    def make(records, workers=2):
+        index = FullTextIndex(str(tmp_path / "fulltext.json"), workers=workers)
+        index.save_delay = 0.05
+        index.start(list(records))
+        wait_idle(index)
+        return index
+    return make
+
+
+def test_fold_removes_accents_and_case():
+    assert fold("Éléonore, ŒUVRE Ça") == "eleonore, oeuvre ca"
+    assert fold("Noël à l'hôpital") == "noel a l'hopital"
+
+
+def test_tokenize_drops_stopwords_and_single_letters():
+    assert tokenize("Le développeur a relancé l'équipe à Paris !") == ["developpeur", "relance", "equipe", "paris"]
+    assert tokenize("") == []
+
+
+def test_search_requires_every_word(make_index):
+    index = make_index([make_record(1, "entretien technique python"), make_record(2, "entretien RH"), make_record(3, "python")])
+    assert index.search("Entretien python") == [1]
+    assert set(index.search("entretien")) == {1, 2}
+    assert index.search("java") == []
+    assert index.search("le la les") == []
+
+
+def test_bm25_ranking(make_index):
+    index = make_index([
+        make_record(1, "python " + "mot " * 40),
+        make_record(2, "python python relance"),
+        make_record(3, "relance " * 5),
+    ])
+    # Plus d'occurrences dans un texte plus court : meilleur score
+    assert index.search("python") == [2, 1]
+    assert index.search("relance")[0] == 3
+
+
+def test_last_word_is_completed(make_index):
+    index = make_index([make_record(1, "entretien lundi"), make_record(2, "entreprise lyon"), make_record(3, "entre deux")])
+    assert set(index.search("entre")) == {1, 2, 3}
+    assert set(index.search("entret")) == {1}
+    # Seul le dernier mot est complété, et seulement à partir de PREFIX_MIN_LENGTH caractères
+    assert index.search("entre lyon") == []
+    assert index.search("lu") == []
+    assert index.search("lundi entr") == [1]
+
+
+def test_updates_and_removals(make_index):
+    index = make_index([make_record(1, "python"), make_record(2, "java")])
+    assert index.search("python") == [1]
+    index.update(make_record(2, "python confirmé"))
+    assert set(index.search("python")) == {1, 2}
+    assert index.search("java") == []
+    index.remove(1)
+    assert index.search("python") == [2]
+
+
+def test_letters_are_indexed(make_index, tmp_path):
+    letter = tmp_path / "lettre.txt"
+    letter.write_text("Madame, Monsieur, je souhaite rejoindre votre équipe data.", encoding="utf-8")
+    index = make_index([make_record(1, letter=str(letter)), make_record(2, letter=str(letter)), make_record(3, "data")])
+    assert set(index.search("rejoindre")) == {1, 2}
+    # Le mot du commentaire pèse plus que celui de la lettre
+    assert index.search("data")[0] == 3
+
+
+def test_saved_index_is_reloaded(make_index, tmp_path, monkeypatch):
+    letter = tmp_path / "lettre.txt"
+    letter.write_text("candidature spontanée", encoding="utf-8")
+    records = [make_record(1, "relance prévue", str(letter)), make_record(2, "entretien")]
+    index = make_index(records)
+    index.save()
+
+    # Lettre inchangée : elle n'est pas relue
+    monkeypatch.setattr(full_text, "extract_text", lambda path: pytest.fail("lettre relue"))
+    reloaded = make_index(records)
+    assert reloaded.search("spontanee") == [1]
+    assert reloaded.search("relance") == [1]
+    assert reloaded._records == index._records
+    assert reloaded.comments.postings == index.comments.postings
+
+
+def test_changes_are_saved_after_a_delay(make_index, tmp_path):
+    index = make_index([make_record(1, "python")])
+    index.update(make_record(2, "golang"))
+    deadline = time.monotonic() + 5
+    while index._dirty or index._save_timer is not None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    time.sleep(0.05)
+    reloaded = make_index([make_record(1, "python"), make_record(2, "golang")])
+    assert reloaded.search("golang") == [2]
+
+
+def test_failing_task_does_not_stop_workers(make_index, capsys):
+    index = make_index([make_record(1, None)], workers=1)
+    index._submit(lambda: 1 / 0)
+    wait_idle(index)
+    index.update(make_record(2, "toujours indexé"))
+    wait_idle(index)
+    assert index.search("toujours") == [2]
+    assert "ZeroDivisionError" in capsys.readouterr().err
@@ -0,0 +1,78 @@
+""" Tests de l'import et de l'export en masse (CSV et NDJSON). """
+import io
+
+import pytest
+
+from import_export import export_file, import_file, read_applications
+from storage import JournaledStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return JournaledStorage(str(tmp_path / "applications.json"))
+
+
+def read(text, file_format="csv"):
+    return list(read_applications(io.StringIO(text, newline=""), file_format))
+
+
+def test_csv_import_and_export_round_trip(storage, tmp_path):
+    path = tmp_path / "candidatures.csv"
+    path.write_text("company_name,job_title,status,comment\nACME,Développeur,Refusé,\"ligne 1\nligne 2\"\nGlobex,Testeur,Accepté,\n",
+                    encoding="utf-8")
+    assert import_file(storage, str(path), "csv") == 2
+    exported = tmp_path / "export.csv"
+    assert export_file(JournaledStorage(storage.json_path), str(exported), "csv") == 2
+    records = read(exported.read_text(encoding="utf-8"))
+    assert [(r.company_name, r.job_title, r.status, r.comment) for r in records] == [
+        ("ACME", "Développeur", "Refusé", "ligne 1\nligne 2"), ("Globex", "Testeur", "Accepté", "")]
+
+
+def test_csv_with_byte_order_mark(storage, tmp_path):
+    # Excel ajoute un BOM en tête des CSV UTF-8
+    path = tmp_path / "excel.csv"
+    path.write_bytes("company_name,job_title\nACME,Développeur\n".encode("utf-8-sig"))
+    assert import_file(storage, str(path), "csv") == 1
+    assert JournaledStorage(storage.json_path).load()["applications"].get(1).company_name == "ACME"
+
+
+def test_unknown_or_missing_columns_are_rejected():
+    with pytest.raises(ValueError, match=r"colonnes inconnues \['salaire'\]"):
+        read("company_name,job_title,salaire\nACME,Développeur,1\n")
+    with pytest.raises(ValueError, match=r"colonnes manquantes \['job_title'\]"):
+        read("company_name,comment\nACME,\n")
+    # Un fichier vide ne contient aucune candidature
+    assert read("") == []
+
+
+def test_semicolon_delimiter_is_reported():
+    with pytest.raises(ValueError, match="points-virgules"):
+        read("company_name;job_title\nACME;Développeur\n")
+    with pytest.raises(ValueError) as error:
+        read("company_name,job_title,salary\nACME,Développeur,1\n")
+    assert "points-virgules" not in str(error.value)
+
+
+@pytest.mark.parametrize("text, file_format, line", [
+    ("company_name,job_title\nACME,Développeur\n  ,Testeur\n", "csv", 3),
+    ("company_name,job_title\nACME\n", "csv", 2),
+    ('{"company_name": "ACME", "job_title": "Développeur"}\n\n{"company_name": "Globex"}\n', "ndjson", 3),
+])
+def test_missing_required_fields_are_rejected(text, file_format, line):
+    with pytest.raises(ValueError, match=f"Ligne {line} : champ\\(s\\) obligatoire\\(s\\) vide\\(s\\)"):
+        read(text, file_format)
+
+
+def test_invalid_ndjson_lines_are_rejected():
+    with pytest.raises(ValueError, match="Ligne 2 invalide"):
+        read('{"company_name": "ACME", "job_title": "Développeur"}\n{"company_name": \n', "ndjson")
+    with pytest.raises(ValueError, match="objet JSON attendu, list trouvé"):
+        read('[1, 2]\n', "ndjson")
+
+
+def test_failed_import_writes_nothing(storage, tmp_path):
+    path = tmp_path / "candidatures.ndjson"
+    path.write_text('{"company_name": "ACME", "job_title": "Développeur", "id": 42}\n{"company_name": "Globex"}\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        import_file(storage, str(path), "ndjson")
+    assert len(JournaledStorage(storage.json_path).load()["applications"]) == 0
@@ -0,0 +1,37 @@
+""" Tests de l'analyse des dates et des clés de tri des candidatures. """
+from datetime import date
+
+import pytest
+
+from records import INVALID_DATE, Record, parse_date
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("15-03-2024", date(2024, 3, 15)),
+    ("2024-03-15", date(2024, 3, 15)),
+    ("5-3-2024", date(2024, 3, 5)),
+    ("2024-3-5", date(2024, 3, 5)),
+    ("29-02-2024", date(2024, 2, 29)),
+    (" 15-03-2024 ", date(2024, 3, 15)),
+])
+def test_accepted_formats(text, expected):
+    assert parse_date(text) == (expected.toordinal(), expected.strftime("%d-%m-%Y"))
+
+
+@pytest.mark.parametrize("text", ["", "abc", "15/03/2024", "15-03", "1-2-3-4", "15-13-2024", "29-02-2023", "2024-02-30",
+                                  "aa-03-2024", None, 20240315])
+def test_invalid_dates(text):
+    assert parse_date(text) == (0, INVALID_DATE)
+
+
+def test_invalid_dates_sort_first():
+    records = [Record(application_date=text) for text in ("2024-03-15", "pas une date", "01-01-2020", None)]
+    assert [record.date_display for record in sorted(records, key=lambda record: record.date_key)] == [
+        INVALID_DATE, INVALID_DATE, "01-01-2020", "15-03-2024"]
+
+
+def test_date_is_parsed_again_when_changed():
+    record = Record(application_date="01-01-2020")
+    record.application_date = "2021-06-30"
+    assert (record.date_key, record.date_display) == (date(2021, 6, 30).toordinal(), "30-06-2021")
+    assert record.to_dict()["application_date"] == "2021-06-30"
@@ -0,0 +1,82 @@
+""" Tests de l'index de recherche sur l'entreprise et le poste. """
+import random
+
+import pytest
+
+from records import Record
+from search_index import CACHE_SIZE, SearchIndex
+
+COMPANIES = ["ACME", "Globex", "Initech", "Umbrella", "Hooli", "Soylent", "Stark Industries"]
+TITLES = ["Développeur Python", "Data Engineer", "Chef de projet", "Développeur Java", "DevOps"]
+
+
+def make_records(count, seed=0):
+    rng = random.Random(seed)
+    return [Record(company_name=f"{rng.choice(COMPANIES)} {i}", job_title=rng.choice(TITLES), id=i) for i in range(1, count + 1)]
+
+
+def naive_search(records, text):
+    query = text.lower()
+    return [record for record in records if query in record.company_name.lower() or query in record.job_title.lower()]
+
+
+def ids(records):
+    return [record.id for record in records]
+
+
+@pytest.mark.parametrize("typed", ["développeur python", "acme 1", "stark", "o", "ev"])
+def test_results_narrow_as_the_query_grows(typed):
+    records = make_records(500)
+    index = SearchIndex(records)
+    previous = None
+    # Saisie caractère par caractère, puis effacement : les résultats affinés restent exacts et ordonnés
+    for query in [typed[:n] for n in range(len(typed) + 1)] + [typed[:n] for n in range(len(typed) - 1, -1, -1)]:
+        results = index.search(query)
+        assert ids(results) == ids(naive_search(records, query)), query
+        if previous is not None and len(query) > len(previous[0]):
+            assert set(ids(results)) <= set(ids(previous[1]))
+        previous = query, results
+
+
+def test_search_ignores_case():
+    index = SearchIndex(make_records(50))
+    assert ids(index.search("DÉVELOPPEUR")) == ids(index.search("développeur"))
+
+
+def test_cache_is_invalidated_after_changes():
+    records = make_records(100)
+    index = SearchIndex(records)
+    assert ids(index.search("stark")) == ids(naive_search(records, "stark"))
+    assert index.search("zorg") == []
+
+    renamed = Record(company_name="Zorg Industries", job_title=records[0].job_title, id=records[0].id)
+    index.update(renamed)
+    records[0] = renamed
+    assert ids(index.search("zorg")) == [renamed.id]
+    assert ids(index.search("stark")) == ids(naive_search(records, "stark"))
+
+    added = Record(company_name="Zorglub", job_title="DevOps", id=1000)
+    index.add(added)
+    records.append(added)
+    assert ids(index.search("zorg")) == [renamed.id, added.id]
+
+    index.remove(renamed)
+    records.remove(renamed)
+    assert ids(index.search("zorg")) == [added.id]
+    assert ids(index.search("")) == ids(records)
+
+
+def test_update_keeps_the_database_order():
+    records = make_records(20)
+    index = SearchIndex(records)
+    changed = Record(company_name="ACME", job_title="DevOps", id=records[5].id)
+    index.update(changed)
+    assert ids(index.search("")) == ids(records)
+    assert index.rank(changed) == 5
+
+
+def test_cache_size_is_bounded():
+    index = SearchIndex(make_records(10))
+    for i in range(CACHE_SIZE * 2):
+        index.search(f"requête {i}")
+    assert len(index._cache) == CACHE_SIZE
@@ -0,0 +1,123 @@
+""" Tests de la recherche différée : regroupement des frappes et abandon des résultats périmés. """
+import threading
+import time
+
+import pytest
+
+from search_pipeline import POLL_MS, SearchPipeline
+
+
+class FakeRoot:
+    """ Remplace la fenêtre Tk : les rappels `after` sont exécutés quand l'horloge simulée avance. """
+
+    def __init__(self):
+        self.now = 0
+        self._callbacks = {}
+        self._next_id = 0
+
+    def after(self, delay_ms, callback, *args):
+        self._next_id += 1
+        self._callbacks[self._next_id] = (self.now + delay_ms, callback, args)
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self._callbacks.pop(after_id, None)
+
+    def advance(self, delay_ms):
+        end = self.now + delay_ms
+        while True:
+            due = [(when, after_id) for after_id, (when, _, _) in self._callbacks.items() if when <= end]
+            if not due:
+                break
+            when, after_id = min(due)
+            self.now = when
+            _, callback, args = self._callbacks.pop(after_id)
+            callback(*args)
+        self.now = end
+
+
+@pytest.fixture
+def root():
+    return FakeRoot()
+
+
+def make_pipeline(root, compute):
+    published = []
+    pipeline = SearchPipeline(root, compute, published.append, delay_ms=100)
+    return pipeline, published
+
+
+def wait_idle(root, pipeline, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while pipeline.busy:
+        assert time.monotonic() < deadline, "recherche toujours en cours"
+        root.advance(POLL_MS)
+        time.sleep(0.001)
+
+
+def test_keystrokes_are_debounced(root):
+    computed = []
+    pipeline, published = make_pipeline(root, lambda text: computed.append(text) or text.upper())
+    for text in ("p", "py", "pyt"):
+        pipeline.submit(text)
+        root.advance(60)
+    # Moins de 100 ms depuis la dernière frappe : rien n'est encore calculé
+    assert computed == [] and published == []
+    root.advance(40)
+    wait_idle(root, pipeline)
+    assert computed == ["pyt"]
+    assert published == ["PYT"]
+
+
+def test_cancelled_request_is_never_published(root):
+    started, release = threading.Event(), threading.Event()
+
+    def compute(text):
+        started.set()
+        release.wait(5)
+        return text
+
+    pipeline, published = make_pipeline(root, compute)
+    pipeline.submit("avant")
+    root.advance(100)
+    assert started.wait(5)
+    # Une mise à jour immédiate de la liste annule la recherche déjà commencée
+    pipeline.cancel()
+    release.set()
+    wait_idle(root, pipeline)
+    assert published == []
+
+    pipeline.submit("en attente")
+    pipeline.cancel()
+    root.advance(1000)
+    assert published == [] and not pipeline.busy
+
+
+def test_outdated_results_are_dropped(root):
+    release_first = threading.Event()
+
+    def compute(text):
+        if text == "premier":
+            release_first.wait(5)
+        return text
+
+    pipeline, published = make_pipeline(root, compute)
+    pipeline.submit("premier")
+    root.advance(100)
+    # Nouvelle frappe pendant le calcul : le premier résultat arrive après, il est périmé
+    pipeline.submit("second")
+    release_first.set()
+    root.advance(100)
+    wait_idle(root, pipeline)
+    assert published == ["second"]
+
+
+def test_worker_errors_are_raised_in_the_interface_thread(root):
+    def compute(text):
+        raise KeyError(text)
+
+    pipeline, published = make_pipeline(root, compute)
+    pipeline.submit("erreur")
+    with pytest.raises(KeyError):
+        wait_idle(root, pipeline)
+    assert published == []
@@ -0,0 +1,256 @@
+""" Tests du partage de la base JSON entre instances : verrou, fusion des modifications et suivi du journal. """
+import multiprocessing
+
+import pytest
+
+from records import Applications, Record, merge_records
+from storage import JournaledStorage, merge_change
+
+
+def make_record(i, **fields):
+    values = dict(company_name=f"Entreprise {i}", job_title="Développeur", status="En attente", comment="")
+    values.update(fields)
+    return Record(**values)
+
+
+def edited(record, **fields):
+    return Record.from_dict(dict(record.to_dict(), **fields))
+
+
+def same_content(first, second):
+    return [record.to_dict() for record in first["applications"]] == [record.to_dict() for record in second["applications"]]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "applications.json")
+
+
+@pytest.fixture
+def instances(path):
+    """ Deux instances de l'application sur la même base, avec trois candidatures. """
+    first = JournaledStorage(path)
+    first_database = first.load()
+    for i in range(3):
+        first.apply({"op": "add", "record": make_record(i)}, first_database)
+    second = JournaledStorage(path)
+    second_database = second.load()
+    yield first, first_database, second, second_database
+    first.close()
+    second.close()
+
+
+def test_merge_records_keeps_both_sides():
+    base = make_record(1, status="En attente", comment="")
+    mine = edited(base, comment="entretien lundi", job_title="Lead dev")
+    theirs = edited(base, status="Refusé", job_title="Architecte", version=3, id=1)
+    merged = merge_records(base, mine, theirs)
+    assert (merged.status, merged.comment, merged.job_title) == ("Refusé", "entretien lundi", "Lead dev")
+    assert (merged.id, merged.version) == (1, 3)
+
+
+def test_merge_change(path):
+    storage = JournaledStorage(path)
+    database = storage.load()
+    current = storage.apply({"op": "add", "record": make_record(1)}, database)
+    base = current
+
+    # Base à jour : la modification est appliquée telle quelle, avec une nouvelle version
+    change = merge_change({"op": "update", "id": current.id, "record": edited(base, status="Refusé"), "base": base}, database["applications"])
+    assert "base" not in change and change["record"].status == "Refusé" and change["record"].version == 1
+
+    # Base périmée : fusion champ par champ avec la version actuelle
+    storage.apply({"op": "update", "id": current.id, "record": edited(base, comment="modifié ailleurs")}, database)
+    change = merge_change({"op": "update", "id": current.id, "record": edited(base, status="Accepté"), "base": base}, database["applications"])
+    assert (change["record"].status, change["record"].comment, change["record"].version) == ("Accepté", "modifié ailleurs", 2)
+
+    # Candidature supprimée entre-temps : mise à jour recréée, suppression sans objet
+    storage.apply({"op": "delete", "id": current.id}, database)
+    change = merge_change({"op": "update", "id": current.id, "record": edited(base, status="Accepté"), "base": base}, database["applications"])
+    assert change["op"] == "add" and change["record"].id is None and change["record"].version == 0
+    assert merge_change({"op": "delete", "id": current.id}, database["applications"]) is None
+
+
+def test_sync_applies_other_instance_changes(instances):
+    first, first_database, second, second_database = instances
+    received = []
+    second.listeners.append(received.extend)
+
+    first.apply({"op": "add", "record": make_record(3)}, first_database)
+    first.apply({"op": "update", "id": 1, "record": edited(first_database["applications"].get(1), status="Refusé")}, first_database)
+    first.apply({"op": "delete", "id": 2}, first_database)
+
+    assert second.sync(second_database)
+    assert [(op, record.id) for op, record in received] == [("add", 4), ("update", 1), ("delete", 2)]
+    assert same_content(first_database, second_database)
+    assert second_database["statistics"].to_dict() == first_database["statistics"].to_dict()
+    assert not second.sync(second_database)
+
+
+def test_concurrent_edits_are_merged(instances):
+    first, first_database, second, second_database = instances
+    base = second_database["applications"].get(1)
+    first.apply({"op": "update", "id": 1, "record": edited(base, status="Refusé"), "base": base}, first_database)
+    saved = second.apply({"op": "update", "id": 1, "record": edited(base, comment="relancé"), "base": base}, second_database)
+    assert (saved.status, saved.comment, saved.version) == ("Refusé", "relancé", 2)
+    first.sync(first_database)
+    assert same_content(first_database, second_database)
+
+
+def test_other_instance_compaction_is_followed(instances, monkeypatch):
+    first, first_database, second, second_database = instances
+    first.apply({"op": "add", "record": make_record(3)}, first_database)
+    first.compact(first_database)
+    first.apply({"op": "delete", "id": 1}, first_database)
+
+    # Une seule génération d'écart : le nouveau journal est suivi, sans relire l'instantané
+    monkeypatch.setattr(second, "_reload", lambda database: pytest.fail("relecture inutile"))
+    assert second.sync(second_database)
+    assert second.generation == first.generation == 1
+    assert same_content(first_database, second_database)
+
+
+def test_several_compactions_reload(instances):
+    first, first_database, second, second_database = instances
+    for i in range(2):
+        first.apply({"op": "add", "record": make_record(10 + i)}, first_database)
+        first.compact(first_database)
+    first.apply({"op": "delete", "id": 2}, first_database)
+
+    assert second.sync(second_database)
+    assert second.generation == 2
+    assert same_content(first_database, second_database)
+    assert second_database["applications"].next_id == first_database["applications"].next_id
+    assert second_database["statistics"].to_dict() == first_database["statistics"].to_dict()
+
+
+def test_import_by_other_instance_is_not_lost(instances, path):
+    first, first_database, _, _ = instances
+    JournaledStorage(path).import_applications(make_record(100 + i) for i in range(5))
+
+    assert first.sync(first_database)
+    assert len(first_database["applications"]) == 8
+    first.apply({"op": "add", "record": make_record(200)}, first_database)
+    first.compact(first_database)
+    assert len(JournaledStorage(path).load()["applications"]) == 9
+
+
+def test_torn_line_from_other_instance(instances):
+    first, first_database, second, second_database = instances
+    with open(first.journal_path, "a") as file:
+        file.write('{"op": "add", "rec')
+    assert not second.sync(second_database)
+    second.apply({"op": "add", "record": make_record(3)}, second_database)
+    assert first.sync(first_database)
+    assert same_content(first_database, JournaledStorage(first.json_path).load())
+
+
+def test_sync_without_blocking(instances):
+    first, first_database, second, second_database = instances
+    first.apply({"op": "add", "record": make_record(3)}, first_database)
+    # Verrou pris par une autre instance (même processus, autre descripteur : flock les distingue)
+    holder = JournaledStorage(first.json_path)
+    assert holder.lock.acquire()
+    try:
+        assert not second.sync(second_database, blocking=False)
+    finally:
+        holder.lock.release()
+    assert second.sync(second_database, blocking=False)
+    assert len(second_database["applications"]) == 4
+
+
+def test_snapshot_replaced_during_load(instances, path):
+    first, first_database, _, _ = instances
+    first.import_applications(make_record(100 + i) for i in range(50))
+    first_database = first.load()
+    reader = JournaledStorage(path)
+    loading = {"applications": Applications()}
+    batches = reader.load_incrementally(loading, batch_size=10, first_batch_size=5)
+    next(batches)
+    # Le chargement ne garde pas le verrou entre deux lots : une autre instance peut écrire et compacter
+    first.apply({"op": "delete", "id": 1}, first_database)
+    first.compact(first_database)
+    for _ in batches:
+        pass
+    assert same_content(first_database, loading)
+    assert loading["statistics"].to_dict() == first_database["statistics"].to_dict()
+    reader.close()
+
+
+def add_records(path, tag, count):
+    storage = JournaledStorage(path, compact_threshold=7)
+    database = storage.load()
+    for i in range(count):
+        storage.apply({"op": "add", "record": make_record(i, company_name=f"{tag} {i}")}, database)
+    storage.close()
+
+
+def test_concurrent_processes(path):
+    storage = JournaledStorage(path, compact_threshold=7)
+    database = storage.load()
+    processes = [multiprocessing.Process(target=add_records, args=(path, tag, 25)) for tag in "ABC"]
+    for process in processes:
+        process.start()
+    while any(process.is_alive() for process in processes):
+        storage.sync(database)
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    storage.sync(database)
+
+    loaded = JournaledStorage(path).load()
+    assert len(loaded["applications"]) == 75
+    assert same_content(database, loaded)
+    assert sorted({record.id for record in loaded["applications"]}) == list(range(1, 76))
+
+
+def test_sqlite_never_reuses_deleted_ids(tmp_path):
+    from sqlite_storage import SqliteStorage
+    path = str(tmp_path / "applications.db")
+    first, other = SqliteStorage(path), SqliteStorage(path)
+    first_database = first.load()
+    old = first.apply({"op": "add", "record": make_record(1, company_name="Old")}, first_database)
+    other_database = other.load()
+    base = other_database["applications"].get(old.id)
+
+    first.apply({"op": "delete", "id": old.id}, first_database)
+    new = first.apply({"op": "add", "record": make_record(2, company_name="New", job_title="other")}, first_database)
+    assert new.id != old.id
+
+    # Modification préparée avant la suppression : la candidature est recréée, la nouvelle n'est pas touchée
+    saved = other.apply({"op": "update", "id": old.id, "record": edited(base, comment="edit of Old"), "base": base}, other_database)
+    assert saved.id not in (old.id, new.id)
+    assert (saved.company_name, saved.comment) == ("Old", "edit of Old")
+    unchanged = first.load()["applications"].get(new.id)
+    assert (unchanged.company_name, unchanged.comment) == ("New", "")
+    first.close()
+    other.close()
+
+
+def test_sqlite_schema_upgrade_keeps_ids(tmp_path):
+    import sqlite3
+    from sqlite_storage import SqliteStorage
+    path = str(tmp_path / "applications.db")
+    # Base de la version 1 du schéma : identifiants sans AUTOINCREMENT
+    storage = SqliteStorage(path)
+    storage.import_applications([make_record(i) for i in range(3)])
+    storage.close()
+    connection = sqlite3.connect(path)
+    table_sql = connection.execute("SELECT sql FROM sqlite_master WHERE name = 'applications'").fetchone()[0]
+    with connection:
+        connection.execute("ALTER TABLE applications RENAME TO applications_v2")
+        connection.execute(table_sql.replace("AUTOINCREMENT", ""))
+        connection.execute("INSERT INTO applications SELECT * FROM applications_v2")
+        connection.execute("DROP TABLE applications_v2")
+        connection.execute("DELETE FROM applications WHERE id = 3")
+        connection.execute("PRAGMA user_version = 1")
+    connection.close()
+
+    storage = SqliteStorage(path)
+    database = storage.load()
+    assert [record.id for record in database["applications"]] == [1, 2]
+    assert storage.query("entreprise 1", None, True, 0, 10)[0] == 1
+    assert storage.apply({"op": "add", "record": make_record(9)}, database).id == 3
+    storage.apply({"op": "delete", "id": 3}, database)
+    assert storage.apply({"op": "add", "record": make_record(10)}, database).id == 4
+    storage.close()
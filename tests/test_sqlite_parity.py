@@ -0,0 +1,104 @@
+""" La recherche, le tri et la pagination SQLite donnent les mêmes pages que la vue en mémoire. """
+import random
+
+import pytest
+
+from records import Applications, Record
+import sqlite_storage
+from sqlite_storage import SqliteStorage
+from stats import ApplicationStats
+from storage import STATISTICS_KEY, apply_change
+from view_model import ApplicationView
+
+COMPANIES = ["Airbus", "Société Générale", "Ubisoft Montréal", "Back Market", "Éditions Gallimard", "OVHcloud"]
+TITLES = ["Développeur Python", "Ingénieur logiciel", "Data scientist", "Chef de projet"]
+DATES = ["01-02-2024", "2024-02-01", "15-03-2023", "", "bientôt", "31-12-2022"]
+STATUSES = ["En attente", "Refusé", "Accepté", ""]
+SEARCHES = ["", "a", "ub", "é", "SOCIÉTÉ", "python", "ingénieur log", "montréal", "zzz", "er"]
+SORTS = [(None, True), ("application_date", True), ("application_date", False), ("status", True), ("status", False)]
+
+
+def random_record(rng):
+    return Record(company_name=f"{rng.choice(COMPANIES)} {rng.randrange(20)}", job_title=rng.choice(TITLES),
+                  application_date=rng.choice(DATES), status=rng.choice(STATUSES))
+
+
+def ids(records):
+    return [record.id for record in records]
+
+
+@pytest.fixture
+def storages(tmp_path):
+    rng = random.Random(7)
+    records = [random_record(rng) for _ in range(300)]
+    sqlite = SqliteStorage(str(tmp_path / "applications.db"))
+    sqlite.import_applications(records)
+    applications = Applications(Record.from_dict(record.to_dict()) for record in records)
+    database = {"applications": applications, STATISTICS_KEY: ApplicationStats.from_applications(applications)}
+    yield sqlite, ApplicationView(database["applications"]), database, rng
+    sqlite.close()
+
+
+def assert_same_pages(sqlite, view):
+    for text in SEARCHES:
+        for sort_by, ascending in SORTS:
+            total, _ = view.page(text, sort_by, ascending, 0, 0)
+            for start in (0, 10, max(total - 7, 0), total + 5):
+                expected = view.page(text, sort_by, ascending, start, 10)
+                actual = sqlite.query(text, sort_by, ascending, start, 10)
+                assert actual[0] == expected[0], (text, sort_by, ascending, start)
+                assert ids(actual[1]) == ids(expected[1]), (text, sort_by, ascending, start)
+
+
+def test_pages_match(storages):
+    sqlite, view, _, _ = storages
+    sqlite.load()
+    assert_same_pages(sqlite, view)
+
+
+def apply_random_changes(sqlite, sqlite_database, view, database, rng, count=100):
+    # Mêmes modifications aléatoires dans SQLite et dans la vue en mémoire
+    for _ in range(count):
+        existing = ids(database["applications"])
+        op = rng.choice(["add", "update", "delete"])
+        if op == "add":
+            record = sqlite.apply({"op": "add", "record": random_record(rng)}, sqlite_database)
+            view.add(apply_change(database, {"op": "add", "record": Record.from_dict(record.to_dict())}))
+        else:
+            record_id = rng.choice(existing)
+            if op == "update":
+                record = random_record(rng)
+                record.id = record_id
+                sqlite.apply({"op": "update", "id": record_id, "record": record}, sqlite_database)
+                view.update(apply_change(database, {"op": "update", "id": record_id, "record": Record.from_dict(record.to_dict())}))
+            else:
+                sqlite.apply({"op": "delete", "id": record_id}, sqlite_database)
+                view.remove(apply_change(database, {"op": "delete", "id": record_id}))
+
+
+def test_pages_match_after_changes(storages):
+    sqlite, view, database, rng = storages
+    sqlite_database = sqlite.load()
+    apply_random_changes(sqlite, sqlite_database, view, database, rng)
+    assert_same_pages(sqlite, view)
+    assert sqlite_database[STATISTICS_KEY].to_dict() == database[STATISTICS_KEY].to_dict()
+
+
+def test_search_without_trigram_tokenizer(storages, monkeypatch, capsys):
+    sqlite, view, database, rng = storages
+    sqlite.close()
+    # SQLite antérieur à 3.34 : le tokenizer trigram est inconnu
+    monkeypatch.setattr(sqlite_storage, "TRIGRAM_PROBE", sqlite_storage.TRIGRAM_PROBE.replace("'trigram'", "'trigram_absent'"))
+    sqlite_database = sqlite.load()
+    assert not sqlite.full_text_search
+    assert "nécessitent SQLite 3.34" in capsys.readouterr().err
+    # Les écritures ne passent plus par l'index plein texte, la recherche parcourt la table
+    apply_random_changes(sqlite, sqlite_database, view, database, rng, 50)
+    assert_same_pages(sqlite, view)
+
+    # De retour sur une version récente, l'index est reconstruit avec les modifications faites entre-temps
+    monkeypatch.undo()
+    sqlite.close()
+    sqlite.load()
+    assert sqlite.full_text_search
+    assert_same_pages(sqlite, view)
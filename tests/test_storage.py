@@ -0,0 +1,199 @@
+""" Tests du stockage JSON : journal, compactage et lecture incrémentale de l'instantané. """
+import io
+import json
+
+import pytest
+
+from records import Applications, Record
+from storage import JournaledStorage, JsonStreamReader
+
+
+def make_record(i, **fields):
+    values = dict(company_name=f"Entreprise {i}", job_title="Développeur", application_date=f"{i % 28 + 1:02d}-03-2024",
+                  status=["En attente", "Refusé", "Accepté"][i % 3], comment=f"commentaire {i}")
+    values.update(fields)
+    return Record(**values)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return JournaledStorage(str(tmp_path / "applications.json"))
+
+
+def fresh(storage):
+    return JournaledStorage(storage.json_path).load()
+
+
+def assert_same(database, other):
+    assert [record.to_dict() for record in database["applications"]] == [record.to_dict() for record in other["applications"]]
+    assert database["statistics"].to_dict() == other["statistics"].to_dict()
+
+
+def test_journal_is_replayed(storage):
+    database = storage.load()
+    for i in range(5):
+        storage.apply({"op": "add", "record": make_record(i)}, database)
+    storage.apply({"op": "update", "id": 2, "record": make_record(2, status="Refusé", comment="relancé")}, database)
+    storage.apply({"op": "delete", "id": 4}, database)
+
+    assert storage.generation == 0
+    loaded = fresh(storage)
+    assert_same(database, loaded)
+    assert loaded["applications"].get(2).comment == "relancé"
+    assert 4 not in loaded["applications"]
+    assert loaded["applications"].next_id == 6
+
+
+def test_truncated_last_line_is_dropped(storage):
+    database = storage.load()
+    for i in range(3):
+        storage.apply({"op": "add", "record": make_record(i)}, database)
+    with open(storage.journal_path, "a") as file:
+        file.write('{"op": "add", "record": {"company_name": "coup')
+    size = len(open(storage.journal_path).read())
+
+    loaded = fresh(storage)
+    assert_same(database, loaded)
+    # La ligne incomplète est supprimée du journal
+    with open(storage.journal_path) as file:
+        content = file.read()
+    assert len(content) < size and content.endswith("\n")
+
+
+def test_stale_journal_is_ignored(storage):
+    database = storage.load()
+    storage.apply({"op": "add", "record": make_record(0)}, database)
+    storage.compact(database)
+    # Journal d'une génération antérieure (arrêt pendant un compactage)
+    with open(storage.journal_path, "w") as file:
+        file.write(json.dumps({"generation": 0}) + "\n")
+        file.write(json.dumps({"op": "delete", "id": 1}) + "\n")
+
+    loaded = fresh(storage)
+    assert len(loaded["applications"]) == 1
+    with open(storage.journal_path) as file:
+        assert json.loads(file.readline()) == {"generation": 1}
+
+
+def test_journal_addressed_by_position(storage):
+    # Journaux antérieurs aux identifiants : les modifications désignent une position
+    with open(storage.json_path, "w") as file:
+        json.dump({"applications": [make_record(i).to_dict() for i in range(3)]}, file)
+    with open(storage.journal_path, "w") as file:
+        file.write(json.dumps({"generation": 0}) + "\n")
+        file.write(json.dumps({"op": "delete", "index": 0}) + "\n")
+        file.write(json.dumps({"op": "update", "index": 0, "record": make_record(9).to_dict()}) + "\n")
+
+    loaded = storage.load()
+    assert [(record.id, record.company_name) for record in loaded["applications"]] == [(2, "Entreprise 9"), (3, "Entreprise 2")]
+
+
+def test_compaction_resets_journal(tmp_path):
+    storage = JournaledStorage(str(tmp_path / "applications.json"), compact_threshold=3)
+    database = storage.load()
+    for i in range(3):
+        storage.apply({"op": "add", "record": make_record(i, comment='guillemets " et \\ et }, {\n é 😀')}, database)
+
+    assert storage.generation == 1
+    assert storage.pending_changes == 0
+    with open(storage.journal_path) as file:
+        assert file.read() == json.dumps({"generation": 1}) + "\n"
+    with open(storage.json_path) as file:
+        snapshot = json.load(file)
+    assert list(snapshot)[:3] == ["journal_generation", "next_id", "statistics"]
+    assert_same(database, fresh(storage))
+
+
+def test_compaction_threshold_grows_with_database(tmp_path):
+    storage = JournaledStorage(str(tmp_path / "applications.json"), compact_threshold=2)
+    database = storage.load()
+    storage.import_applications(make_record(i) for i in range(40))
+    database = storage.load()
+    # 25 % de 40 candidatures : 10 modifications avant le compactage
+    for i in range(9):
+        storage.apply({"op": "update", "id": i + 1, "record": make_record(i, status="Refusé")}, database)
+    assert storage.generation == 1
+    storage.apply({"op": "delete", "id": 40}, database)
+    assert storage.generation == 2
+
+
+def test_background_compaction(tmp_path):
+    storage = JournaledStorage(str(tmp_path / "applications.json"), compact_threshold=3, compact_in_background=True)
+    database = storage.load()
+    for i in range(3):
+        storage.apply({"op": "add", "record": make_record(i)}, database)
+    storage.wait_for_compaction()
+    assert storage.generation == 1 and storage.pending_changes == 0
+    storage.apply({"op": "update", "id": 2, "record": make_record(2, comment="après")}, database)
+
+    loaded = fresh(storage)
+    assert_same(database, loaded)
+    assert loaded["applications"].get(2).comment == "après"
+
+
+def test_background_compaction_of_a_stale_copy_is_abandoned(tmp_path):
+    storage = JournaledStorage(str(tmp_path / "applications.json"), compact_threshold=3, compact_in_background=True)
+    database = storage.load()
+    with storage.lock:
+        # Le thread de compactage attend le verrou pendant qu'une autre modification est journalisée
+        for i in range(4):
+            storage.apply({"op": "add", "record": make_record(i)}, database)
+    storage.wait_for_compaction()
+    assert storage.generation == 0 and storage.pending_changes == 4
+    assert_same(database, fresh(storage))
+
+    # Le compactage est relancé par la modification suivante
+    storage.apply({"op": "delete", "id": 1}, database)
+    storage.wait_for_compaction()
+    assert storage.generation == 1
+    assert_same(database, fresh(storage))
+
+
+def test_missing_snapshot_gives_empty_database(storage):
+    database = storage.load()
+    assert len(database["applications"]) == 0
+    assert database["statistics"].total == 0
+
+
+SAMPLE = {
+    "journal_generation": 3,
+    "applications": [
+        {"company_name": 'Guillemets "doubles" et \\ barre', "job_title": "Poste\nsur deux lignes", "n": 1234567890},
+        {"company_name": "Accents éèà et emoji 😀", "job_title": "é😀", "ok": True, "none": None},
+        {"nested": {"list": [1, 2.5, -3e10, [], {}], "empty": ""}, "false": False},
+        {},
+    ],
+    "next_id": 98765,
+    "after": [1, 2, 3],
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 16, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_stream_reader_matches_json(chunk_size, indent):
+    text = json.dumps(SAMPLE, indent=indent, ensure_ascii=indent is None)
+    metadata = {}
+    items = list(JsonStreamReader(io.StringIO(text), chunk_size=chunk_size).iter_object("applications", metadata))
+    assert items == SAMPLE["applications"]
+    assert metadata == {key: value for key, value in SAMPLE.items() if key != "applications"}
+
+
+@pytest.mark.parametrize("text", ['{}', '{"applications": []}', '{ "applications" : [ ] , "next_id" : 7 }'])
+def test_stream_reader_empty(text):
+    metadata = {}
+    assert list(JsonStreamReader(io.StringIO(text), chunk_size=2).iter_object("applications", metadata)) == []
+
+
+@pytest.mark.parametrize("text", ['{"applications": [{"a": 1}', '{"applications": [1 2]}', '[1]'])
+def test_stream_reader_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        list(JsonStreamReader(io.StringIO(text), chunk_size=3).iter_object("applications", {}))
+
+
+def test_load_incrementally_yields_batches(storage):
+    storage.import_applications(make_record(i) for i in range(25))
+    database = {"applications": Applications()}
+    batches = list(storage.load_incrementally(database, batch_size=10, first_batch_size=4))
+    assert [len(batch) for batch in batches] == [4, 10, 10, 1]
+    assert all(op == "add" for batch in batches for op, _ in batch)
+    assert database["statistics"].total == 25
@@ -0,0 +1,32 @@
+""" Tests du cache disque des icônes redimensionnées. """
+import os
+import shutil
+
+from thumbnails import icon_cache_path, remove_stale_icons
+
+
+def test_icon_cache_path_ignores_location(tmp_path):
+    # Un exécutable "onefile" extrait ses ressources dans un nouveau répertoire à chaque lancement
+    first, second = tmp_path / "_MEI1", tmp_path / "_MEI2"
+    first.mkdir()
+    second.mkdir()
+    (first / "app_logo.png").write_bytes(b"logo")
+    shutil.copy(first / "app_logo.png", second / "app_logo.png")
+    os.utime(second / "app_logo.png", (0, 0))
+    cache_dir = str(tmp_path / "icons")
+    path = icon_cache_path(str(first / "app_logo.png"), (100, 100), cache_dir)
+    assert path == icon_cache_path(str(second / "app_logo.png"), (100, 100), cache_dir)
+    assert os.path.basename(path).startswith("app_logo-100x100-")
+    assert path != icon_cache_path(str(first / "app_logo.png"), (10, 10), cache_dir)
+
+    (second / "app_logo.png").write_bytes(b"nouveau logo")
+    assert path != icon_cache_path(str(second / "app_logo.png"), (100, 100), cache_dir)
+
+
+def test_remove_stale_icons(tmp_path):
+    names = ["app_logo-100x100-aaaa.png", "app_logo-100x100-bbbb.png", "app_logo-50x50-cccc.png",
+             "arrows-10x10-dddd.png", "0123456789abcdef0123456789abcdef01234567.png"]
+    for name in names:
+        (tmp_path / name).write_bytes(b"")
+    remove_stale_icons(str(tmp_path / "app_logo-100x100-bbbb.png"))
+    assert sorted(os.listdir(tmp_path)) == ["app_logo-100x100-bbbb.png", "app_logo-50x50-cccc.png", "arrows-10x10-dddd.png"]
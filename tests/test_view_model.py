@@ -0,0 +1,77 @@
+""" Tests des permutations triées et de la vue paginée, comparées à un tri naïf. """
+import random
+
+import pytest
+
+from records import SORT_KEYS, Record
+from view_model import ApplicationView, SortedPermutation
+
+STATUSES = ["En attente", "Refusé", "Accepté", "Statut inconnu"]
+
+
+def make_record(rng, record_id):
+    return Record(company_name=f"Entreprise {rng.randrange(50)}", job_title=rng.choice(["Développeur", "Testeur", "DevOps"]),
+                  application_date=f"{rng.randrange(1, 29):02d}-{rng.randrange(1, 4):02d}-2024", status=rng.choice(STATUSES),
+                  id=record_id)
+
+
+def naive_sort(records, sort_by, ranks):
+    # Tri stable : à clé égale, l'ordre de la base
+    return sorted(records, key=lambda record: (SORT_KEYS[sort_by](record), ranks[record.id]))
+
+
+@pytest.mark.parametrize("sort_by", sorted(SORT_KEYS))
+def test_permutation_matches_a_naive_sort(sort_by):
+    rng = random.Random(sort_by)
+    records = [make_record(rng, i) for i in range(1, 201)]
+    # Rang de chaque candidature dans l'ordre de la base, comme celui de SearchIndex
+    ranks = {record.id: rank for rank, record in enumerate(records)}
+    permutation = SortedPermutation(records, SORT_KEYS[sort_by], lambda record: ranks[record.id])
+    next_id = len(records) + 1
+    for step in range(600):
+        action = rng.random()
+        if action < 0.35 or not records:
+            record = make_record(rng, next_id)
+            ranks[record.id] = next_id
+            next_id += 1
+            records.append(record)
+            permutation.insert(record)
+        elif action < 0.6:
+            record = records.pop(rng.randrange(len(records)))
+            permutation.remove(record)
+        else:
+            # Mise à jour par un nouvel objet, comme après un enregistrement
+            position = rng.randrange(len(records))
+            record = make_record(rng, records[position].id)
+            if rng.random() < 0.5:
+                record.status = records[position].status
+                record.application_date = records[position].application_date
+            records[position] = record
+            permutation.update(record)
+        expected = naive_sort(records, sort_by, ranks)
+        assert [record.id for record in permutation.applications] == [record.id for record in expected], step
+        assert all(a is b for a, b in zip(permutation.applications, expected))
+        assert permutation.keys == sorted(permutation.keys)
+
+
+def test_view_pages_match_a_naive_sort():
+    rng = random.Random(1)
+    records = [make_record(rng, i) for i in range(1, 301)]
+    view = ApplicationView(records)
+    ranks = {record.id: rank for rank, record in enumerate(records)}
+    added = make_record(rng, 301)
+    view.add(added)
+    records.append(added)
+    ranks[added.id] = len(ranks)
+    view.remove(records.pop(10))
+    for search_text in ("", "entreprise 1", "DEV", "zzz"):
+        matching = [record for record in records
+                    if search_text.lower() in record.company_name.lower() or search_text.lower() in record.job_title.lower()]
+        for sort_by in (None, "application_date", "status"):
+            expected = matching if sort_by is None else naive_sort(matching, sort_by, ranks)
+            for ascending in (True, False):
+                ordered = expected if ascending or sort_by is None else expected[::-1]
+                for start in (0, 10, 290):
+                    total, page = view.page(search_text, sort_by, ascending, start, 10)
+                    assert total == len(matching)
+                    assert [record.id for record in page] == [record.id for record in ordered[start:start + 10]]
@@ -0,0 +1,225 @@
+""" Miniatures des screenshots (décodage en arrière-plan, cache disque et cache mémoire LRU) et icônes redimensionnées en cache. """
+import os
+import queue
+import hashlib
+import tempfile
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageTk
+import instrumentation
+
+# Taille maximale des miniatures affichées dans l'aperçu
+THUMBNAIL_SIZE = (300, 300)
+
+# Nombre de miniatures (PhotoImage) conservées en mémoire
+MEMORY_CACHE_SIZE = 32
+
+# Intervalle de vérification des miniatures décodées, en millisecondes
+POLL_MS = 20
+
+
+def default_cache_dir():
+    """ Répertoire du cache disque des miniatures, dans le répertoire de l'utilisateur. """
+    return os.path.join(os.path.expanduser("~"), ".jobgestion", "thumbnails")
+
+
+def default_icon_dir():
+    """ Répertoire du cache disque des icônes redimensionnées. """
+    return os.path.join(os.path.expanduser("~"), ".jobgestion", "icons")
+
+
+def cache_key(path, size=THUMBNAIL_SIZE):
+    """ Clé d'une miniature : chemin, date de modification et taille du fichier. Lève OSError si le fichier est absent. """
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, size)
+
+
+def cached_path(key, cache_dir):
+    """ Chemin du fichier PNG mis en cache pour une clé. """
+    return os.path.join(cache_dir, hashlib.sha1(repr(key).encode("utf-8")).hexdigest() + ".png")
+
+
+def save_cached(image, path):
+    # Enregistrer l'image (fichier temporaire puis renommage, pour ne jamais laisser un fichier incomplet)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".png", dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as file:
+            image.save(file, "PNG")
+        os.replace(temp_path, path)
+    except OSError:
+        # Le cache disque est facultatif
+        pass
+
+
+def load_cached_photo(key, cache_dir, render):
+    """ PhotoImage lue directement par Tk depuis le cache disque, ou produite par `render()` (image PIL) puis mise en cache. """
+    path = cached_path(key, cache_dir)
+    if os.path.exists(path):
+        try:
+            return tk.PhotoImage(file=path)
+        except tk.TclError:
+            # Fichier de cache illisible : le recréer
+            pass
+    image = render()
+    save_cached(image, path)
+    return ImageTk.PhotoImage(image)
+
+
+def icon_cache_path(path, size, cache_dir):
+    """ Fichier de cache d'une icône : nom de la ressource, taille demandée et empreinte du contenu.
+
+    Le chemin absolu et la date de modification ne servent pas de clé : un exécutable PyInstaller "onefile" extrait ses
+    ressources dans un nouveau répertoire temporaire à chaque lancement. Lève OSError si le fichier est introuvable.
+    """
+    with open(path, "rb") as file:
+        digest = hashlib.sha1(file.read()).hexdigest()
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}-{size[0]}x{size[1]}-{digest}.png")
+
+
+def remove_stale_icons(current_path):
+    """ Supprimer les versions précédentes d'une icône (même nom, même taille, autre contenu) et les fichiers de
+    l'ancien format de cache (nommés par une seule empreinte). """
+    cache_dir, current = os.path.split(current_path)
+    prefix = current.rsplit("-", 1)[0] + "-"
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for name in names:
+        stem, extension = os.path.splitext(name)
+        old_format = len(stem) == 40 and all(c in "0123456789abcdef" for c in stem)
+        if extension == ".png" and name != current and (name.startswith(prefix) or old_format):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+def load_icon(path, size, cache_dir=None):
+    """ PhotoImage de l'image redimensionnée à `size` (LANCZOS).
+
+    La copie redimensionnée est mise en cache sur disque : aux lancements suivants, Tk la lit directement, sans PIL.
+    Lève OSError si le fichier est introuvable.
+    """
+    icon_path = icon_cache_path(path, size, cache_dir or default_icon_dir())
+    if os.path.exists(icon_path):
+        try:
+            return tk.PhotoImage(file=icon_path)
+        except tk.TclError:
+            # Fichier de cache illisible : le recréer
+            pass
+    with Image.open(path) as image:
+        image = image.resize(size, Image.LANCZOS)
+    save_cached(image, icon_path)
+    remove_stale_icons(icon_path)
+    return ImageTk.PhotoImage(image)
+
+
+def decode_thumbnail(path, key, cache_dir):
+    """ Retourner la miniature (image PIL) depuis le cache disque, ou la décoder et l'y enregistrer. """
+    thumbnail_path = cached_path(key, cache_dir)
+    if os.path.exists(thumbnail_path):
+        with Image.open(thumbnail_path) as image:
+            image.load()
+            return image
+
+    with Image.open(path) as image:
+        # Pour les JPEG, draft() décode directement à une résolution réduite
+        image.draft("RGB", key[3])
+        image.thumbnail(key[3])
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        image.load()
+
+    save_cached(image, thumbnail_path)
+    return image
+
+
+class ThumbnailCache:
+    """ Fournit des PhotoImage de miniatures sans bloquer l'interface.
+
+    Le décodage se fait dans des threads de travail ; les PhotoImage sont créées dans le thread de l'interface.
+    """
+
+    def __init__(self, root, cache_dir=None, memory_size=MEMORY_CACHE_SIZE, workers=2):
+        self.root = root
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.memory_size = memory_size
+        self._photos = OrderedDict()  # clé -> PhotoImage, du moins au plus récemment utilisé
+        self._pending = {}  # clé -> rappels (on_ready, on_error) en attente du décodage
+        self._results = queue.Queue()
+        self._poll_id = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="miniatures")
+
+    def request(self, path, on_ready, on_error=None):
+        """ Appeler `on_ready(photo)` dès que la miniature est disponible (immédiatement si elle est en mémoire). """
+        try:
+            key = cache_key(path)
+        except OSError as e:
+            if on_error:
+                on_error(e)
+            return
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            on_ready(photo)
+            return
+        self._decode(path, key, (on_ready, on_error))
+
+    def prefetch(self, paths):
+        """ Décoder à l'avance les miniatures des fichiers donnés (les fichiers absents sont ignorés). """
+        for path in paths:
+            try:
+                key = cache_key(path)
+            except OSError:
+                continue
+            if key not in self._photos:
+                self._decode(path, key, None)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def _decode(self, path, key, callbacks):
+        if key in self._pending:
+            if callbacks:
+                self._pending[key].append(callbacks)
+            return
+        self._pending[key] = [callbacks] if callbacks else []
+        self._executor.submit(self._run, path, key)
+        if self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+
+    def _run(self, path, key):
+        # Exécuté dans un thread de travail : aucun appel à Tk ici
+        try:
+            with instrumentation.timer("preview_screenshot.decode"):
+                image = decode_thumbnail(path, key, self.cache_dir)
+            self._results.put((key, image, None))
+        except Exception as e:
+            self._results.put((key, None, e))
+
+    def _poll(self):
+        # Exécuté dans le thread de l'interface : créer les PhotoImage et prévenir les demandeurs
+        self._poll_id = None
+        while True:
+            try:
+                key, image, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            callbacks = self._pending.pop(key, [])
+            if error is not None:
+                for _, on_error in callbacks:
+                    if on_error:
+                        on_error(error)
+                continue
+            photo = ImageTk.PhotoImage(image)
+            self._photos[key] = photo
+            if len(self._photos) > self.memory_size:
+                self._photos.popitem(last=False)
+            for on_ready, _ in callbacks:
+                on_ready(photo)
+        if self._pending:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
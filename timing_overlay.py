@@ -0,0 +1,35 @@
+""" Panneau superposé à la fenêtre affichant les latences mesurées (p50, p99) quand l'instrumentation est active. """
+import tkinter as tk
+import instrumentation
+
+# Intervalle de rafraîchissement du panneau, en millisecondes
+REFRESH_MS = 500
+
+
+class TimingOverlay(tk.Label):
+    """ Tableau des mesures en haut à droite de la fenêtre ; la touche F12 l'affiche ou le masque. """
+
+    def __init__(self, root):
+        super().__init__(root, justify="left", anchor="nw", font=("Courier", 11), bg='#000000', fg='#00ff00', padx=6, pady=4)
+        self.visible = True
+        root.bind_all("<F12>", self.toggle)
+        self.place(relx=1.0, rely=0.0, anchor="ne")
+        self.refresh()
+
+    def toggle(self, event=None):
+        self.visible = not self.visible
+        if self.visible:
+            self.place(relx=1.0, rely=0.0, anchor="ne")
+            self.refresh_now()
+        else:
+            self.place_forget()
+
+    def refresh_now(self):
+        self.config(text=instrumentation.format_summary())
+        # Rester au-dessus des pages, qui sont affichées et masquées au fil de la navigation
+        self.lift()
+
+    def refresh(self):
+        if self.visible:
+            self.refresh_now()
+        self.after(REFRESH_MS, self.refresh)
@@ -0,0 +1,142 @@
+""" Vue filtrée et triée des candidatures, avec permutations triées maintenues de façon incrémentale. """
+import threading
+from bisect import bisect_left
+from math import log2
+import instrumentation
+from records import SORT_KEYS
+from search_index import SearchIndex
+
+# Nombre de vues (recherche, tri) conservées en cache
+VIEW_CACHE_SIZE = 16
+
+
+class SortedPermutation:
+    """ Candidatures triées selon une clé, départagées par l'ordre de la base (comme un tri stable). """
+
+    def __init__(self, applications, sort_key, rank):
+        self._sort_key = sort_key
+        self._rank = rank
+        entries = sorted(((sort_key(application), rank(application), application) for application in applications), key=lambda entry: entry[:2])
+        # Clés et candidatures dans deux listes parallèles pour la recherche dichotomique
+        self.keys = [entry[:2] for entry in entries]
+        self.applications = [entry[2] for entry in entries]
+        # Clé utilisée lors de l'insertion, pour retrouver la candidature après une modification
+        self._inserted_keys = {entry[2].id: entry[:2] for entry in entries}
+
+    def insert(self, application):
+        key = (self._sort_key(application), self._rank(application))
+        position = bisect_left(self.keys, key)
+        self.keys.insert(position, key)
+        self.applications.insert(position, application)
+        self._inserted_keys[application.id] = key
+
+    def remove(self, application):
+        key = self._inserted_keys.pop(application.id)
+        position = bisect_left(self.keys, key)
+        del self.keys[position]
+        del self.applications[position]
+
+    def update(self, application):
+        # Ne déplacer la candidature que si sa clé de tri a changé
+        key = self._inserted_keys[application.id]
+        if key[0] != self._sort_key(application):
+            self.remove(application)
+            self.insert(application)
+        else:
+            # Même identifiant : la candidature peut être un nouvel objet remplaçant l'ancien
+            self.applications[bisect_left(self.keys, key)] = application
+
+
+class ApplicationView:
+    """ Recherche, tri et pagination en mémoire. Les pages sont découpées dans des vues en cache en O(taille de page). """
+
+    def __init__(self, applications):
+        # Les pages peuvent être calculées dans un thread de travail pendant que l'interface modifie la vue
+        self.lock = threading.RLock()
+        self.search_index = SearchIndex(applications)
+        # Permutations triées, construites à la première utilisation de chaque clé de tri
+        self._permutations = {}
+        # (texte recherché, clé de tri) -> candidatures filtrées, triées par ordre croissant
+        self._views = {}
+
+    def page(self, search_text, sort_by, ascending, start_index, count):
+        """ Retourner le nombre de candidatures correspondant à la recherche et celles de la page demandée. """
+        with self.lock:
+            view = self._view(search_text, sort_by)
+            total = len(view)
+            if not count:
+                return total, []
+            if sort_by is None or ascending:
+                return total, view[start_index:start_index + count]
+            # Ordre décroissant : parcourir la vue croissante à l'envers, sans la retrier
+            stop = max(total - start_index, 0)
+            return total, view[max(stop - count, 0):stop][::-1]
+
+    def add(self, application):
+        with self.lock:
+            self.search_index.add(application)
+            for permutation in self._permutations.values():
+                permutation.insert(application)
+            self._views.clear()
+
+    def update(self, application):
+        with self.lock:
+            self.search_index.update(application)
+            for permutation in self._permutations.values():
+                permutation.update(application)
+            self._views.clear()
+
+    def remove(self, application):
+        with self.lock:
+            for permutation in self._permutations.values():
+                permutation.remove(application)
+            self.search_index.remove(application)
+            self._views.clear()
+
+    def apply(self, changes):
+        """ Appliquer des modifications (opération, candidature) sous un seul verrou, par exemple un lot chargé. """
+        with self.lock:
+            for op, application in changes:
+                if op == "add":
+                    self.add(application)
+                elif op == "update":
+                    self.update(application)
+                else:
+                    self.remove(application)
+
+    def _view(self, search_text, sort_by):
+        cache_key = (search_text.lower(), sort_by)
+        view = self._views.get(cache_key)
+        if view is not None:
+            return view
+
+        # Les résultats de l'index sont dans l'ordre de la base
+        with instrumentation.timer("update_application_list.filter"):
+            filtered = self.search_index.search(search_text)
+        if sort_by is not None:
+            with instrumentation.timer("update_application_list.sort"):
+                permutation = self._permutation(sort_by)
+                if len(filtered) == len(self.search_index):
+                    view = permutation.applications
+                elif len(filtered) * log2(len(filtered) + 2) < len(permutation.applications):
+                    # Peu de résultats : les trier directement
+                    sort_key, rank = SORT_KEYS[sort_by], self.search_index.rank
+                    view = sorted(filtered, key=lambda application: (sort_key(application), rank(application)))
+                else:
+                    # Beaucoup de résultats : filtrer la permutation déjà triée
+                    matching = {application.id for application in filtered}
+                    view = [application for application in permutation.applications if application.id in matching]
+        else:
+            view = filtered
+
+        if len(self._views) >= VIEW_CACHE_SIZE:
+            del self._views[next(iter(self._views))]
+        self._views[cache_key] = view
+        return view
+
+    def _permutation(self, sort_by):
+        permutation = self._permutations.get(sort_by)
+        if permutation is None:
+            permutation = SortedPermutation(self.search_index.applications(), SORT_KEYS[sort_by], self.search_index.rank)
+            self._permutations[sort_by] = permutation
+        return permutation
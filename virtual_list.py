@@ -0,0 +1,139 @@
+""" Liste virtualisée : seules les lignes visibles existent et sont recyclées pendant le défilement. """
+import tkinter as tk
+from tkinter import ttk
+
+# Hauteur d'une ligne, en pixels
+ROW_HEIGHT = 24
+
+# Hauteur approximative de la ligne d'en-têtes, en pixels
+HEADING_HEIGHT = 28
+
+
+class VirtualList(tk.Frame):
+    """ Treeview n'affichant qu'une fenêtre de lignes, alimentée à la demande par `fetch(start, count)`.
+
+    `fetch` retourne (nombre total d'éléments, éléments de la fenêtre), `render_row(position, item)` retourne
+    (valeurs des colonnes, tag) et `on_open(item)` est appelé lors d'un double-clic ou de la touche Entrée.
+    """
+
+    def __init__(self, master, columns, fetch, render_row, on_open, tag_colors=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.fetch = fetch
+        self.render_row = render_row
+        self.on_open = on_open
+        self.first_row = 0  # Position du premier élément affiché
+        self.total = 0
+        self.items = []  # Éléments affichés, dans l'ordre des lignes du pool
+        self.visible_rows = 0  # Nombre de lignes visibles, connu au premier redimensionnement
+        self.attached_rows = 0
+        self.refresh_pending = False
+
+        style = ttk.Style(self)
+        style.configure("Applications.Treeview", background='#333333', fieldbackground='#333333', foreground='#ffffff', rowheight=ROW_HEIGHT)
+        style.configure("Applications.Treeview.Heading", font=("Helvetica", 16, "bold"))
+
+        # Colonnes : (identifiant, titre, largeur, alignement, commande du titre)
+        self.tree = ttk.Treeview(self, columns=[column[0] for column in columns], show="headings", selectmode="browse", style="Applications.Treeview")
+        for column_id, heading, width, anchor, command in columns:
+            self.tree.heading(column_id, text=heading, command=command or "")
+            self.tree.column(column_id, width=width, anchor=anchor, stretch=True)
+        for tag, color in (tag_colors or {}).items():
+            self.tree.tag_configure(tag, background=color, foreground='#ffffff')
+
+        # La barre de défilement représente la liste complète, pas les lignes du Treeview
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        # Pool de lignes réutilisées, créées selon la hauteur disponible
+        self.row_ids = []
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(3))
+        self.tree.bind("<Prior>", lambda e: self.scroll_by(-self.visible_rows))
+        self.tree.bind("<Next>", lambda e: self.scroll_by(self.visible_rows))
+        self.tree.bind("<Double-1>", self.on_activate)
+        self.tree.bind("<Return>", self.on_activate)
+
+    def refresh(self):
+        """ Relire la fenêtre visible et mettre à jour les lignes du pool. """
+        self.refresh_pending = False
+        total, items = self.fetch(self.first_row, self.visible_rows)
+
+        # Si la liste a rétréci, revenir à la dernière fenêtre complète
+        last_first_row = max(total - self.visible_rows, 0)
+        if self.first_row > last_first_row:
+            self.first_row = last_first_row
+            total, items = self.fetch(self.first_row, self.visible_rows)
+        self.display(total, items)
+
+    def display(self, total, items):
+        """ Afficher une fenêtre déjà lue à partir de `first_row` (par exemple calculée dans un autre thread). """
+        self.total = total
+        items = items[:len(self.row_ids)]
+        self.items = items
+        for row, item in enumerate(items):
+            values, tag = self.render_row(self.first_row + row, item)
+            self.tree.item(self.row_ids[row], values=values, tags=(tag,) if tag else ())
+
+        # Attacher ou détacher uniquement les lignes dont la visibilité change
+        for row in range(len(items), self.attached_rows):
+            self.tree.detach(self.row_ids[row])
+        for row in range(self.attached_rows, len(items)):
+            self.tree.move(self.row_ids[row], "", row)
+        self.attached_rows = len(items)
+
+        if self.total:
+            self.scrollbar.set(self.first_row / self.total, min((self.first_row + self.visible_rows) / self.total, 1.0))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def schedule_refresh(self):
+        # Regrouper les événements de défilement rapprochés en un seul rafraîchissement
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.after_idle(self.refresh)
+
+    def scroll_to(self, first_row):
+        self.first_row = max(0, min(first_row, max(self.total - self.visible_rows, 0)))
+        self.schedule_refresh()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.first_row + rows)
+
+    def on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.scroll_to(int(float(args[0]) * self.total))
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            self.scroll_by(amount * (self.visible_rows if unit == "pages" else 1))
+
+    def on_mousewheel(self, event):
+        # Windows envoie des multiples de 120, macOS de petites valeurs
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_by(-delta)
+
+    def on_resize(self, event):
+        visible_rows = max(1, (event.height - HEADING_HEIGHT) // ROW_HEIGHT)
+        if visible_rows == self.visible_rows and self.row_ids:
+            return
+        # Agrandir le pool si nécessaire ; les lignes en trop sont simplement détachées
+        while len(self.row_ids) < visible_rows:
+            row_id = f"row{len(self.row_ids)}"
+            self.tree.insert("", "end", iid=row_id)
+            self.tree.detach(row_id)
+            self.row_ids.append(row_id)
+        for row in range(visible_rows, self.attached_rows):
+            self.tree.detach(self.row_ids[row])
+        self.attached_rows = min(self.attached_rows, visible_rows)
+        self.visible_rows = visible_rows
+        self.schedule_refresh()
+
+    def on_activate(self, event):
+        selection = self.tree.selection()
+        if selection:
+            row = self.row_ids.index(selection[0])
+            if row < len(self.items):
+                self.on_open(self.items[row])